@@ -2,7 +2,7 @@
 
 from pydantic_settings import BaseSettings
 from pydantic import Field
-from typing import Optional
+from typing import List, Optional
 
 
 class Settings(BaseSettings):
@@ -23,18 +23,50 @@ class Settings(BaseSettings):
     neo4j_uri: Optional[str] = Field(default=None, description="Neo4j connection URI")
     neo4j_user: Optional[str] = Field(default=None, description="Neo4j username")
     neo4j_password: Optional[str] = Field(default=None, description="Neo4j password")
+    neo4j_max_connection_pool_size: int = Field(default=100, description="Maximum connections in the Neo4j driver pool")
+    neo4j_connection_acquisition_timeout: float = Field(default=60.0, description="Seconds to wait for a pooled Neo4j connection")
+    neo4j_max_connection_lifetime: int = Field(default=3600, description="Seconds before a pooled Neo4j connection is recycled")
+    graph_page_size: int = Field(default=500, description="Nodes per page when streaming high-risk nodes")
+    graph_ensure_schema: bool = Field(default=True, description="Create graph indexes and constraints on startup")
     
     # OPA
     opa_url: str = Field(default="http://localhost:8181/v1/data/fabric/policy", description="Open Policy Agent URL")
+    opa_timeout: float = Field(default=2.0, description="OPA request timeout in seconds")
+    opa_max_connections: int = Field(default=20, description="Pooled HTTP connections to OPA")
+    opa_concurrency: int = Field(default=16, description="Maximum concurrent OPA queries")
+    opa_batch_enabled: bool = Field(default=False, description="Send many resources per OPA query to opa_batch_url")
+    opa_batch_url: str = Field(default="http://localhost:8181/v1/data/fabric/policy/batch", description="OPA rule evaluating input.resources")
+    opa_batch_size: int = Field(default=100, description="Resources per batched OPA query")
+    opa_cache_ttl_seconds: float = Field(default=300.0, description="Policy decision cache TTL (0 disables caching)")
+    opa_cache_max_size: int = Field(default=10000, description="Maximum cached policy decisions")
+    opa_risk_bucket_size: int = Field(default=1, description="Risk score bucket width used in the decision cache key")
+    policy_engine: str = Field(default="opa", description="Policy decisions: opa (decision table as fallback) or local (opt-in, decision table only)")
+    policy_table_path: Optional[str] = Field(default=None, description="Decision table file (default: config/policies/decision_table.yaml)")
+    policy_sync_url: Optional[str] = Field(default=None, description="OPA data URL serving the decision table, polled for updates")
+    policy_sync_interval_seconds: float = Field(default=60.0, description="Decision table sync interval in seconds")
     
     neptune_endpoint: Optional[str] = Field(default=None, description="Neptune endpoint")
     neptune_port: int = Field(default=8182, description="Neptune port")
+    neptune_max_workers: int = Field(default=8, description="Threads (and driver connections) for blocking Neptune calls")
+    neptune_batch_size: int = Field(default=100, description="Maximum elements written per Neptune bulk traversal")
+    graph_write_behind_enabled: bool = Field(default=False, description="Buffer graph ingestion and write it in background batches")
+    graph_write_behind_batch_size: int = Field(default=500, description="Maximum records per write-behind flush")
+    graph_write_behind_flush_ms: int = Field(default=250, description="Maximum time a buffered record waits before flushing (ms)")
+    graph_write_behind_max_pending: int = Field(default=10000, description="Buffered records before ingestion applies backpressure")
+    
+    # Asset Cache
+    asset_cache_max_size: int = Field(default=10000, description="Maximum asset identities cached by the Contextualizer")
+    asset_cache_ttl_seconds: int = Field(default=3600, description="Asset identity cache TTL in seconds (0 disables expiry)")
     
     # Message Queue
     message_queue_type: str = Field(default="kafka", description="Message queue type: kafka or nats")
     kafka_bootstrap_servers: Optional[str] = Field(default=None, description="Kafka bootstrap servers")
     kafka_topic: str = Field(default="security_events", description="Kafka topic for ingestion")
     kafka_dlq_topic: str = Field(default="fabric_dlq", description="Kafka Dead Letter Queue topic")
+    kafka_batch_enabled: bool = Field(default=False, description="Consume Kafka in batches via getmany() instead of per message")
+    kafka_batch_max_records: int = Field(default=500, description="Maximum records fetched per Kafka batch")
+    kafka_batch_concurrency: int = Field(default=8, description="Maximum partitions processed concurrently within a batch")
+    kafka_batch_linger_ms: int = Field(default=200, description="Maximum time to wait for a Kafka batch to fill (ms)")
     nats_url: Optional[str] = Field(default="nats://localhost:4222", description="NATS server URL")
     
     # Secrets Management
@@ -48,6 +80,31 @@ class Settings(BaseSettings):
     redis_url: str = Field(default="redis://localhost:6379/0", description="Redis connection URL")
     approval_db_type: str = Field(default="memory", description="Backend for approvals: memory or redis")
     approval_redis_key_prefix: str = Field(default="fabric:approvals:", description="Key prefix for approval keys")
+    watermark_backend: str = Field(default="memory", description="Backend for the risk detection watermark: memory, file, or redis")
+    watermark_file_path: str = Field(default="./state/watermarks.json", description="Watermark file when watermark_backend is file")
+    watermark_redis_key_prefix: str = Field(default="fabric:watermark:", description="Key prefix for watermark keys")
+    watermark_overlap_seconds: float = Field(default=5.0, description="Look-back applied to the watermark to cover clock skew and late commits")
+    
+    # Risk Scoring
+    risk_scoring_config_path: Optional[str] = Field(default=None, description="Risk scoring weights (default: config/scoring/risk_scoring.yaml)")
+    
+    # IaC Scanning
+    iac_cache_enabled: bool = Field(default=True, description="Cache per-file IaC scan results between cycles")
+    iac_scan_workers: int = Field(default=0, description="Processes used to parse IaC files (0 or 1: parse in-process)")
+    iac_skip_dirs: List[str] = Field(
+        default=[".git", "node_modules", "vendor", ".terraform"],
+        description="Directory names never descended into by IaC scans"
+    )
+    iac_rules_dir: Optional[str] = Field(default=None, description="Directory of extra IaC rule modules (*.py)")
+    iac_parallel_min_files: int = Field(default=32, description="Minimum files to parse before fanning out to the process pool")
+    iac_repo_cache_dir: str = Field(default="./state/repos", description="Directory holding persistent shallow clones of scanned repositories")
+    iac_repo_cache_max_bytes: int = Field(default=2 * 1024 ** 3, description="Total size of cached clones before least recently used ones are evicted")
+    
+    # Normalization
+    mapping_dir: Optional[str] = Field(default=None, description="Directory of YAML vendor mappings (default: config/mappings)")
+    mapping_poll_interval_seconds: float = Field(default=5.0, description="How often the mapping directory is checked for changes")
+    normalization_workers: int = Field(default=0, description="Processes used to normalize alert batches (0 or 1: normalize in-process)")
+    normalization_chunk_size: int = Field(default=500, description="Maximum records sent to a normalization worker per task")
     
     # Performance
     default_polling_interval: int = Field(default=300, description="Default polling interval in seconds (5 minutes)")
@@ -0,0 +1,283 @@
+"""Risk scoring engine that works with OCSF data"""
+
+from typing import Dict, Any, List, Optional
+import os
+import re
+import time
+import numpy as np
+import structlog
+import yaml
+from .config import settings
+from .exceptions import ConfigurationError
+from .timestamps import parse_timestamp
+
+logger = structlog.get_logger(__name__)
+
+DEFAULT_CONFIG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "config", "scoring", "risk_scoring.yaml"
+)
+
+
+class RiskScoringEngine:
+    """
+    Universal risk scoring engine for normalized OCSF data.
+
+    Calculates a consistent risk score (0-10) regardless of the data source (Tenable, Splunk, etc.).
+    Factors considered:
+    - Base severity (Critical, High, etc.)
+    - Vulnerability details (CVE, Exploit availability)
+    - Finding context (Keywords like "ransomware")
+    - Source context (e.g. sources tagged "critical")
+    - Temporal decay (older alerts get lower scores), applied when a score is read:
+      ingest stores the undecayed score and `composite_batch` decays it by node age
+
+    Weights, keywords and decay come from `config/scoring/risk_scoring.yaml` (or
+    `risk_scoring_config_path`). Title keywords are compiled into a single regex.
+
+    Scoring is columnar: `score_batch` and `composite_batch` take NumPy arrays and score
+    every record in one pass. `calculate_risk_score`, `calculate_composite_risk` and
+    `score_alert` are single-record wrappers over the same code, so every path agrees.
+    """
+
+    def __init__(self, config_path: Optional[str] = None):
+        self.logger = logger
+        self.config_path = config_path or settings.risk_scoring_config_path or DEFAULT_CONFIG_PATH
+        self._load_config()
+
+    def _load_config(self):
+        """Load the scoring configuration and compile it"""
+        if not os.path.exists(self.config_path):
+            raise ConfigurationError(f"Risk scoring configuration not found: {self.config_path}")
+        with open(self.config_path, "r") as f:
+            config = yaml.safe_load(f) or {}
+
+        try:
+            vulnerability = config["vulnerability"]
+            self.cve_weight = float(vulnerability["cve_present"])
+            self.exploit_weight = float(vulnerability["exploit_available"])
+
+            finding = config["finding"]
+            self.keyword_bonus = float(finding["keyword_bonus"])
+            self.keyword_pattern = self._compile_keywords(finding.get("keywords") or [])
+
+            self.source_bonuses = [
+                (self._compile_keywords([keyword]), float(bonus))
+                for keyword, bonus in (config.get("source_bonus") or {}).items()
+            ]
+
+            decay = config["decay"]
+            self.decay_grace_hours = float(decay["grace_hours"])
+            self.decay_window_hours = float(decay["window_hours"])
+            self.decay_floor = float(decay["floor"])
+
+            composite = config["composite"]
+            self.severity_scale = float(composite["severity_scale"])
+            self.severity_weight = float(composite["severity_weight"])
+            criticality = composite["criticality"]
+            # Asset criticality is encoded as an index into criticality_factors
+            self.criticality_codes = {name: code for code, name in enumerate(criticality)}
+            self.criticality_factors = np.array([float(f) for f in criticality.values()])
+            self.default_criticality_code = self.criticality_codes[composite["default_criticality"]]
+
+            fallback = config["fallback_severity"]
+            self.fallback_points = {name.lower(): float(value) for name, value in fallback["points"].items()}
+            self.fallback_default_points = float(fallback["default"])
+        except (KeyError, TypeError, ValueError) as e:
+            raise ConfigurationError(f"Invalid risk scoring configuration {self.config_path}: {e}")
+
+    @staticmethod
+    def _compile_keywords(keywords: List[str]) -> Optional["re.Pattern[str]"]:
+        """Compile keywords into one case-insensitive alternation (longest first)"""
+        if not keywords:
+            return None
+        ordered = sorted(keywords, key=len, reverse=True)
+        return re.compile("|".join(re.escape(k) for k in ordered), re.IGNORECASE)
+
+    def calculate_risk_score(
+        self, ocsf_data: Dict[str, Any], now: Optional[float] = None, decay: bool = True
+    ) -> int:
+        """
+        Calculate risk score from OCSF data (vendor-agnostic)
+
+        Args:
+            ocsf_data: OCSF-formatted data dictionary
+            now: Reference time for decay (default: current time)
+            decay: Apply time decay; ingest stores undecayed scores
+
+        Returns:
+            Risk score (0-10)
+        """
+        return int(self.score_batch(**self.columns([ocsf_data]), now=now, decay=decay)[0])
+
+    def calculate_risk_scores(
+        self, records: List[Dict[str, Any]], now: Optional[float] = None, decay: bool = True
+    ) -> np.ndarray:
+        """Score many OCSF records at once"""
+        return self.score_batch(**self.columns(records), now=now, decay=decay)
+
+    def score_alert(self, alert_data: Dict[str, Any], now: Optional[float] = None) -> int:
+        """
+        Score a raw (non-OCSF) alert, as seen by the rule-based fallback
+
+        The alert's `severity` name is scored on the fallback's 0-10 scale
+        (`fallback_severity`), so a critical alert alone reaches the decision
+        threshold. `timestamp`, `title`/`name` and `source` are mapped onto their
+        OCSF fields and adjusted and decayed like any normalized finding.
+        """
+        severity = str(alert_data.get("severity") or "low").lower()
+        columns = self.columns([{
+            "class_uid": 2001,
+            "time": alert_data.get("timestamp"),
+            "finding": {"title": alert_data.get("title") or alert_data.get("name") or ""},
+            "metadata": {"source": alert_data.get("source") or ""},
+        }])
+        base_score = np.array([self.fallback_points.get(severity, self.fallback_default_points)])
+        return int(self.score_batch(**columns, now=now, base_score=base_score)[0])
+
+    def calculate_composite_risk(self, node_data: Dict[str, Any]) -> int:
+        """
+        Calculate composite risk score for a graph node
+
+        Args:
+            node_data: Node properties (`risk_score`, `severity_id`, `criticality`)
+
+        Returns:
+            Composite risk score (0-10)
+        """
+        return int(self.composite_batch(**self.node_columns([node_data]))[0])
+
+    def calculate_composite_risks(self, nodes: List[Dict[str, Any]]) -> np.ndarray:
+        """Score many graph nodes at once"""
+        return self.composite_batch(**self.node_columns(nodes))
+
+    def score_batch(
+        self,
+        severity_id: np.ndarray,
+        class_uid: np.ndarray,
+        cve_present: np.ndarray,
+        exploit_available: np.ndarray,
+        keyword_hit: np.ndarray,
+        source_bonus: np.ndarray,
+        event_time: np.ndarray,
+        now: Optional[float] = None,
+        decay: bool = True,
+        base_score: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Score columnar OCSF data
+
+        Args:
+            severity_id: OCSF severity IDs
+            class_uid: OCSF class UIDs (2002 vulnerability, 2001 finding)
+            cve_present: Whether a CVE is attached (vulnerabilities)
+            exploit_available: Whether a known exploit exists (vulnerabilities)
+            keyword_hit: Whether the title contains a high-risk keyword (findings)
+            source_bonus: Bonus points from the source name
+            event_time: Event time as epoch seconds, NaN when unknown
+            now: Reference time for decay (default: current time)
+            decay: Apply time decay
+            base_score: Base points used instead of `severity_id` (fallback scale)
+
+        Returns:
+            Integer risk scores (0-10)
+        """
+        score = (severity_id if base_score is None else base_score).astype(np.float64)
+
+        is_vuln = class_uid == 2002
+        score += is_vuln * (self.cve_weight * cve_present + self.exploit_weight * exploit_available)
+        score += (class_uid == 2001) * (self.keyword_bonus * keyword_hit)
+        score += source_bonus
+
+        if decay:
+            score = self.decay_batch(score, event_time, now)
+
+        return np.clip(score, 0, 10).astype(np.int64)
+
+    def decay_batch(self, score: np.ndarray, event_time: np.ndarray, now: Optional[float] = None) -> np.ndarray:
+        """Time-based decay after the grace period, linear over the window down to the floor"""
+        age_hours = ((time.time() if now is None else now) - event_time) / 3600
+        with np.errstate(invalid="ignore"):
+            stale = age_hours > self.decay_grace_hours
+        factor = np.maximum(self.decay_floor, 1 - (age_hours - self.decay_grace_hours) / self.decay_window_hours)
+        return np.where(stale, np.trunc(score * factor), score)
+
+    def composite_batch(
+        self,
+        risk_score: np.ndarray,
+        severity_id: np.ndarray,
+        criticality_code: np.ndarray,
+        event_time: Optional[np.ndarray] = None,
+        now: Optional[float] = None
+    ) -> np.ndarray:
+        """
+        Combine base risk, severity and asset criticality
+
+        Args:
+            risk_score: Base (undecayed) risk scores
+            severity_id: OCSF severity IDs
+            criticality_code: Indexes into `criticality_factors`
+            event_time: Event time as epoch seconds, NaN when unknown; decays `risk_score`
+            now: Reference time for decay (default: current time)
+
+        Returns:
+            Integer composite risk scores (0-10)
+        """
+        if event_time is not None:
+            risk_score = self.decay_batch(risk_score, event_time, now)
+        severity_factor = severity_id / self.severity_scale  # Normalize to 0-1
+        composite = np.trunc(
+            risk_score * (1 + severity_factor * self.severity_weight) * self.criticality_factors[criticality_code]
+        )
+        return np.clip(composite, 0, 10).astype(np.int64)
+
+    def columns(self, records: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Extract the columns used by `score_batch` from OCSF records"""
+        count = len(records)
+        vulns = [r.get("vulnerability") or {} for r in records]
+        return {
+            "severity_id": np.fromiter((int(r.get("severity_id", 0)) for r in records), np.int64, count),
+            "class_uid": np.fromiter((r.get("class_uid") or 0 for r in records), np.int64, count),
+            "cve_present": np.fromiter((bool(v.get("cve")) for v in vulns), np.bool_, count),
+            "exploit_available": np.fromiter((bool(v.get("exploit_available")) for v in vulns), np.bool_, count),
+            "keyword_hit": np.fromiter(
+                (self._has_keyword((r.get("finding") or {}).get("title") or "") for r in records), np.bool_, count
+            ),
+            "source_bonus": np.fromiter(
+                (self._source_bonus((r.get("metadata") or {}).get("source") or "") for r in records),
+                np.float64,
+                count
+            ),
+            "event_time": np.fromiter((self._epoch(r.get("time")) for r in records), np.float64, count),
+        }
+
+    def node_columns(self, nodes: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+        """Extract the columns used by `composite_batch` from graph node properties"""
+        count = len(nodes)
+        codes = self.criticality_codes
+        default = self.default_criticality_code
+        return {
+            "risk_score": np.fromiter((n.get("risk_score", 0) for n in nodes), np.float64, count),
+            "severity_id": np.fromiter((n.get("severity_id", 0) for n in nodes), np.float64, count),
+            "criticality_code": np.fromiter(
+                (codes.get(n.get("criticality"), default) for n in nodes), np.int64, count
+            ),
+            "event_time": np.fromiter((self._epoch(n.get("timestamp")) for n in nodes), np.float64, count),
+        }
+
+    def _has_keyword(self, title: str) -> bool:
+        return bool(title) and self.keyword_pattern is not None and self.keyword_pattern.search(title) is not None
+
+    def _source_bonus(self, source: str) -> float:
+        if not source:
+            return 0.0
+        return sum(bonus for pattern, bonus in self.source_bonuses if pattern.search(source))
+
+    @staticmethod
+    def _epoch(event_time: Any) -> float:
+        """Convert an OCSF time (epoch seconds or ISO 8601) to epoch seconds, NaN if unknown"""
+        parsed = parse_timestamp(event_time)
+        return np.nan if parsed is None else parsed
+
+
+# Global risk scoring engine
+risk_scoring_engine = RiskScoringEngine()
@@ -0,0 +1,84 @@
+"""Timestamp parsing shared by normalization strategies and risk scoring"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+
+TIMESTAMP_MEMO_MAX_SIZE = 4096
+
+# Parsed string timestamps; alert batches often repeat the same values
+_memo: Dict[str, Optional[float]] = {}
+
+_batch_now: ContextVar[Optional[float]] = ContextVar("batch_now", default=None)
+
+
+@contextmanager
+def batch_clock() -> Iterator[float]:
+    """
+    Freeze `current_time()` for the duration of a batch.
+
+    Records without a timestamp in the same batch then share one "now" instead of
+    each reading the clock.
+    """
+    now = time.time()
+    token = _batch_now.set(now)
+    try:
+        yield now
+    finally:
+        _batch_now.reset(token)
+
+
+def current_time() -> float:
+    """Epoch seconds: the batch's frozen time inside `batch_clock()`, else the clock"""
+    now = _batch_now.get()
+    return time.time() if now is None else now
+
+
+def parse_timestamp(value: Any) -> Optional[float]:
+    """
+    Convert a vendor timestamp to epoch seconds.
+
+    Accepts epoch ints/floats (including 0), numeric strings (e.g. Splunk `_time`) and
+    ISO 8601 strings, with or without a `Z` suffix. String results are memoized.
+
+    Returns:
+        Epoch seconds, or None if the value is missing or unparseable.
+    """
+    if value is None or value == "" or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        value = str(value)
+
+    try:
+        return _memo[value]
+    except KeyError:
+        pass
+
+    parsed = _parse_string(value)
+    if len(_memo) >= TIMESTAMP_MEMO_MAX_SIZE:
+        _memo.clear()
+    _memo[value] = parsed
+    return parsed
+
+
+def to_epoch_seconds(value: Any) -> int:
+    """Like `parse_timestamp`, as an int, falling back to `current_time()`"""
+    parsed = parse_timestamp(value)
+    return int(current_time() if parsed is None else parsed)
+
+
+def _parse_string(value: str) -> Optional[float]:
+    try:
+        # Epoch seconds as text: digits with one decimal point, or at least 9 digits.
+        # Shorter digit runs such as "20240101" are ISO 8601 basic dates.
+        if value[0].isdigit() and value.replace(".", "", 1).isdigit() and ("." in value or len(value) >= 9):
+            return float(value)
+        if value[-1] in "Zz":
+            value = value[:-1] + "+00:00"
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return None
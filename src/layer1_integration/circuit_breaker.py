@@ -1,12 +1,12 @@
 """Circuit breaker pattern implementation for connector resilience"""
 
 from typing import Callable, Optional
-from datetime import datetime, timedelta
 import asyncio
 from pybreaker import CircuitBreaker
 import structlog
 from ..common.exceptions import CircuitBreakerOpenError
 from ..common.config import settings
+from ..common.risk_scoring import risk_scoring_engine
 
 logger = structlog.get_logger(__name__)
 
@@ -110,7 +110,8 @@ class RuleBasedFallback:
         """
         Process alert using static fallback logic when AI services are unavailable.
         
-        Calculates a basic risk score based on severity fields.
+        Scores the raw alert with the shared risk scoring engine, so fallback scores
+        match what the alert would score once normalized and ingested.
         
         Args:
             alert_data: Raw dictionary of alert data.
@@ -120,28 +121,7 @@ class RuleBasedFallback:
         """
         self.logger.info("Using rule-based fallback", alert_id=alert_data.get("id"))
         
-        # Simple rule-based risk scoring
-        severity_map = {
-            "critical": 10,
-            "high": 7,
-            "medium": 4,
-            "low": 1
-        }
-        
-        severity = alert_data.get("severity", "low").lower()
-        base_score = severity_map.get(severity, 1)
-        
-        # Add time-based decay
-        alert_time = alert_data.get("timestamp")
-        if alert_time:
-            try:
-                alert_dt = datetime.fromisoformat(alert_time.replace("Z", "+00:00"))
-                age_hours = (datetime.now(alert_dt.tzinfo) - alert_dt).total_seconds() / 3600
-                # Reduce score for older alerts
-                age_factor = max(0.5, 1 - (age_hours / 24))
-                base_score = int(base_score * age_factor)
-            except Exception:
-                pass
+        base_score = risk_scoring_engine.score_alert(alert_data)
         
         return {
             **alert_data,
@@ -1,8 +1,12 @@
 from fastapi import APIRouter, HTTPException, Request, BackgroundTasks
 from pydantic import BaseModel
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import structlog
+import asyncio
 from datetime import datetime
+from ..common.config import settings
+from ..layer2_normalization.transformer import transformer
+from ..layer3_moat.contextualizer import Contextualizer, get_contextualizer
 
 # Initialize router
 router = APIRouter(prefix="/webhooks", tags=["webhooks"])
@@ -14,20 +18,92 @@ class WebhookEvent(BaseModel):
     payload: Dict[str, Any]
     timestamp: Optional[datetime] = None
 
+def _event_records(event: WebhookEvent) -> List[Dict[str, Any]]:
+    """
+    Extract the alert records carried by a webhook event.
+    
+    Batched senders put them under `records` (or Splunk's `results`); a single Splunk
+    alert arrives as `result`. Anything else is treated as one record.
+    """
+    payload = event.payload
+    for key in ("records", "results"):
+        if isinstance(payload.get(key), list):
+            return payload[key]
+    if isinstance(payload.get("result"), dict):
+        return [payload["result"]]
+    return [payload]
+
+# Built by `start_ingestion`, so importing the router never opens a graph connection
+_contextualizer: Optional[Contextualizer] = None
+
+async def start_ingestion():
+    """
+    Set up the graph pipeline `process_event` writes through.
+    
+    Webhooks are served by the onboarding API, a separate process from the fabric,
+    so it runs the same start-up steps: graph client, schema, write-behind buffer and
+    mapping reloads. Call from the hosting app's startup hook.
+    """
+    global _contextualizer
+    _contextualizer = get_contextualizer()
+    if settings.graph_ensure_schema:
+        try:
+            await _contextualizer.graph.ensure_schema()
+        except Exception as e:
+            logger.warning("Failed to ensure graph schema", error=str(e))
+    if settings.graph_write_behind_enabled:
+        await _contextualizer.start_write_behind()
+    await transformer.start_watching()
+
+async def stop_ingestion():
+    """Flush buffered graph writes and stop mapping reloads (the app's shutdown hook)"""
+    await transformer.stop_watching()
+    if _contextualizer is not None:
+        await _contextualizer.stop_write_behind()
+        await _contextualizer.graph.close()
+
 async def process_event(event: WebhookEvent):
     """
     Background task to process the incoming event.
     In a real system, this would push to a Kafka topic.
-    For this MVP, we will process it directly or push to an internal queue.
+    For this MVP, we process it directly: the event's records are normalized in one
+    `transform_batch` call on a worker thread, then handed to the contextualizer's
+    write-behind queue like the fabric's consumer does. The hosting app must run
+    `start_ingestion` / `stop_ingestion` around it.
     """
     logger.info("Processing webhook event", source=event.source, type=event.event_type)
+    if _contextualizer is None:
+        logger.error("Webhook ingestion not started, dropping event", source=event.source)
+        return
     
-    # Simulating normalization and ingestion
-    # Here we would call the TransformationEngine
-    # and then the RiskDetectionStateMachine
+    records = _event_records(event)
+    results, errors = await asyncio.to_thread(transformer.transform_batch, event.source, records)
+    for idx, error in errors.items():
+        logger.error("Failed to normalize webhook record", source=event.source, index=idx, error=str(error))
     
-    # TODO: Connect to State Machine
-    pass
+    normalized = [r for r in results if r is not None]
+    if not normalized:
+        return
+    # Queue every record, then wait for them to be written; the last record
+    # releases the linger so the event is flushed now
+    last = len(normalized) - 1
+    acks = [
+        await _contextualizer.queue_ocsf_data(ocsf_data, linger=idx != last)
+        for idx, ocsf_data in enumerate(normalized)
+    ]
+    failed = 0
+    for ack in acks:
+        try:
+            await ack
+        except Exception as e:
+            failed += 1
+            logger.error("Failed to ingest webhook record", source=event.source, error=str(e))
+    logger.info(
+        "Webhook event ingested",
+        source=event.source,
+        records=len(normalized) - failed,
+        failed=len(errors) + failed,
+    )
 
 @router.post("/ingest")
 async def ingest_webhook(event: WebhookEvent, background_tasks: BackgroundTasks):
@@ -4,6 +4,7 @@ from typing import Dict, Any, Optional, List
 from enum import IntEnum
 from pydantic import BaseModel, Field, validator
 import structlog
+from ..common.exceptions import OCSFValidationError
 
 logger = structlog.get_logger(__name__)
 
@@ -43,6 +44,9 @@ class OCSFClassUID(IntEnum):
     NETWORK_ACTIVITY = 4001
 
 
+VALID_SEVERITY_IDS = frozenset(s.value for s in OCSFSeverityID)
+
+
 class OCSFBaseEvent(BaseModel):
     """
     Base OCSF event structure common to all event types.
@@ -59,7 +63,7 @@ class OCSFBaseEvent(BaseModel):
     @validator("severity_id")
     def validate_severity(cls, v):
         """Validate that severity_id matches defined OCSFSeverityID enum values."""
-        if v not in [s.value for s in OCSFSeverityID]:
+        if v not in VALID_SEVERITY_IDS:
             raise ValueError(f"Invalid severity_id: {v}")
         return v
 
@@ -111,6 +115,99 @@ class OCSFAssetInventory(OCSFBaseEvent):
         super().__init__(**data)
 
 
+class OCSFRecord:
+    """
+    Lightweight OCSF event used on the normalization hot path.
+    
+    Slot-based and validated against precomputed sets, so building one costs a few
+    attribute stores instead of a pydantic validate-and-copy. `to_dict()` returns
+    exactly what the matching pydantic model's `.dict()` would; `to_model()` builds
+    that model for API boundaries that need full validation.
+    """
+    __slots__ = ("class_uid", "class_name", "severity_id", "severity", "time", "metadata")
+    # Output order, matching the pydantic field order
+    FIELDS = __slots__
+    CLASS_UID = int(OCSFClassUID.BASE_EVENT)
+    CLASS_NAME = "Base Event"
+    MODEL = OCSFBaseEvent
+    
+    def __init__(
+        self,
+        severity_id: int,
+        severity: str,
+        time: int,
+        metadata: Optional[Dict[str, Any]] = None,
+        class_uid: Optional[int] = None,
+        class_name: Optional[str] = None
+    ):
+        if severity_id not in VALID_SEVERITY_IDS:
+            raise OCSFValidationError(f"Invalid severity_id: {severity_id}")
+        if type(time) is not int:
+            raise OCSFValidationError(f"Invalid time: {time!r}")
+        self.class_uid = self.CLASS_UID if class_uid is None else class_uid
+        self.class_name = self.CLASS_NAME if class_name is None else class_name
+        self.severity_id = severity_id
+        self.severity = severity
+        self.time = time
+        self.metadata = {} if metadata is None else metadata
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.FIELDS}
+    
+    def to_model(self) -> BaseModel:
+        return self.MODEL(**self.to_dict())
+
+
+class VulnerabilityFindingRecord(OCSFRecord):
+    """Slot-based counterpart of `OCSFVulnerabilityFinding`"""
+    __slots__ = ("vulnerability", "asset", "src_endpoint", "dst_endpoint")
+    FIELDS = OCSFRecord.FIELDS + __slots__
+    CLASS_UID = int(OCSFClassUID.VULNERABILITY_FINDING)
+    CLASS_NAME = "Vulnerability Finding"
+    MODEL = OCSFVulnerabilityFinding
+    
+    def __init__(
+        self,
+        vulnerability: Dict[str, Any],
+        asset: Optional[Dict[str, Any]] = None,
+        src_endpoint: Optional[Dict[str, Any]] = None,
+        dst_endpoint: Optional[Dict[str, Any]] = None,
+        **base
+    ):
+        super().__init__(**base)
+        self.vulnerability = vulnerability
+        self.asset = asset
+        self.src_endpoint = src_endpoint
+        self.dst_endpoint = dst_endpoint
+
+
+class FindingRecord(OCSFRecord):
+    """Slot-based counterpart of `OCSFFinding`"""
+    __slots__ = ("finding", "resources")
+    FIELDS = OCSFRecord.FIELDS + __slots__
+    CLASS_UID = int(OCSFClassUID.FINDING)
+    CLASS_NAME = "Finding"
+    MODEL = OCSFFinding
+    
+    def __init__(self, finding: Dict[str, Any], resources: Optional[List[Dict[str, Any]]] = None, **base):
+        super().__init__(**base)
+        self.finding = finding
+        self.resources = resources
+
+
+_SEVERITY_IDS = {
+    "critical": OCSFSeverityID.CRITICAL.value,
+    "high": OCSFSeverityID.HIGH.value,
+    "medium": OCSFSeverityID.MEDIUM.value,
+    "low": OCSFSeverityID.LOW.value,
+    "info": OCSFSeverityID.INFORMATIONAL.value,
+    "informational": OCSFSeverityID.INFORMATIONAL.value,
+    "unknown": OCSFSeverityID.UNKNOWN.value
+}
+
+_SEVERITY_NAMES = {s.value: s.name.lower() for s in OCSFSeverityID}
+
+
 def map_severity_to_ocsf(severity: str) -> int:
     """
     Map standard severity string to OCSF severity ID
@@ -121,23 +218,9 @@ def map_severity_to_ocsf(severity: str) -> int:
     Returns:
         OCSF severity ID
     """
-    severity_lower = severity.lower()
-    mapping = {
-        "critical": OCSFSeverityID.CRITICAL,
-        "high": OCSFSeverityID.HIGH,
-        "medium": OCSFSeverityID.MEDIUM,
-        "low": OCSFSeverityID.LOW,
-        "info": OCSFSeverityID.INFORMATIONAL,
-        "informational": OCSFSeverityID.INFORMATIONAL,
-        "unknown": OCSFSeverityID.UNKNOWN
-    }
-    return mapping.get(severity_lower, OCSFSeverityID.UNKNOWN).value
+    return _SEVERITY_IDS.get(severity.lower(), OCSFSeverityID.UNKNOWN.value)
 
 
 def get_severity_name(severity_id: int) -> str:
     """Get severity name from OCSF severity ID"""
-    try:
-        return OCSFSeverityID(severity_id).name.lower()
-    except ValueError:
-        return "unknown"
-
+    return _SEVERITY_NAMES.get(severity_id, "unknown")
@@ -1,11 +1,10 @@
 """Transformation strategies for different security vendors"""
 
-from abc import ABC, abstractmethod
-from typing import Dict, Any
-from datetime import datetime
+from abc import ABC
+from typing import Dict, Any, Callable, List, Optional, Tuple
 from .ocsf_schema import (
-    OCSFVulnerabilityFinding,
-    OCSFFinding,
+    VulnerabilityFindingRecord,
+    FindingRecord,
     map_severity_to_ocsf,
     get_severity_name,
     OCSFClassUID
@@ -13,6 +12,8 @@ from .ocsf_schema import (
 import yaml
 import os
 import structlog
+from ..common.exceptions import NormalizationError
+from ..common.timestamps import current_time, to_epoch_seconds
 
 logger = structlog.get_logger(__name__)
 
@@ -20,11 +21,26 @@ class TransformationStrategy(ABC):
     """
     Abstract base class for all transformation strategies.
     
-    Implementations must convert raw vendor dictionaries into OCSF-compliant dictionaries.
+    Implementations must convert raw vendor dictionaries into OCSF-compliant dictionaries,
+    by overriding either method:
+    
+    - `transform_sync`: preferred. The conversion is pure CPU work, so batch paths
+      (`TransformationEngine.transform_batch`, worker processes) call it directly and
+      `transform` awaits nothing.
+    - `transform`: the original coroutine interface. Existing strategies that only
+      implement it keep working; `transform_sync` drives the coroutine to completion,
+      provided it does not suspend (i.e. awaits no I/O).
     """
     
-    @abstractmethod
-    async def transform(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if (
+            cls.transform is TransformationStrategy.transform
+            and cls.transform_sync is TransformationStrategy.transform_sync
+        ):
+            raise TypeError(f"{cls.__name__} must implement transform or transform_sync")
+    
+    def transform_sync(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Transform raw data into OCSF format.
         
@@ -34,23 +50,29 @@ class TransformationStrategy(ABC):
         Returns:
             Dict complying with OCSF schema (typically Finding or Vulnerability classes).
         """
-        pass
+        coroutine = self.transform(data)
+        try:
+            coroutine.send(None)
+        except StopIteration as done:
+            return done.value
+        coroutine.close()
+        raise NormalizationError(
+            f"{type(self).__name__}.transform suspended; implement transform_sync for batch normalization"
+        )
+    
+    async def transform(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Awaitable form of `transform_sync`"""
+        return self.transform_sync(data)
 
 class TenableStrategy(TransformationStrategy):
-    async def transform(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        timestamp = data.get("timestamp") or datetime.now().timestamp()
-        if isinstance(timestamp, str):
-            try:
-                timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp()
-            except Exception:
-                timestamp = datetime.now().timestamp()
-        
+    def transform_sync(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        timestamp = to_epoch_seconds(data.get("timestamp"))
         severity_id = map_severity_to_ocsf(data.get("severity", "unknown"))
         
-        ocsf = OCSFVulnerabilityFinding(
+        ocsf = VulnerabilityFindingRecord(
             severity_id=severity_id,
             severity=get_severity_name(severity_id),
-            time=int(timestamp),
+            time=timestamp,
             vulnerability={
                 "cve": data.get("cve"),
                 "name": data.get("name"),
@@ -63,25 +85,17 @@ class TenableStrategy(TransformationStrategy):
                 "connector_id": data.get("connector_id"),
             }
         )
-        return ocsf.dict()
+        return ocsf.to_dict()
 
 class SplunkStrategy(TransformationStrategy):
-    async def transform(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        timestamp = data.get("timestamp") or datetime.now().isoformat()
-        if isinstance(timestamp, str):
-            try:
-                timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp()
-            except Exception:
-                timestamp = datetime.now().timestamp()
-        else:
-            timestamp = datetime.now().timestamp()
-        
+    def transform_sync(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        timestamp = to_epoch_seconds(data.get("timestamp"))
         severity_id = map_severity_to_ocsf(data.get("severity", "unknown"))
         
-        ocsf = OCSFFinding(
+        ocsf = FindingRecord(
             severity_id=severity_id,
             severity=get_severity_name(severity_id),
-            time=int(timestamp),
+            time=timestamp,
             finding={
                 "title": data.get("title"),
                 "description": data.get("description"),
@@ -93,22 +107,17 @@ class SplunkStrategy(TransformationStrategy):
                 "connector_id": data.get("connector_id"),
             }
         )
-        return ocsf.dict()
+        return ocsf.to_dict()
 
 class AwsSecurityHubStrategy(TransformationStrategy):
-    async def transform(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        timestamp_str = data.get("timestamp") or data.get("UpdatedAt") or datetime.now().isoformat()
-        try:
-            timestamp = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00")).timestamp()
-        except Exception:
-            timestamp = datetime.now().timestamp()
-            
+    def transform_sync(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        timestamp = to_epoch_seconds(data.get("timestamp") or data.get("UpdatedAt"))
         severity_id = map_severity_to_ocsf(data.get("severity", "unknown"))
         
-        ocsf = OCSFFinding(
+        ocsf = FindingRecord(
             severity_id=severity_id,
             severity=get_severity_name(severity_id),
-            time=int(timestamp),
+            time=timestamp,
             finding={
                 "title": data.get("title"),
                 "description": data.get("description"),
@@ -121,23 +130,17 @@ class AwsSecurityHubStrategy(TransformationStrategy):
                 "product_arn": data.get("raw_data", {}).get("ProductArn"),
             }
         )
-        return ocsf.dict()
+        return ocsf.to_dict()
 
 class CrowdStrikeStrategy(TransformationStrategy):
-    async def transform(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        timestamp = data.get("timestamp") or datetime.now().isoformat()
-        if isinstance(timestamp, str):
-            try:
-                timestamp = datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp()
-            except Exception:
-                timestamp = datetime.now().timestamp()
-        
+    def transform_sync(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        timestamp = to_epoch_seconds(data.get("timestamp"))
         severity_id = map_severity_to_ocsf(data.get("severity", "unknown"))
         
-        ocsf = OCSFFinding(
+        ocsf = FindingRecord(
             severity_id=severity_id,
             severity=get_severity_name(severity_id),
-            time=int(timestamp),
+            time=timestamp,
             finding={
                 "title": data.get("title"),
                 "description": data.get("description"),
@@ -149,17 +152,17 @@ class CrowdStrikeStrategy(TransformationStrategy):
                 "connector_id": data.get("connector_id"),
             }
         )
-        return ocsf.dict()
+        return ocsf.to_dict()
 
 class QualysStrategy(TransformationStrategy):
-    async def transform(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        timestamp = datetime.now().timestamp()
+    def transform_sync(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        timestamp = int(current_time())
         severity_id = map_severity_to_ocsf(data.get("severity", "unknown"))
         
-        ocsf = OCSFVulnerabilityFinding(
+        ocsf = VulnerabilityFindingRecord(
             severity_id=severity_id,
             severity=get_severity_name(severity_id),
-            time=int(timestamp),
+            time=timestamp,
             vulnerability={
                 "cve": data.get("cve"),
                 "name": data.get("title"),
@@ -171,23 +174,18 @@ class QualysStrategy(TransformationStrategy):
                 "original_data": data,
             }
         )
-        return ocsf.dict()
+        return ocsf.to_dict()
 
 class AzureSentinelStrategy(TransformationStrategy):
-    async def transform(self, data: Dict[str, Any]) -> Dict[str, Any]:
+    def transform_sync(self, data: Dict[str, Any]) -> Dict[str, Any]:
         # Implement proper field mapping for Azure Sentinel
-        timestamp_str = data.get("TimeGenerated") or data.get("last_updated_time")
-        try:
-            timestamp = datetime.fromisoformat(timestamp_str.replace("Z", "+00:00")).timestamp() if timestamp_str else datetime.now().timestamp()
-        except:
-             timestamp = datetime.now().timestamp()
-
+        timestamp = to_epoch_seconds(data.get("TimeGenerated") or data.get("last_updated_time"))
         severity_id = map_severity_to_ocsf(data.get("Severity", "unknown"))
         
-        ocsf = OCSFFinding(
+        ocsf = FindingRecord(
             severity_id=severity_id,
             severity=get_severity_name(severity_id),
-            time=int(timestamp),
+            time=timestamp,
             finding={
                 "title": data.get("Title") or data.get("AlertDisplayName"),
                 "description": data.get("Description"),
@@ -199,7 +197,23 @@ class AzureSentinelStrategy(TransformationStrategy):
                 "provider_name": "Azure Sentinel"
             }
         )
-        return ocsf.dict()
+        return ocsf.to_dict()
+
+def _map_severity(value: Any) -> int:
+    return map_severity_to_ocsf(str(value))
+
+
+def _lowercase_string(value: Any) -> str:
+    return str(value).lower()
+
+
+# Named transformation functions usable in mapping rules
+TRANSFORMS: Dict[str, Callable[[Any], Any]] = {
+    "map_severity": _map_severity,
+    "lowercase_string": _lowercase_string,
+    "to_timestamp": to_epoch_seconds,
+}
+
 
 class ConfigurableStrategy(TransformationStrategy):
     """
@@ -208,6 +222,10 @@ class ConfigurableStrategy(TransformationStrategy):
     This allows adding new vendor mappings without changing code.
     The YAML file should define 'defaults' (like class_uid) and a list of 'rules'
     mapping input fields to output OCSF fields, optionally with transformation functions.
+    
+    The rules are compiled once at load time into a list of steps with pre-split
+    output paths and bound transform functions, so transforming a record only copies
+    fields.
     """
     
     def __init__(self, config_path: str):
@@ -215,100 +233,88 @@ class ConfigurableStrategy(TransformationStrategy):
         self._load_config()
         
     def _load_config(self):
-        """Load and parse the YAML configuration file."""
+        """Load and parse the YAML configuration file, then compile it."""
         if not os.path.exists(self.config_path):
             raise FileNotFoundError(f"Configuration file not found: {self.config_path}")
         with open(self.config_path, 'r') as f:
             self.config = yaml.safe_load(f)
-            
-    async def transform(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        rules = self.config.get("rules", [])
-        defaults = self.config.get("defaults", {})
+        self._compiled = self._compile(self.config)
+    
+    def _compile(self, config: Dict[str, Any]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+        """Build the specialized transform function for a mapping configuration."""
+        rules = config.get("rules", [])
+        defaults = config.get("defaults", {})
         
-        # Initialize OCSF structure based on class_uid
         class_uid = defaults.get("class_uid", 2002) # Default to Vulnerability Finding
+        class_name = defaults.get("class_name", "Vulnerability Finding")
+        source = defaults.get("source", "unknown")
         
-        # Base/Metadata construction
-        result = {
-            "class_uid": class_uid,
-            "class_name": defaults.get("class_name", "Vulnerability Finding"),
-            "metadata": {
-                "source": defaults.get("source", "unknown"),
-                "product": {"name": defaults.get("source", "unknown")},
-                "version": "1.1.0",
-                "profiles": ["security_control"]
-            }
-        }
+        # (input field, transform or None, parent path, leaf key)
+        steps: List[Tuple[str, Optional[Callable[[Any], Any]], Tuple[str, ...], str]] = []
+        for rule in rules:
+            func_name = rule.get("transform")
+            func = None
+            if func_name:
+                func = TRANSFORMS.get(func_name)
+                if func is None:
+                    # Unknown transforms pass values through unchanged
+                    logger.warning("Unknown mapping transform", transform=func_name, config=self.config_path)
+            *parents, leaf = rule["output"].split('.')
+            steps.append((rule.get("input"), func, tuple(parents), leaf))
         
-        # Add timestamp defaults
-        result["time"] = int(datetime.now().timestamp())
+        # Add connector_id if present in data but not ruled
+        copy_connector_id = not any(r["output"] == "metadata.connector_id" for r in rules)
+        finalize = self._finalize_structure
         
-        # Apply rules
-        for rule in rules:
-            input_field = rule.get("input")
-            output_path = rule.get("output")
-            transform_func = rule.get("transform")
+        def transform(data: Dict[str, Any]) -> Dict[str, Any]:
+            result = {
+                "class_uid": class_uid,
+                "class_name": class_name,
+                "metadata": {
+                    "source": source,
+                    "product": {"name": source},
+                    "version": "1.1.0",
+                    "profiles": ["security_control"]
+                },
+                "time": int(current_time()),
+            }
             
-            # Get value
-            value = data.get(input_field)
-            if value is None:
-                continue
-                
-            # Apply transformation
-            if transform_func:
-                value = self._apply_transform(transform_func, value)
-                
-            # Set value in result
-            self._set_nested(result, output_path, value)
+            for input_field, func, parents, leaf in steps:
+                value = data.get(input_field)
+                if value is None:
+                    continue
+                if func is not None:
+                    value = func(value)
+                target = result
+                for part in parents:
+                    target = target.setdefault(part, {})
+                target[leaf] = value
             
-        # Ensure mandatory fields
-        if "severity_id" not in result:
-             result["severity_id"] = 0
-             result["severity"] = "unknown"
-             
-        # Add connector_id if present in data but not ruled
-        if "connector_id" in data and not any(r["output"] == "metadata.connector_id" for r in rules):
-             if "metadata" not in result: result["metadata"] = {}
-             result["metadata"]["connector_id"] = data["connector_id"]
+            # Ensure mandatory fields
+            if "severity_id" not in result:
+                result["severity_id"] = 0
+                result["severity"] = "unknown"
+            
+            if copy_connector_id and "connector_id" in data:
+                result["metadata"]["connector_id"] = data["connector_id"]
+            
+            finalize(result)
+            return result
+        
+        return transform
+            
+    def transform_sync(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return self._compiled(data)
 
-        self._finalize_structure(result)
-        return result
+    def __getstate__(self) -> Dict[str, Any]:
+        # The compiled closure cannot be pickled; it is rebuilt from the config on load,
+        # so a worker process runs exactly the mapping the parent compiled
+        return {k: v for k, v in self.__dict__.items() if k != "_compiled"}
 
-    def _apply_transform(self, func_name: str, value: Any) -> Any:
-        """
-        Apply a named transformation function to a value.
-        
-        Supported functions:
-        - 'map_severity': Maps vendor severity strings/ints to OCSF severity IDs.
-        - 'lowercase_string': Converts string to lowercase.
-        - 'to_timestamp': Converts various date formats/timestamps to Unix epoch integer.
-        """
-        if func_name == "map_severity":
-            return map_severity_to_ocsf(str(value))
-        elif func_name == "lowercase_string":
-            return str(value).lower()
-        elif func_name == "to_timestamp":
-            if isinstance(value, (int, float)):
-                return int(value)
-            try:
-                # Basic ISO parsing
-                dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
-                return int(dt.timestamp())
-            except:
-                return int(datetime.now().timestamp())
-        return value
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._compiled = self._compile(self.config)
 
-    def _set_nested(self, d: Dict, path: str, value: Any):
-        """
-        Set a value in a nested dictionary using dot notation path.
-        
-        Example: path="metadata.product.name" sets d["metadata"]["product"]["name"] = value
-        """
-        parts = path.split('.')
-        for part in parts[:-1]:
-            d = d.setdefault(part, {})
-        d[parts[-1]] = value
-        
     def _finalize_structure(self, result: Dict):
         """Hook for any final structure adjustments."""
         pass
@@ -1,6 +1,6 @@
 """Data transformation engine for converting vendor-specific data to OCSF"""
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 import structlog
 from .ocsf_schema import (
@@ -18,14 +18,17 @@ from .ocsf_schema import (
     get_severity_name
 )
 from ..common.exceptions import NormalizationError, OCSFValidationError
+from ..common.config import settings
+from ..common.timestamps import batch_clock
+from .mapping_registry import MappingRegistry, MappingSnapshot
 from .strategies import (
+    TransformationStrategy,
     TenableStrategy,
     SplunkStrategy,
     AwsSecurityHubStrategy,
     CrowdStrikeStrategy,
     QualysStrategy,
-    AzureSentinelStrategy,
-    ConfigurableStrategy
+    AzureSentinelStrategy
 )
 import os
 
@@ -38,24 +41,27 @@ class TransformationEngine:
     
     This engine manages a collection of `TransformationStrategy` implementations.
     It supports both hardcoded strategies (for standard vendors) and dynamic YAML-based 
-    strategies loaded from `config/mappings/`.
+    strategies loaded from `config/mappings/`, which can be reloaded without a restart.
     
     Attributes:
-        transformers (Dict[str, TransformationStrategy]): Registry of loaded strategies.
+        registry (MappingRegistry): Versioned, hot-reloadable strategies by source.
+        transformers (Dict[str, TransformationStrategy]): Strategies of the current snapshot.
     """
     
-    def __init__(self):
+    def __init__(self, mapping_dir: Optional[str] = None):
         self.logger = logger
-        self.transformers = {}
-        self._load_strategies()
+        self._load_strategies(mapping_dir)
         
-    def _load_strategies(self):
+    def _load_strategies(self, mapping_dir: Optional[str] = None):
         """
         Load transformation strategies with precedence: YAML > Default.
         
         1. Defines default hardcoded strategies.
-        2. Scans `config/mappings/` for YAML files to create `ConfigurableStrategy` instances.
-        3. Registers defaults only if a YAML strategy for that source doesn't exist.
+        2. Hands them to a `MappingRegistry`, which compiles the YAML files in
+           `config/mappings/` (or `mapping_dir`) into `ConfigurableStrategy` instances.
+        3. Defaults are used only if a YAML strategy for that source doesn't exist.
+        
+        The registry keeps watching the directory once `start_watching` is called.
         """
         # 1. Load Hardcoded Strategies (Definitions)
         # We define them here but might overwrite if YAML exists
@@ -69,24 +75,22 @@ class TransformationEngine:
         }
         
         # 2. Check for YAML configurations
-        mapping_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "config", "mappings")
-        
-        if os.path.exists(mapping_dir):
-            for filename in os.listdir(mapping_dir):
-                if filename.endswith(".yaml") or filename.endswith(".yml"):
-                    source_name = os.path.splitext(filename)[0]
-                    config_path = os.path.join(mapping_dir, filename)
-                    try:
-                        self.transformers[source_name] = ConfigurableStrategy(config_path)
-                        self.logger.info("Loaded YAML strategy", source=source_name)
-                    except Exception as e:
-                        self.logger.error("Failed to load YAML strategy", source=source_name, error=str(e))
-        
-        # 3. Fill missing with defaults
-        for source, strategy in defaults.items():
-            if source not in self.transformers:
-                self.transformers[source] = strategy
-                self.logger.info("Loaded default strategy", source=source)
+        mapping_dir = mapping_dir or settings.mapping_dir or os.path.join(
+            os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "config", "mappings"
+        )
+        self.registry = MappingRegistry(mapping_dir, defaults)
+    
+    @property
+    def transformers(self) -> Dict[str, TransformationStrategy]:
+        """Strategies by source in the current mapping snapshot"""
+        return self.registry.snapshot.strategies
+    
+    async def start_watching(self):
+        """Start reloading changed mappings in the background"""
+        await self.registry.start()
+    
+    async def stop_watching(self):
+        await self.registry.stop()
     
     async def transform(self, source: str, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -115,6 +119,79 @@ class TransformationEngine:
         except Exception as e:
             self.logger.error("Transformation failed", source=source, error=str(e))
             raise NormalizationError(f"Failed to transform data from {source}: {e}")
+    
+    def transform_batch(
+        self, source: str, records: List[Dict[str, Any]], snapshot: Optional[MappingSnapshot] = None
+    ) -> Tuple[List[Optional[Dict[str, Any]]], Dict[int, NormalizationError]]:
+        """
+        Transform many records from one source in a single call.
+        
+        Runs the strategy's synchronous core in a loop, with no per-record coroutine
+        or log call. A failing record does not affect the others. The whole batch
+        uses one mapping snapshot, even if a reload lands while it runs.
+        
+        Args:
+            source: Source identifier (e.g., 'tenable', 'splunk'). Case-insensitive.
+            records: Raw vendor dictionaries.
+            snapshot: Mapping snapshot to use (default: the current one).
+            
+        Returns:
+            Tuple of the OCSF dictionaries in input order (None where a record failed)
+            and the errors keyed by record index.
+        """
+        snapshot = snapshot or self.registry.snapshot
+        transformer = snapshot.strategies.get(source.lower())
+        if not transformer:
+            error = NormalizationError(f"No transformer found for source: {source}")
+            return [None] * len(records), {idx: error for idx in range(len(records))}
+        
+        transform = transformer.transform_sync
+        results: List[Optional[Dict[str, Any]]] = []
+        errors: Dict[int, NormalizationError] = {}
+        # Records without a timestamp share one "now" per batch
+        with batch_clock():
+            for idx, data in enumerate(records):
+                try:
+                    results.append(transform(data))
+                except Exception as e:
+                    results.append(None)
+                    errors[idx] = NormalizationError(f"Failed to transform data from {source}: {e}")
+        
+        self.logger.info(
+            "Batch transformed", source=source, records=len(records), failed=len(errors), mapping_version=snapshot.version
+        )
+        return results, errors
+    
+    def transform_many(
+        self, records: List[Tuple[str, Dict[str, Any]]], snapshot: Optional[MappingSnapshot] = None
+    ) -> Tuple[List[Optional[Dict[str, Any]]], Dict[int, NormalizationError]]:
+        """
+        Transform `(source, data)` pairs from mixed sources.
+        
+        Records are grouped by source and each group goes through `transform_batch`,
+        all on the same mapping snapshot.
+        
+        Args:
+            records: `(source, data)` pairs.
+            snapshot: Mapping snapshot to use (default: the current one).
+        
+        Returns:
+            Same shape as `transform_batch`, indexed by position in `records`.
+        """
+        groups: Dict[str, List[int]] = {}
+        for idx, (source, _) in enumerate(records):
+            groups.setdefault(source.lower(), []).append(idx)
+        
+        snapshot = snapshot or self.registry.snapshot
+        results: List[Optional[Dict[str, Any]]] = [None] * len(records)
+        errors: Dict[int, NormalizationError] = {}
+        for source, indexes in groups.items():
+            group_results, group_errors = self.transform_batch(source, [records[idx][1] for idx in indexes], snapshot)
+            for idx, result in zip(indexes, group_results):
+                results[idx] = result
+            for pos, error in group_errors.items():
+                errors[indexes[pos]] = error
+        return results, errors
 
 
 # Global transformer instance
@@ -0,0 +1,150 @@
+"""Process pool that normalizes alert batches off the event loop"""
+
+import asyncio
+import math
+import multiprocessing
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import structlog
+from ..common.config import settings
+from ..common.exceptions import NormalizationError
+from .mapping_registry import MappingSnapshot
+from .transformer import transformer
+
+logger = structlog.get_logger(__name__)
+
+Records = List[Tuple[str, Dict[str, Any]]]
+BatchResult = Tuple[List[Optional[Dict[str, Any]]], Dict[int, NormalizationError]]
+PoolResult = Tuple[List[Optional[Dict[str, Any]]], Dict[int, NormalizationError], int]
+
+
+class NormalizationPool:
+    """
+    Normalizes `(source, data)` batches in worker processes.
+
+    Every batch is cut into one chunk per worker (at most `chunk_size` records each),
+    spread over the workers and merged back in input order, so output matches
+    `TransformationEngine.transform_many`. The event loop only awaits the results,
+    leaving it free for Kafka and graph I/O.
+
+    The parent takes one mapping snapshot per batch and sends its version with every
+    chunk, so all chunks of a batch run the same mapping version, whatever the
+    workers' own registries hold. Workers keep the snapshots they were sent by
+    version: they are loaded when the pool starts and shipped (and their YAML
+    strategies recompiled) again only for a version a worker has not seen. The
+    parent pickles each version once and reuses the payload for every worker.
+
+    With `workers` of 0 or 1, records are normalized in-process on the default
+    thread pool instead, which still keeps the loop from running them inline.
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: Optional[int] = None):
+        self.workers = settings.normalization_workers if workers is None else workers
+        self.chunk_size = chunk_size or settings.normalization_chunk_size
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # (version, pickled snapshot) of the latest snapshot shipped to the workers
+        self._payload: Optional[Tuple[int, bytes]] = None
+        self.logger = logger
+
+    async def transform_many(self, records: Records) -> PoolResult:
+        """
+        Normalize mixed-source records.
+
+        Returns:
+            Same results and errors as `TransformationEngine.transform_many`, and the
+            version of the mapping snapshot the whole batch was normalized with.
+        """
+        snapshot = transformer.registry.snapshot
+        if not records:
+            return [], {}, snapshot.version
+        loop = asyncio.get_running_loop()
+        if self.workers <= 1:
+            results, errors = await loop.run_in_executor(None, transformer.transform_many, records, snapshot)
+            return results, errors, snapshot.version
+
+        pool = self._get_pool(snapshot)
+        size = min(self.chunk_size, math.ceil(len(records) / self.workers))
+        starts = range(0, len(records), size)
+        chunks = await asyncio.gather(*(
+            self._transform_chunk(pool, records[start:start + size], snapshot)
+            for start in starts
+        ))
+
+        results: List[Optional[Dict[str, Any]]] = []
+        errors: Dict[int, NormalizationError] = {}
+        for start, (chunk_results, chunk_errors) in zip(starts, chunks):
+            results.extend(chunk_results)
+            for idx, error in chunk_errors.items():
+                errors[start + idx] = error
+        return results, errors, snapshot.version
+
+    async def _transform_chunk(
+        self, pool: ProcessPoolExecutor, records: Records, snapshot: MappingSnapshot
+    ) -> BatchResult:
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(pool, _transform_in_worker, records, snapshot.version)
+        if result is None:
+            # The worker has not seen this version yet (the mappings were reloaded)
+            result = await loop.run_in_executor(
+                pool, _transform_in_worker, records, snapshot.version, self._snapshot_payload(snapshot)
+            )
+        return result
+
+    def _snapshot_payload(self, snapshot: MappingSnapshot) -> bytes:
+        if self._payload is None or self._payload[0] != snapshot.version:
+            self._payload = (snapshot.version, pickle.dumps(snapshot))
+        return self._payload[1]
+
+    def _get_pool(self, snapshot: MappingSnapshot) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(snapshot.version, self._snapshot_payload(snapshot))
+            )
+            self.logger.info("Normalization worker pool started", workers=self.workers)
+        return self._pool
+
+    def close(self):
+        """Shut down the worker processes, if they were started"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+# Worker-side snapshots by version; only the newest few are kept, enough for the
+# batches still in flight when the mappings are reloaded
+_snapshots: Dict[int, MappingSnapshot] = {}
+_MAX_SNAPSHOTS = 2
+
+
+def _load(version: int, payload: bytes) -> MappingSnapshot:
+    # Unpickling recompiles the YAML strategies, so it only happens for a new version
+    snapshot = _snapshots[version] = pickle.loads(payload)
+    for stale in sorted(_snapshots)[:-_MAX_SNAPSHOTS]:
+        del _snapshots[stale]
+    return snapshot
+
+
+def _init_worker(version: int, payload: bytes):
+    """Process pool initializer: keep the parent's snapshot, compiled once per worker"""
+    _load(version, payload)
+
+
+def _transform_in_worker(
+    records: Records, version: int, payload: Optional[bytes] = None
+) -> Optional[BatchResult]:
+    """
+    Process pool entry point: normalize one chunk with the parent's mapping snapshot.
+
+    Returns None, without normalizing, if `version` is unknown here and its snapshot
+    was not sent; the parent then resends the chunk with it.
+    """
+    snapshot = _snapshots.get(version)
+    if snapshot is None:
+        if payload is None:
+            return None
+        snapshot = _load(version, payload)
+    return transformer.transform_many(records, snapshot)
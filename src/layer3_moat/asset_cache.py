@@ -0,0 +1,64 @@
+"""Bounded cache of asset identities to graph node IDs"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+from ..common.config import settings
+
+
+class AssetCache:
+    """
+    LRU cache mapping an asset identity (e.g. `(name, hostname)`) to its graph node ID.
+
+    Entries expire `ttl_seconds` after they were stored (0 disables expiry), and the
+    least recently used entry is evicted once `max_size` is exceeded.
+    Hit/miss counters are kept for observability.
+    """
+
+    def __init__(self, max_size: Optional[int] = None, ttl_seconds: Optional[float] = None):
+        self.max_size = max_size or settings.asset_cache_max_size
+        self.ttl_seconds = settings.asset_cache_ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[str, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[str]:
+        """Return the cached node ID for `key`, or None on a miss or expired entry"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            node_id, stored_at = entry
+            if not self.ttl_seconds or time.monotonic() - stored_at < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return node_id
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key: Hashable, node_id: str):
+        """Store a node ID, evicting the least recently used entry if full"""
+        self._entries[key] = (node_id, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        """Drop a single entry"""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop all entries"""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size and hit/miss counters"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,9 +1,15 @@
 """Contextualization service for enriching OCSF data with asset context"""
 
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
+import asyncio
+import hashlib
+import json
 import structlog
 from .graph_client import GraphClient, get_graph_client
+from .asset_cache import AssetCache
+from .write_behind import WriteBehindBuffer
 from ..common.exceptions import GraphDatabaseError
+from ..common.risk_scoring import risk_scoring_engine
 
 logger = structlog.get_logger(__name__)
 
@@ -20,8 +26,30 @@ class Contextualizer:
     def __init__(self, graph_client: Optional[GraphClient] = None):
         self.graph = graph_client or get_graph_client()
         self.logger = logger
+        self._write_behind: Optional[WriteBehindBuffer] = None
+        self.asset_cache = AssetCache()
+        self._asset_lookups: Dict[Tuple[Any, Any], asyncio.Future] = {}
+        self.asset_lookups_shared = 0
     
-    async def ingest_ocsf_data(self, ocsf_data: Dict[str, Any]) -> str:
+    async def start_write_behind(self):
+        """
+        Switch ingestion to write-behind mode.
+        
+        `ingest_ocsf_data` then only queues records; a background flusher writes them
+        through `ingest_ocsf_batch`. Call `stop_write_behind` on shutdown to flush.
+        """
+        if self._write_behind is None:
+            self._write_behind = WriteBehindBuffer(self.ingest_ocsf_batch)
+            await self._write_behind.start()
+    
+    async def stop_write_behind(self):
+        """Flush all buffered records and return to synchronous ingestion"""
+        buffer, self._write_behind = self._write_behind, None
+        if buffer:
+            self.logger.info("Flushing write-behind buffer", pending=buffer.pending())
+            await buffer.close()
+    
+    async def ingest_ocsf_data(self, ocsf_data: Dict[str, Any]) -> Optional[str]:
         """
         Main entry point for data ingestion.
         
@@ -30,12 +58,19 @@ class Contextualizer:
         Args:
             ocsf_data: Normalized OCSF dictionary.
             
+        In write-behind mode the record is queued without lingering and this returns
+        once the batch it was flushed in has been written (concurrent callers share
+        flushes).
+        
         Returns:
             str: The internal ID of the primary node created/updated in the graph.
             
         Raises:
             GraphDatabaseError: If ingestion fails at the database level.
         """
+        if self._write_behind is not None:
+            return await (await self._write_behind.put(ocsf_data, linger=False))
+        
         class_uid = ocsf_data.get("class_uid")
         source = ocsf_data.get("metadata", {}).get("source", "unknown")
         
@@ -53,41 +88,183 @@ class Contextualizer:
             self.logger.error("Failed to ingest OCSF data", error=str(e), class_uid=class_uid)
             raise GraphDatabaseError(f"Failed to ingest data: {e}")
     
+    async def queue_ocsf_data(
+        self, ocsf_data: Dict[str, Any], linger: bool = True
+    ) -> "asyncio.Future[Optional[str]]":
+        """
+        Start ingesting a record and return its acknowledgement.
+        
+        In write-behind mode this only waits for the record to be queued, so a caller
+        can queue many records in order and then await their acknowledgements, which
+        resolve once the records are written. Queue the last record with
+        `linger=False` so the tail of the batch is flushed without waiting for the
+        flush interval. Otherwise the record is ingested before returning and the
+        future is already done.
+        
+        Returns:
+            Future resolved with the primary node ID, or failed with the ingest error.
+        """
+        if self._write_behind is not None:
+            return await self._write_behind.put(ocsf_data, linger)
+        
+        ack = asyncio.get_running_loop().create_future()
+        try:
+            ack.set_result(await self.ingest_ocsf_data(ocsf_data))
+        except Exception as e:
+            ack.set_exception(e)
+        return ack
+    
+    async def ingest_ocsf_batch(self, records: List[Dict[str, Any]]) -> List[str]:
+        """
+        Ingest many OCSF records with one bulk write per node label and relationship type.
+        
+        Intended for flushing a buffer of normalized records; semantics per record match
+        `ingest_ocsf_data`.
+        
+        Args:
+            records: Normalized OCSF dictionaries.
+            
+        Returns:
+            List[str]: The primary node ID for each record, in input order.
+            
+        Raises:
+            GraphDatabaseError: If any bulk write fails.
+        """
+        if not records:
+            return []
+        
+        try:
+            node_ids: List[Optional[str]] = [None] * len(records)
+            by_label: Dict[str, List[int]] = {}
+            links: Dict[int, List[Tuple[str, str, Dict[str, Any]]]] = {}
+            for idx, ocsf_data in enumerate(records):
+                label = self._node_label(ocsf_data)
+                if label == "Asset":
+                    node_ids[idx] = await self._ensure_asset(ocsf_data.get("asset", {}))
+                    continue
+                by_label.setdefault(label, []).append(idx)
+                links[idx] = [
+                    (await self._ensure_asset(asset_data), rel_type, rel_props)
+                    for asset_data, rel_type, rel_props in self._asset_links(label, ocsf_data)
+                ]
+            
+            # Retried as a whole on transient errors, so it only writes into node_ids
+            async def write(uow: GraphClient):
+                for label, indexes in by_label.items():
+                    upserted = await uow.upsert_nodes_batch(label, [
+                        {
+                            "key": self._natural_key(label, records[idx]),
+                            "properties": self._node_properties(label, records[idx])
+                        }
+                        for idx in indexes
+                    ])
+                    for idx, node_id in zip(indexes, upserted):
+                        node_ids[idx] = node_id
+                
+                relationships: Dict[str, List[Dict[str, Any]]] = {}
+                for idx, record_links in links.items():
+                    for asset_id, rel_type, rel_props in record_links:
+                        relationships.setdefault(rel_type, []).append(
+                            {"from_id": asset_id, "to_id": node_ids[idx], "properties": rel_props}
+                        )
+                
+                for rel_type, rels in relationships.items():
+                    await uow.upsert_relationships_batch(rel_type, rels)
+            
+            await self.graph.run_in_unit_of_work(write)
+            
+            self.logger.info("Ingested OCSF batch", records=len(records))
+            return node_ids
+        except Exception as e:
+            self.logger.error("Failed to ingest OCSF batch", error=str(e), records=len(records))
+            raise GraphDatabaseError(f"Failed to ingest batch: {e}")
+    
     async def _ingest_vulnerability(self, ocsf_data: Dict[str, Any]) -> str:
         """Ingest vulnerability finding"""
-        vuln_data = ocsf_data.get("vulnerability", {})
-        asset_data = ocsf_data.get("asset")
-        
-        # Create vulnerability node
-        vuln_props = {
-            "cve": vuln_data.get("cve"),
-            "name": vuln_data.get("name"),
-            "description": vuln_data.get("description"),
-            "severity_id": ocsf_data.get("severity_id"),
-            "severity": ocsf_data.get("severity"),
-            "risk_score": self._calculate_risk_score(ocsf_data),
-            "source": ocsf_data.get("metadata", {}).get("source"),
-            "timestamp": ocsf_data.get("time"),
-        }
-        vuln_id = await self.graph.create_node("Vulnerability", vuln_props)
-        
-        # Link to asset if provided
-        if asset_data:
-            asset_id = await self._ensure_asset(asset_data)
-            await self.graph.create_relationship(
-                asset_id, 
-                vuln_id, 
-                "HAS_VULNERABILITY",
-                {"discovered_at": ocsf_data.get("time")}
-            )
-        
-        return vuln_id
+        return await self._ingest_node("Vulnerability", ocsf_data)
     
     async def _ingest_finding(self, ocsf_data: Dict[str, Any]) -> str:
         """Ingest security finding"""
-        finding_data = ocsf_data.get("finding", {})
+        return await self._ingest_node("Finding", ocsf_data)
+    
+    async def _ingest_node(self, label: str, ocsf_data: Dict[str, Any]) -> str:
+        """
+        Upsert the primary node for a record and link it to its assets.
+        
+        Nodes and relationships are merged on the record's natural key, so re-polling
+        the same finding updates it in place instead of duplicating it. The node and its
+        relationships are written in one unit of work (a single, retried transaction on Neo4j).
+        """
+        links = self._asset_links(label, ocsf_data)
+        # Assets are resolved before the unit of work opens: a cache miss commits on its own,
+        # so a lookup shared with concurrent ingests only ever hands out committed node IDs.
+        asset_ids = [await self._ensure_asset(asset_data) for asset_data, _, _ in links]
+        
+        async def write(uow: GraphClient) -> str:
+            node_id = await uow.upsert_node(
+                label, self._natural_key(label, ocsf_data), self._node_properties(label, ocsf_data)
+            )
+            for (_, rel_type, rel_props), asset_id in zip(links, asset_ids):
+                await uow.upsert_relationship(asset_id, node_id, rel_type, rel_props)
+            return node_id
+        
+        return await self.graph.run_in_unit_of_work(write)
+    
+    def _node_label(self, ocsf_data: Dict[str, Any]) -> str:
+        """Map an OCSF `class_uid` to the graph label of its primary node"""
+        class_uid = ocsf_data.get("class_uid")
+        if class_uid == 2002:  # Vulnerability Finding
+            return "Vulnerability"
+        elif class_uid == 1001:  # Asset Inventory
+            return "Asset"
+        # Finding and generic findings
+        return "Finding"
+    
+    def _natural_key(self, label: str, ocsf_data: Dict[str, Any]) -> str:
+        """
+        Build the stable identity of a Vulnerability or Finding across re-polls.
+        
+        Format: `<source>:<cve|uid>@<asset>[,<asset>...]`. When a record carries no
+        identifier, a digest of its descriptive fields is used instead.
+        """
+        source = ocsf_data.get("metadata", {}).get("source") or "unknown"
+        if label == "Vulnerability":
+            vuln_data = ocsf_data.get("vulnerability", {})
+            identifier = vuln_data.get("cve") or vuln_data.get("vuln_id") or vuln_data.get("name")
+            details = vuln_data
+        else:
+            finding_data = ocsf_data.get("finding", {})
+            identifier = finding_data.get("uid") or finding_data.get("title")
+            details = finding_data
+        
+        if identifier is None:
+            identifier = hashlib.sha1(
+                json.dumps(details, sort_keys=True, default=str).encode("utf-8")
+            ).hexdigest()
         
-        finding_props = {
+        assets = sorted(
+            f"{asset_data.get('name')}/{asset_data.get('hostname')}"
+            for asset_data, _, _ in self._asset_links(label, ocsf_data)
+        )
+        return f"{source}:{identifier}@{','.join(assets)}"
+    
+    def _node_properties(self, label: str, ocsf_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the property map for a Vulnerability or Finding node"""
+        if label == "Vulnerability":
+            vuln_data = ocsf_data.get("vulnerability", {})
+            return {
+                "cve": vuln_data.get("cve"),
+                "name": vuln_data.get("name"),
+                "description": vuln_data.get("description"),
+                "severity_id": ocsf_data.get("severity_id"),
+                "severity": ocsf_data.get("severity"),
+                "risk_score": self._calculate_risk_score(ocsf_data),
+                "source": ocsf_data.get("metadata", {}).get("source"),
+                "timestamp": ocsf_data.get("time"),
+            }
+        
+        finding_data = ocsf_data.get("finding", {})
+        return {
             "title": finding_data.get("title"),
             "description": finding_data.get("description"),
             "uid": finding_data.get("uid"),
@@ -97,20 +274,22 @@ class Contextualizer:
             "source": ocsf_data.get("metadata", {}).get("source"),
             "timestamp": ocsf_data.get("time"),
         }
-        finding_id = await self.graph.create_node("Finding", finding_props)
-        
-        # Link to resources if provided
-        resources = ocsf_data.get("resources", [])
-        for resource in resources:
-            resource_id = await self._ensure_asset(resource)
-            await self.graph.create_relationship(
-                resource_id,
-                finding_id,
-                "AFFECTED_BY",
-                {}
-            )
+    
+    def _asset_links(self, label: str, ocsf_data: Dict[str, Any]) -> List[Tuple[Dict[str, Any], str, Dict[str, Any]]]:
+        """
+        List the assets a primary node should be linked to.
+        
+        Returns:
+            List of (asset_data, relationship_type, relationship_properties) tuples.
+        """
+        if label == "Vulnerability":
+            asset_data = ocsf_data.get("asset")
+            if asset_data:
+                return [(asset_data, "HAS_VULNERABILITY", {"discovered_at": ocsf_data.get("time")})]
+            return []
         
-        return finding_id
+        resources = ocsf_data.get("resources") or []
+        return [(resource, "AFFECTED_BY", {}) for resource in resources]
     
     async def _ingest_asset(self, ocsf_data: Dict[str, Any]) -> str:
         """Ingest asset inventory data"""
@@ -122,10 +301,57 @@ class Contextualizer:
         Idempotently create or retrieve an Asset node.
         
         This is critical for linking findings to the correct resource.
-        It first checks for an existing node matching `name` and `hostname`.
-        If found, returns that ID; otherwise, creates a new node.
+        Identities are served from `asset_cache` when possible. On a miss, concurrent
+        callers for the same asset share a single in-flight lookup, so a new asset seen
+        by several alerts at once is only created once.
+        """
+        key = (asset_data.get("name"), asset_data.get("hostname"))
+        node_id = self.asset_cache.get(key)
+        if node_id is not None:
+            return node_id
+        
+        lookup = self._asset_lookups.get(key)
+        if lookup is None:
+            lookup = asyncio.ensure_future(self._lookup_or_create_asset(key, asset_data))
+            self._asset_lookups[key] = lookup
+            lookup.add_done_callback(lambda _: self._asset_lookups.pop(key, None))
+        else:
+            self.asset_lookups_shared += 1
+        # Shield so a cancelled caller does not abort a lookup other callers are waiting on
+        return await asyncio.shield(lookup)
+    
+    async def _lookup_or_create_asset(self, key: Tuple[Any, Any], asset_data: Dict[str, Any]) -> str:
         """
-        # Check if asset already exists
+        Find an Asset node matching `name` and `hostname`, creating it if missing.
+        
+        The `asset_identity` constraint makes a concurrent create of the same asset
+        (e.g. by another consumer process) fail; the loser re-reads the winner's node
+        instead of failing the record.
+        
+        The resulting node ID is stored in `asset_cache`.
+        """
+        node_id = await self._find_asset(asset_data)
+        if node_id is None:
+            asset_props = {
+                "name": asset_data.get("name"),
+                "hostname": asset_data.get("hostname"),
+                "ip_address": asset_data.get("ip"),
+                "asset_type": asset_data.get("type"),
+                "criticality": asset_data.get("criticality", "medium"),
+            }
+            try:
+                node_id = await self.graph.create_node("Asset", asset_props)
+            except Exception as e:
+                node_id = await self._find_asset(asset_data)
+                if node_id is None:
+                    raise
+                self.logger.info("Asset created concurrently, using existing node", node_id=node_id, error=str(e))
+        
+        self.asset_cache.put(key, node_id)
+        return node_id
+    
+    async def _find_asset(self, asset_data: Dict[str, Any]) -> Optional[str]:
+        """Return the ID of the Asset node with this `name` and `hostname`, if any"""
         query = (
             "MATCH (a:Asset {name: $name, hostname: $hostname}) "
             "RETURN id(a) as node_id LIMIT 1"
@@ -134,23 +360,14 @@ class Contextualizer:
             "name": asset_data.get("name"),
             "hostname": asset_data.get("hostname")
         })
-        
-        if results:
-            return str(results[0]["node_id"])
-        
-        # Create new asset
-        asset_props = {
-            "name": asset_data.get("name"),
-            "hostname": asset_data.get("hostname"),
-            "ip_address": asset_data.get("ip"),
-            "asset_type": asset_data.get("type"),
-            "criticality": asset_data.get("criticality", "medium"),
-        }
-        return await self.graph.create_node("Asset", asset_props)
+        return str(results[0]["node_id"]) if results else None
     
     def _calculate_risk_score(self, ocsf_data: Dict[str, Any]) -> int:
         """
-        Calculate risk score from OCSF data
+        Calculate the undecayed risk score stored on the node
+        
+        Decay depends on when the score is read, so it is applied by
+        `composite_batch` during the agentic cycle rather than frozen in at ingest.
         
         Args:
             ocsf_data: OCSF data dictionary
@@ -158,15 +375,7 @@ class Contextualizer:
         Returns:
             Risk score (0-10)
         """
-        severity_id = ocsf_data.get("severity_id", 0)
-        base_score = severity_id  # OCSF severity_id maps well to risk
-        
-        # Add source-specific adjustments
-        source = ocsf_data.get("metadata", {}).get("source", "")
-        if "critical" in source.lower():
-            base_score = min(10, base_score + 1)
-        
-        return min(10, max(0, base_score))
+        return risk_scoring_engine.calculate_risk_score(ocsf_data, decay=False)
     
     async def enrich_with_context(self, node_id: str) -> Dict[str, Any]:
         """Enrich a node with contextual information from the graph"""
@@ -185,6 +394,22 @@ class Contextualizer:
         return {}
 
 
-# Global contextualizer instance
-contextualizer = Contextualizer()
+# Global contextualizer instance, built on first use: constructing it opens the graph
+# client, which must not happen as a side effect of importing this module.
+_contextualizer: Optional[Contextualizer] = None
+
+
+def get_contextualizer() -> Contextualizer:
+    """Return the process-wide contextualizer, creating it (and its graph client) on first call"""
+    global _contextualizer
+    if _contextualizer is None:
+        _contextualizer = Contextualizer()
+    return _contextualizer
+
+
+def __getattr__(name: str):
+    # Keeps `from .contextualizer import contextualizer` working without an import-time build
+    if name == "contextualizer":
+        return get_contextualizer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
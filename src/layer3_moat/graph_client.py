@@ -1,13 +1,17 @@
 """Graph database client for Neo4j and Amazon Neptune"""
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, AsyncIterator, Awaitable, Callable, TypeVar
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+import asyncio
+import time
 import structlog
 try:
     from gremlin_python.driver.driver_remote_connection import DriverRemoteConnection
     from gremlin_python.structure.graph import Graph
     from gremlin_python.process.graph_traversal import __
-    from gremlin_python.process.traversal import T, P, Order
+    from gremlin_python.process.traversal import T, P, Order, Cardinality
 except ImportError:
     pass # Handle in __init__ if needed
 from ..common.exceptions import GraphDatabaseError
@@ -15,6 +19,11 @@ from ..common.config import settings
 
 logger = structlog.get_logger(__name__)
 
+T = TypeVar("T")
+
+# Labels written by the Contextualizer and scanned by the agentic cycle
+RISK_LABELS = ("Asset", "Vulnerability", "Finding")
+
 
 class GraphClient(ABC):
     """
@@ -49,6 +58,97 @@ class GraphClient(ABC):
         """Create a relationship between nodes"""
         pass
     
+    @abstractmethod
+    async def create_nodes_batch(self, label: str, properties_list: List[Dict[str, Any]]) -> List[str]:
+        """
+        Create many nodes sharing a label in a single bulk write.
+        
+        Args:
+            label: The label applied to every node.
+            properties_list: One property dictionary per node.
+            
+        Returns:
+            List[str]: IDs of the created nodes, in the same order as `properties_list`.
+        """
+        pass
+    
+    @abstractmethod
+    async def create_relationships_batch(
+        self, rel_type: str, relationships: List[Dict[str, Any]]
+    ) -> List[Optional[str]]:
+        """
+        Create many relationships of one type in a single bulk write.
+        
+        Args:
+            rel_type: The relationship type (e.g., 'HAS_VULNERABILITY').
+            relationships: Dicts with `from_id`, `to_id` and optional `properties`.
+            
+        Returns:
+            List[Optional[str]]: IDs of the created relationships, aligned with
+            `relationships`; None where an endpoint node was not found.
+        """
+        pass
+    
+    @abstractmethod
+    async def upsert_node(self, label: str, key: str, properties: Dict[str, Any]) -> str:
+        """
+        Create or update the node identified by a stable natural key.
+        
+        The node is matched on `(label, natural_key)`. If it exists, `properties` and
+        `updated_at` are updated in place; otherwise the node is created.
+        
+        Args:
+            label: The node label.
+            key: The natural key (e.g. source + uid/cve + asset).
+            properties: Properties to set on the node.
+            
+        Returns:
+            str: The ID of the created or updated node.
+        """
+        pass
+    
+    @abstractmethod
+    async def upsert_nodes_batch(self, label: str, rows: List[Dict[str, Any]]) -> List[str]:
+        """
+        Bulk variant of `upsert_node`.
+        
+        Args:
+            label: The label shared by all nodes.
+            rows: Dicts with `key` and `properties`.
+            
+        Returns:
+            List[str]: Node IDs in input order.
+        """
+        pass
+    
+    @abstractmethod
+    async def upsert_relationship(
+        self, 
+        from_id: str, 
+        to_id: str, 
+        rel_type: str, 
+        properties: Optional[Dict] = None
+    ) -> str:
+        """Create a relationship between nodes unless one of the same type already exists"""
+        pass
+    
+    @abstractmethod
+    async def upsert_relationships_batch(
+        self, rel_type: str, relationships: List[Dict[str, Any]]
+    ) -> List[Optional[str]]:
+        """
+        Bulk variant of `upsert_relationship`.
+        
+        Args:
+            rel_type: The relationship type.
+            relationships: Dicts with `from_id`, `to_id` and optional `properties`.
+            
+        Returns:
+            List[Optional[str]]: Relationship IDs aligned with `relationships`; None
+            where an endpoint node was not found.
+        """
+        pass
+    
     @abstractmethod
     async def query(self, query: str, parameters: Optional[Dict] = None) -> List[Dict[str, Any]]:
         """Execute a query and return results"""
@@ -65,6 +165,26 @@ class GraphClient(ABC):
         """
         pass
     
+    @abstractmethod
+    def iter_high_risk_nodes(
+        self,
+        threshold: int = 7,
+        time_window: Optional[float] = None,
+        page_size: Optional[int] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream high-risk nodes page by page instead of materializing all of them.
+        
+        Args:
+            threshold: Risk score threshold
+            time_window: Only return nodes updated after this timestamp
+            page_size: Nodes per page (default: `graph_page_size`)
+            
+        Yields:
+            Pages of `{"node_id": str, "data": dict, "labels": list}` dicts.
+        """
+        pass
+    
     @abstractmethod
     async def find_shortest_path(self, start_node_id: str, end_node_id: str, max_depth: int = 5) -> List[Dict[str, Any]]:
         """
@@ -84,6 +204,50 @@ class GraphClient(ABC):
     async def health_check(self) -> bool:
         """Check database health"""
         pass
+    
+    async def ensure_schema(self) -> None:
+        """
+        Idempotently create the indexes and constraints the hot queries rely on.
+        
+        Backends without user-managed schema keep this default no-op.
+        """
+        pass
+    
+    @asynccontextmanager
+    async def unit_of_work(self) -> AsyncIterator["GraphClient"]:
+        """
+        Group several calls into one unit of work.
+        
+        Usage:
+            async with graph.unit_of_work() as uow:
+                node_id = await uow.upsert_node(...)
+                await uow.upsert_relationship(...)
+        
+        Backends with explicit transactions yield a client bound to a single transaction.
+        This default yields the client itself, so each call commits on its own.
+        
+        The block cannot be replayed, so transient failures are not retried; prefer
+        `run_in_unit_of_work` for writes.
+        """
+        yield self
+    
+    async def run_in_unit_of_work(self, work: Callable[["GraphClient"], Awaitable[T]]) -> T:
+        """
+        Run `work(uow)` as one unit of work and return its result.
+        
+        Usage:
+            async def write(uow):
+                node_id = await uow.upsert_node(...)
+                await uow.upsert_relationship(...)
+                return node_id
+            
+            node_id = await graph.run_in_unit_of_work(write)
+        
+        Backends with managed transactions retry the whole of `work` on transient
+        errors (e.g. deadlocks), so it must be safe to run more than once.
+        """
+        async with self.unit_of_work() as uow:
+            return await work(uow)
 
 
 class Neo4jClient(GraphClient):
@@ -92,6 +256,9 @@ class Neo4jClient(GraphClient):
     
     Executes Cypher queries directly against the database.
     Suitable for local development or on-premise deployments.
+    
+    All calls share the driver's connection pool (sized via `neo4j_max_connection_pool_size`).
+    Use `run_in_unit_of_work()` to run several calls in one managed, retried transaction.
     """
     
     def __init__(self):
@@ -103,18 +270,66 @@ class Neo4jClient(GraphClient):
         self.uri = settings.neo4j_uri or "bolt://localhost:7687"
         self.user = settings.neo4j_user or "neo4j"
         self.password = settings.neo4j_password or "password"
-        self.driver = AsyncGraphDatabase.driver(self.uri, auth=(self.user, self.password))
+        self.driver = AsyncGraphDatabase.driver(
+            self.uri,
+            auth=(self.user, self.password),
+            max_connection_pool_size=settings.neo4j_max_connection_pool_size,
+            connection_acquisition_timeout=settings.neo4j_connection_acquisition_timeout,
+            max_connection_lifetime=settings.neo4j_max_connection_lifetime,
+        )
         self.logger = logger.bind(backend="neo4j")
     
+    @asynccontextmanager
+    async def unit_of_work(self) -> AsyncIterator["GraphClient"]:
+        """
+        Open one session and one explicit transaction for a group of calls.
+        
+        Yields a `Neo4jUnitOfWork` exposing the regular client API bound to the transaction.
+        The transaction commits when the block exits normally and rolls back on error.
+        """
+        async with self.driver.session() as session:
+            async with await session.begin_transaction() as tx:
+                yield Neo4jUnitOfWork(self, tx)
+    
+    async def run_in_unit_of_work(self, work: Callable[["GraphClient"], Awaitable[T]]) -> T:
+        """
+        Run `work` in a managed write transaction.
+        
+        The driver retries the transaction function on transient errors (deadlocks,
+        leader switches), replaying the whole unit of work on a fresh transaction.
+        """
+        async with self.driver.session() as session:
+            return await session.execute_write(self._run_work, work)
+    
+    async def _run_work(self, tx: Any, work: Callable[["GraphClient"], Awaitable[T]]) -> T:
+        """Transaction function binding `work` to the managed transaction"""
+        return await work(Neo4jUnitOfWork(self, tx))
+    
+    async def _execute(self, query: str, parameters: Dict[str, Any], write: bool = True) -> List[Any]:
+        """
+        Run a statement and collect its records.
+        
+        Writes run as a managed (retryable) write transaction; reads use an auto-commit query.
+        """
+        async with self.driver.session() as session:
+            if write:
+                return await session.execute_write(self._collect, query, parameters)
+            result = await session.run(query, parameters)
+            return [record async for record in result]
+    
+    @staticmethod
+    async def _collect(tx, query: str, parameters: Dict[str, Any]) -> List[Any]:
+        """Transaction function running a single statement"""
+        result = await tx.run(query, parameters)
+        return [record async for record in result]
+    
     async def create_node(self, label: str, properties: Dict[str, Any]) -> str:
         """Create a node in Neo4j"""
-        async with self.driver.session() as session:
-            query = f"CREATE (n:{label} $props) RETURN id(n) as node_id"
-            result = await session.run(query, props=properties)
-            record = await result.single()
-            node_id = str(record["node_id"]) if record else None
-            self.logger.info("Node created", label=label, node_id=node_id)
-            return node_id
+        query = f"CREATE (n:{label} $props) SET n.updated_at = $now RETURN id(n) as node_id"
+        records = await self._execute(query, {"props": properties, "now": time.time()})
+        node_id = str(records[0]["node_id"]) if records else None
+        self.logger.info("Node created", label=label, node_id=node_id)
+        return node_id
     
     async def create_relationship(
         self, 
@@ -124,53 +339,239 @@ class Neo4jClient(GraphClient):
         properties: Optional[Dict] = None
     ) -> str:
         """Create a relationship in Neo4j"""
-        async with self.driver.session() as session:
-            query = (
-                f"MATCH (a), (b) "
-                f"WHERE id(a) = $from_id AND id(b) = $to_id "
-                f"CREATE (a)-[r:{rel_type} $props]->(b) "
-                f"RETURN id(r) as rel_id"
-            )
-            props = properties or {}
-            result = await session.run(
-                query, 
-                from_id=int(from_id), 
-                to_id=int(to_id), 
-                props=props
-            )
-            record = await result.single()
-            rel_id = str(record["rel_id"]) if record else None
-            self.logger.info("Relationship created", rel_type=rel_type, rel_id=rel_id)
-            return rel_id
+        query = (
+            f"MATCH (a), (b) "
+            f"WHERE id(a) = $from_id AND id(b) = $to_id "
+            f"CREATE (a)-[r:{rel_type} $props]->(b) "
+            f"RETURN id(r) as rel_id"
+        )
+        records = await self._execute(query, {
+            "from_id": int(from_id),
+            "to_id": int(to_id),
+            "props": properties or {}
+        })
+        rel_id = str(records[0]["rel_id"]) if records else None
+        self.logger.info("Relationship created", rel_type=rel_type, rel_id=rel_id)
+        return rel_id
+    
+    async def create_nodes_batch(self, label: str, properties_list: List[Dict[str, Any]]) -> List[str]:
+        """Create nodes in Neo4j with a single `UNWIND` statement in one transaction"""
+        if not properties_list:
+            return []
+        query = (
+            f"UNWIND $rows AS row "
+            f"CREATE (n:{label}) SET n = row, n.updated_at = $now "
+            f"RETURN id(n) as node_id"
+        )
+        records = await self._execute(query, {"rows": properties_list, "now": time.time()})
+        node_ids = [str(record["node_id"]) for record in records]
+        self.logger.info("Nodes created", label=label, count=len(node_ids))
+        return node_ids
+    
+    async def create_relationships_batch(
+        self, rel_type: str, relationships: List[Dict[str, Any]]
+    ) -> List[Optional[str]]:
+        """Create relationships in Neo4j with a single `UNWIND` statement in one transaction"""
+        if not relationships:
+            return []
+        query = (
+            f"UNWIND range(0, size($rows) - 1) AS i "
+            f"WITH i, $rows[i] AS row "
+            f"MATCH (a), (b) "
+            f"WHERE id(a) = row.from_id AND id(b) = row.to_id "
+            f"CREATE (a)-[r:{rel_type}]->(b) SET r = row.props "
+            f"RETURN i, id(r) as rel_id"
+        )
+        records = await self._execute(query, {"rows": self._relationship_rows(relationships)})
+        rel_ids = self._aligned_rel_ids(records, len(relationships))
+        self.logger.info("Relationships created", rel_type=rel_type, count=len(records), missed=len(rel_ids) - len(records))
+        return rel_ids
+    
+    async def upsert_node(self, label: str, key: str, properties: Dict[str, Any]) -> str:
+        """Upsert a node in Neo4j with `MERGE` on its natural key"""
+        node_ids = await self.upsert_nodes_batch(label, [{"key": key, "properties": properties}])
+        return node_ids[0] if node_ids else None
+    
+    async def upsert_nodes_batch(self, label: str, rows: List[Dict[str, Any]]) -> List[str]:
+        """Upsert nodes in Neo4j with a single `UNWIND ... MERGE` statement in one transaction"""
+        if not rows:
+            return []
+        query = (
+            f"UNWIND $rows AS row "
+            f"MERGE (n:{label} {{natural_key: row.key}}) "
+            f"ON CREATE SET n.created_at = $now "
+            f"SET n += row.props, n.updated_at = $now "
+            f"RETURN id(n) as node_id"
+        )
+        params = [{"key": row["key"], "props": row.get("properties") or {}} for row in rows]
+        records = await self._execute(query, {"rows": params, "now": time.time()})
+        node_ids = [str(record["node_id"]) for record in records]
+        self.logger.info("Nodes upserted", label=label, count=len(node_ids))
+        return node_ids
+    
+    async def upsert_relationship(
+        self, 
+        from_id: str, 
+        to_id: str, 
+        rel_type: str, 
+        properties: Optional[Dict] = None
+    ) -> str:
+        """Upsert a relationship in Neo4j with `MERGE`"""
+        rel_ids = await self.upsert_relationships_batch(
+            rel_type, [{"from_id": from_id, "to_id": to_id, "properties": properties}]
+        )
+        return rel_ids[0] if rel_ids else None
+    
+    async def upsert_relationships_batch(
+        self, rel_type: str, relationships: List[Dict[str, Any]]
+    ) -> List[Optional[str]]:
+        """Upsert relationships in Neo4j with a single `UNWIND ... MERGE` statement in one transaction"""
+        if not relationships:
+            return []
+        query = (
+            f"UNWIND range(0, size($rows) - 1) AS i "
+            f"WITH i, $rows[i] AS row "
+            f"MATCH (a), (b) "
+            f"WHERE id(a) = row.from_id AND id(b) = row.to_id "
+            f"MERGE (a)-[r:{rel_type}]->(b) "
+            f"SET r += row.props "
+            f"RETURN i, id(r) as rel_id"
+        )
+        records = await self._execute(query, {"rows": self._relationship_rows(relationships)})
+        rel_ids = self._aligned_rel_ids(records, len(relationships))
+        self.logger.info("Relationships upserted", rel_type=rel_type, count=len(records), missed=len(rel_ids) - len(records))
+        return rel_ids
+    
+    @staticmethod
+    def _aligned_rel_ids(records: List[Any], count: int) -> List[Optional[str]]:
+        """Place `(i, rel_id)` records at their input index; rows whose MATCH failed stay None"""
+        rel_ids: List[Optional[str]] = [None] * count
+        for record in records:
+            rel_ids[record["i"]] = str(record["rel_id"])
+        return rel_ids
+    
+    @staticmethod
+    def _relationship_rows(relationships: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Convert relationship dicts into `UNWIND` parameter rows"""
+        return [
+            {
+                "from_id": int(rel["from_id"]),
+                "to_id": int(rel["to_id"]),
+                "props": rel.get("properties") or {}
+            }
+            for rel in relationships
+        ]
     
     async def query(self, query: str, parameters: Optional[Dict] = None) -> List[Dict[str, Any]]:
         """Execute a Cypher query"""
+        records = await self._execute(query, parameters or {}, write=False)
+        return [dict(record) for record in records]
+    
+    async def ensure_schema(self) -> None:
+        """
+        Create range indexes and uniqueness constraints for the hot query paths.
+        
+        - `risk_score` and `updated_at` range indexes per label (high-risk scans).
+        - Uniqueness on `natural_key` for Vulnerability/Finding (upserts).
+        - Uniqueness on `(name, hostname)` for Asset (asset lookups).
+        
+        All statements use `IF NOT EXISTS`, so this is safe to run on every startup.
+        """
+        statements = []
+        for label in RISK_LABELS:
+            name = label.lower()
+            statements.append(
+                f"CREATE INDEX {name}_risk_score IF NOT EXISTS FOR (n:{label}) ON (n.risk_score)"
+            )
+            statements.append(
+                f"CREATE INDEX {name}_updated_at IF NOT EXISTS FOR (n:{label}) ON (n.updated_at)"
+            )
+        for label in ("Vulnerability", "Finding"):
+            statements.append(
+                f"CREATE CONSTRAINT {label.lower()}_natural_key IF NOT EXISTS "
+                f"FOR (n:{label}) REQUIRE n.natural_key IS UNIQUE"
+            )
+        statements.append(
+            "CREATE CONSTRAINT asset_identity IF NOT EXISTS "
+            "FOR (n:Asset) REQUIRE (n.name, n.hostname) IS UNIQUE"
+        )
+        
+        failed = 0
         async with self.driver.session() as session:
-            result = await session.run(query, parameters or {})
-            records = []
-            async for record in result:
-                records.append(dict(record))
-            return records
+            for statement in statements:
+                try:
+                    result = await session.run(statement)
+                    await result.consume()
+                except Exception as e:
+                    # e.g. a uniqueness constraint over pre-existing duplicates
+                    failed += 1
+                    self.logger.warning("Schema statement failed", statement=statement, error=str(e))
+        self.logger.info("Graph schema ensured", statements=len(statements), failed=failed)
     
     async def find_high_risk_nodes(self, threshold: int = 7, time_window: Optional[float] = None) -> List[Dict[str, Any]]:
-        """Find nodes with risk_score >= threshold, optionally filtered by update time"""
-        query_parts = [
-            "MATCH (n)",
-            "WHERE n.risk_score >= $threshold"
-        ]
+        """
+        Find nodes with risk_score >= threshold, optionally filtered by update time.
         
+        Runs one labelled branch per entry in `RISK_LABELS` (combined with `UNION ALL`) so the
+        planner can use the per-label `risk_score`/`updated_at` indexes instead of a
+        label-less scan.
+        """
         params = {"threshold": threshold}
+        predicate = "n.risk_score >= $threshold"
         
         if time_window:
-            query_parts.append("AND n.updated_at >= $time_window")
+            predicate += " AND n.updated_at >= $time_window"
             params["time_window"] = time_window
-            
-        query_parts.append("RETURN n, labels(n) as labels, id(n) as node_id")
-        query_parts.append("ORDER BY n.risk_score DESC")
         
-        query = " ".join(query_parts)
+        branches = " UNION ALL ".join(
+            f"MATCH (n:{label}) WHERE {predicate} RETURN n" for label in RISK_LABELS
+        )
+        query = (
+            f"CALL {{ {branches} }} "
+            f"RETURN n, labels(n) as labels, id(n) as node_id "
+            f"ORDER BY n.risk_score DESC"
+        )
         results = await self.query(query, params)
         return results
+    
+    async def iter_high_risk_nodes(
+        self,
+        threshold: int = 7,
+        time_window: Optional[float] = None,
+        page_size: Optional[int] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream high-risk nodes label by label using keyset pagination on the node id.
+        
+        Each page is a bounded `... AND id(n) > $after ORDER BY id(n) LIMIT $limit` query,
+        so memory stays proportional to `page_size` regardless of graph size.
+        """
+        page_size = page_size or settings.graph_page_size
+        predicate = "n.risk_score >= $threshold AND id(n) > $after"
+        params: Dict[str, Any] = {"threshold": threshold, "limit": page_size}
+        
+        if time_window:
+            predicate += " AND n.updated_at >= $time_window"
+            params["time_window"] = time_window
+        
+        for label in RISK_LABELS:
+            query = (
+                f"MATCH (n:{label}) WHERE {predicate} "
+                f"RETURN n, labels(n) as labels, id(n) as node_id "
+                f"ORDER BY node_id LIMIT $limit"
+            )
+            after = -1
+            while True:
+                records = await self.query(query, {**params, "after": after})
+                if not records:
+                    break
+                yield [
+                    {"node_id": str(r["node_id"]), "data": dict(r["n"]), "labels": r["labels"]}
+                    for r in records
+                ]
+                if len(records) < page_size:
+                    break
+                after = records[-1]["node_id"]
         
     async def find_shortest_path(self, start_node_id: str, end_node_id: str, max_depth: int = 5) -> List[Dict[str, Any]]:
         """Find shortest path using Cypher"""
@@ -202,6 +603,44 @@ class Neo4jClient(GraphClient):
         await self.driver.close()
 
 
+class Neo4jUnitOfWork(Neo4jClient):
+    """
+    A `Neo4jClient` view bound to one explicit transaction.
+    
+    Every call runs on the shared transaction instead of opening its own session, so a
+    group of reads and writes costs one session and commits atomically.
+    Obtained from `Neo4jClient.unit_of_work()` or `run_in_unit_of_work()`; never
+    constructed directly.
+    """
+    
+    def __init__(self, client: Neo4jClient, tx: Any):
+        # Share the parent's driver and pool rather than creating a new driver
+        self.uri = client.uri
+        self.user = client.user
+        self.password = client.password
+        self.driver = client.driver
+        self.logger = client.logger
+        self._tx = tx
+    
+    @asynccontextmanager
+    async def unit_of_work(self) -> AsyncIterator["GraphClient"]:
+        """Nested units of work join the enclosing transaction"""
+        yield self
+    
+    async def run_in_unit_of_work(self, work: Callable[["GraphClient"], Awaitable[T]]) -> T:
+        """Nested units of work join the enclosing transaction"""
+        return await work(self)
+    
+    async def _execute(self, query: str, parameters: Dict[str, Any], write: bool = True) -> List[Any]:
+        """Run a statement on the bound transaction"""
+        result = await self._tx.run(query, parameters)
+        return [record async for record in result]
+    
+    async def close(self):
+        """The driver is owned by the parent client"""
+        pass
+
+
 def get_graph_client() -> GraphClient:
     """
     Factory function to get the appropriate graph client
@@ -220,6 +659,12 @@ class NeptuneClient(GraphClient):
     Security Note:
         - Raw string query execution is intentionally DISABLED to prevent validation/injection attacks.
         - All queries must be constructed using the Traversal API (`self.g.V()...`).
+    
+    Concurrency:
+        gremlinpython's remote traversal terminals (`next()`, `toList()`) block the calling
+        thread. They are submitted to a dedicated, bounded thread pool
+        (`neptune_max_workers`) so the event loop stays responsive; the driver's
+        connection pool is sized to match.
     """
     
     def __init__(self):
@@ -233,31 +678,31 @@ class NeptuneClient(GraphClient):
         self.port = settings.neptune_port or 8182
         self.url = f"ws://{self.endpoint}:{self.port}/gremlin"
         
+        self.max_workers = settings.neptune_max_workers
+        
         try:
-            self.remote_connection = DriverRemoteConnection(self.url, 'g')
+            self.remote_connection = DriverRemoteConnection(self.url, 'g', pool_size=self.max_workers)
             self.graph = Graph()
             self.g = self.graph.traversal().withRemote(self.remote_connection)
             self.logger = logger.bind(backend="neptune")
         except Exception as e:
             raise GraphDatabaseError(f"Failed to connect to Neptune: {e}")
+        
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="neptune")
+
+    async def _submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking Gremlin call on the Neptune thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
 
     async def create_node(self, label: str, properties: Dict[str, Any]) -> str:
         """Create a node in Neptune"""
         try:
-            # Note: Gremlin is often synchronous in python driver unless using aiohttp transport explicitly configured
-            # But here we assume standard driver usage. For true async, we might need to wrap in executor
-            # For this implementation, we'll try to use the traversal api
-            
             t = self.g.addV(label)
-            for k, v in properties.items():
+            for k, v in {**properties, "updated_at": time.time()}.items():
                 t = t.property(k, v)
             
-            # Add updated_at if not present
-            if "updated_at" not in properties:
-                import time
-                t = t.property("updated_at", time.time())
-                
-            element = t.next()
+            element = await self._submit(t.next)
             node_id = str(element.id)
             self.logger.info("Node created", label=label, node_id=node_id)
             return node_id
@@ -280,7 +725,7 @@ class NeptuneClient(GraphClient):
                 for k, v in properties.items():
                     t = t.property(k, v)
                     
-            element = t.next()
+            element = await self._submit(t.next)
             rel_id = str(element.id)
             self.logger.info("Relationship created", rel_type=rel_type, rel_id=rel_id)
             return rel_id
@@ -288,6 +733,169 @@ class NeptuneClient(GraphClient):
             self.logger.error("Failed to create relationship", error=str(e))
             raise GraphDatabaseError(f"Neptune relationship creation failed: {e}")
 
+    async def create_nodes_batch(self, label: str, properties_list: List[Dict[str, Any]]) -> List[str]:
+        """
+        Create nodes in Neptune using chained `addV` steps.
+        
+        Each chunk of `neptune_batch_size` vertices is sent as a single traversal.
+        """
+        try:
+            node_ids = []
+            for chunk in self._chunks(properties_list):
+                t = self.g
+                keys = []
+                now = time.time()
+                for idx, properties in enumerate(chunk):
+                    t = t.addV(label)
+                    for k, v in {**properties, "updated_at": now}.items():
+                        t = t.property(k, v)
+                    keys.append(f"v{idx}")
+                    t = t.as_(keys[-1])
+                node_ids.extend(await self._submit(self._select_ids, t, keys))
+            self.logger.info("Nodes created", label=label, count=len(node_ids))
+            return node_ids
+        except Exception as e:
+            self.logger.error("Failed to create nodes", error=str(e))
+            raise GraphDatabaseError(f"Neptune batch node creation failed: {e}")
+
+    async def create_relationships_batch(self, rel_type: str, relationships: List[Dict[str, Any]]) -> List[str]:
+        """
+        Create relationships in Neptune using chained `V().addE()` steps.
+        
+        Each chunk of `neptune_batch_size` edges is sent as a single traversal.
+        """
+        try:
+            rel_ids = []
+            for chunk in self._chunks(relationships):
+                t = self.g
+                keys = []
+                for idx, rel in enumerate(chunk):
+                    t = t.V(rel["from_id"]).addE(rel_type).to(__.V(rel["to_id"]))
+                    for k, v in (rel.get("properties") or {}).items():
+                        t = t.property(k, v)
+                    keys.append(f"e{idx}")
+                    t = t.as_(keys[-1])
+                rel_ids.extend(await self._submit(self._select_ids, t, keys))
+            self.logger.info("Relationships created", rel_type=rel_type, count=len(rel_ids))
+            return rel_ids
+        except Exception as e:
+            self.logger.error("Failed to create relationships", error=str(e))
+            raise GraphDatabaseError(f"Neptune batch relationship creation failed: {e}")
+
+    async def upsert_node(self, label: str, key: str, properties: Dict[str, Any]) -> str:
+        """Upsert a node in Neptune using the `fold()/coalesce()` pattern"""
+        try:
+            now = time.time()
+            t = self.g.V().has(label, "natural_key", key).fold().coalesce(
+                __.unfold(),
+                __.addV(label).property("natural_key", key).property("created_at", now)
+            )
+            for k, v in properties.items():
+                t = t.property(Cardinality.single, k, v)
+            t = t.property(Cardinality.single, "updated_at", now)
+            
+            node_id = str(await self._submit(t.id().next))
+            self.logger.info("Node upserted", label=label, node_id=node_id)
+            return node_id
+        except Exception as e:
+            self.logger.error("Failed to upsert node", error=str(e))
+            raise GraphDatabaseError(f"Neptune node upsert failed: {e}")
+
+    async def upsert_nodes_batch(self, label: str, rows: List[Dict[str, Any]]) -> List[str]:
+        """
+        Upsert nodes in Neptune using chained `coalesce()` steps.
+        
+        Each chunk of `neptune_batch_size` rows is sent as a single traversal. Rows use
+        `coalesce(V().has(...), addV(...))` rather than `fold()`, which is a barrier and
+        would drop the `as_()` labels of the earlier rows.
+        """
+        try:
+            node_ids = []
+            for chunk in self._chunks(rows):
+                t = self.g.inject(0)
+                keys = []
+                now = time.time()
+                for idx, row in enumerate(chunk):
+                    key = row["key"]
+                    t = t.coalesce(
+                        __.V().has(label, "natural_key", key).limit(1),
+                        __.addV(label).property("natural_key", key).property("created_at", now)
+                    )
+                    for k, v in (row.get("properties") or {}).items():
+                        t = t.property(Cardinality.single, k, v)
+                    t = t.property(Cardinality.single, "updated_at", now)
+                    keys.append(f"v{idx}")
+                    t = t.as_(keys[-1])
+                node_ids.extend(await self._submit(self._select_ids, t, keys))
+            self.logger.info("Nodes upserted", label=label, count=len(node_ids))
+            return node_ids
+        except Exception as e:
+            self.logger.error("Failed to upsert nodes", error=str(e))
+            raise GraphDatabaseError(f"Neptune batch node upsert failed: {e}")
+
+    async def upsert_relationship(
+        self, 
+        from_id: str, 
+        to_id: str, 
+        rel_type: str, 
+        properties: Optional[Dict] = None
+    ) -> str:
+        """Upsert a relationship in Neptune using the `fold()/coalesce()` pattern"""
+        try:
+            t = self.g.V(from_id).outE(rel_type).where(__.inV().hasId(to_id)).fold().coalesce(
+                __.unfold(),
+                __.addE(rel_type).from_(__.V(from_id)).to(__.V(to_id))
+            )
+            for k, v in (properties or {}).items():
+                t = t.property(k, v)
+                
+            rel_id = str(await self._submit(t.id().next))
+            self.logger.info("Relationship upserted", rel_type=rel_type, rel_id=rel_id)
+            return rel_id
+        except Exception as e:
+            self.logger.error("Failed to upsert relationship", error=str(e))
+            raise GraphDatabaseError(f"Neptune relationship upsert failed: {e}")
+
+    async def upsert_relationships_batch(self, rel_type: str, relationships: List[Dict[str, Any]]) -> List[str]:
+        """
+        Upsert relationships in Neptune using chained `coalesce()` steps.
+        
+        Each chunk of `neptune_batch_size` edges is sent as a single traversal.
+        """
+        try:
+            rel_ids = []
+            for chunk in self._chunks(relationships):
+                t = self.g.inject(0)
+                keys = []
+                for idx, rel in enumerate(chunk):
+                    from_id, to_id = rel["from_id"], rel["to_id"]
+                    t = t.coalesce(
+                        __.V(from_id).outE(rel_type).where(__.inV().hasId(to_id)).limit(1),
+                        __.V(from_id).addE(rel_type).to(__.V(to_id))
+                    )
+                    for k, v in (rel.get("properties") or {}).items():
+                        t = t.property(k, v)
+                    keys.append(f"e{idx}")
+                    t = t.as_(keys[-1])
+                rel_ids.extend(await self._submit(self._select_ids, t, keys))
+            self.logger.info("Relationships upserted", rel_type=rel_type, count=len(rel_ids))
+            return rel_ids
+        except Exception as e:
+            self.logger.error("Failed to upsert relationships", error=str(e))
+            raise GraphDatabaseError(f"Neptune batch relationship upsert failed: {e}")
+
+    def _chunks(self, items: List[Any]) -> List[List[Any]]:
+        """Split bulk writes so a single traversal stays within Neptune's request limits"""
+        size = max(1, settings.neptune_batch_size)
+        return [items[i:i + size] for i in range(0, len(items), size)]
+
+    def _select_ids(self, traversal: Any, keys: List[str]) -> List[str]:
+        """Resolve the IDs of the elements labelled with `keys` in a chained traversal (blocking)"""
+        if len(keys) == 1:
+            return [str(traversal.id().next())]
+        row = traversal.select(*keys).by(__.id()).next()
+        return [str(row[key]) for key in keys]
+
     async def query(self, query: str, parameters: Optional[Dict] = None) -> List[Dict[str, Any]]:
         """
         Execute a Gremlin query (passed as string)
@@ -301,7 +909,7 @@ class NeptuneClient(GraphClient):
     async def find_high_risk_nodes(self, threshold: int = 7, time_window: Optional[float] = None) -> List[Dict[str, Any]]:
         """Find nodes with high risk scores using Traversal API"""
         try:
-            t = self.g.V().has("risk_score", P.gte(threshold))
+            t = self.g.V().hasLabel(*RISK_LABELS).has("risk_score", P.gte(threshold))
             
             if time_window:
                 t = t.has("updated_at", P.gte(time_window))
@@ -313,7 +921,7 @@ class NeptuneClient(GraphClient):
                  .order().by(__.select("data").select("risk_score"), Order.desc)
                  
             # Convert to list
-            input_results = t.toList()
+            input_results = await self._submit(t.toList)
             
             # Format results to match interface expectation
             results = []
@@ -329,6 +937,45 @@ class NeptuneClient(GraphClient):
             self.logger.error("Failed to find high risk nodes", error=str(e))
             return []
 
+    async def iter_high_risk_nodes(
+        self,
+        threshold: int = 7,
+        time_window: Optional[float] = None,
+        page_size: Optional[int] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Stream high-risk nodes in pages using `order().by(T.id).range(lo, hi)`"""
+        page_size = page_size or settings.graph_page_size
+        offset = 0
+        while True:
+            t = self.g.V().hasLabel(*RISK_LABELS).has("risk_score", P.gte(threshold))
+            if time_window:
+                t = t.has("updated_at", P.gte(time_window))
+            t = t.order().by(T.id).range_(offset, offset + page_size) \
+                 .project("node_id", "data", "labels") \
+                 .by(__.id()) \
+                 .by(__.valueMap(True)) \
+                 .by(__.label())
+            
+            try:
+                rows = await self._submit(t.toList)
+            except Exception as e:
+                self.logger.error("Failed to page high risk nodes", error=str(e), offset=offset)
+                raise GraphDatabaseError(f"Neptune high-risk scan failed: {e}")
+            
+            if not rows:
+                break
+            yield [
+                {
+                    "node_id": str(r["node_id"]),
+                    "data": self._clean_properties(r["data"]),
+                    "labels": [r["labels"]]
+                }
+                for r in rows
+            ]
+            if len(rows) < page_size:
+                break
+            offset += page_size
+
     def _clean_properties(self, props: Dict) -> Dict:
         """Clean up Gremlin valueMap output (which wraps values in lists)"""
         clean = {}
@@ -342,7 +989,7 @@ class NeptuneClient(GraphClient):
     async def health_check(self) -> bool:
         """Check Neptune connection"""
         try:
-            self.g.V().limit(1).toList()
+            await self._submit(self.g.V().limit(1).toList)
             return True
         except Exception:
             return False
@@ -358,7 +1005,7 @@ class NeptuneClient(GraphClient):
                 __.hasId(end_node_id).or_().loops().is_(max_depth)
             ).path().limit(1)
             
-            paths = t.toList()
+            paths = await self._submit(t.toList)
             results = []
             for p in paths:
                 # p is a Path object, need to convert to list of dicts
@@ -370,7 +1017,8 @@ class NeptuneClient(GraphClient):
             return []
 
     async def close(self):
-        self.remote_connection.close()
+        await self._submit(self.remote_connection.close)
+        self._executor.shutdown(wait=False)
 
 class QueryBuilder:
     """
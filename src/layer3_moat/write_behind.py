@@ -0,0 +1,161 @@
+"""Write-behind buffering for graph ingestion"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import structlog
+from ..common.config import settings
+from ..common.exceptions import GraphDatabaseError
+
+logger = structlog.get_logger(__name__)
+
+
+class WriteBehindBuffer:
+    """
+    Bounded in-process queue that decouples producers from graph write latency.
+
+    Records are accepted immediately and written in batches by a background flusher,
+    either when `batch_size` records are pending or `flush_interval_ms` has elapsed since
+    the flusher picked up the first pending record, whichever comes first.
+
+    A producer about to wait on its record (a single-record ingest, or the last record
+    of a batch) queues it with `linger=False`: the flusher then writes what is pending
+    right away instead of lingering. Records queued by concurrent producers while a
+    flush is in progress still share the next flush.
+
+    Backpressure: once `max_pending` records are queued, `put()` waits until the flusher
+    has drained some of them.
+
+    Durability: `put()` returns an acknowledgement future per record, resolved with the
+    flush result for that record once its batch is written, or failed with the error
+    once retries are exhausted. Callers that must not lose records (e.g. before
+    committing a Kafka offset) await it; failed batches are never silently dropped.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[List[Dict[str, Any]]], Awaitable[List[Any]]],
+        batch_size: Optional[int] = None,
+        flush_interval_ms: Optional[int] = None,
+        max_pending: Optional[int] = None
+    ):
+        """
+        Initialize the buffer.
+
+        Args:
+            flush: Coroutine writing a batch of records and returning one result per
+                record (e.g. `Contextualizer.ingest_ocsf_batch`).
+            batch_size: Maximum records per flush.
+            flush_interval_ms: Maximum time a record waits before being flushed.
+            max_pending: Maximum queued records before `put()` blocks.
+        """
+        self.flush = flush
+        self.batch_size = batch_size or settings.graph_write_behind_batch_size
+        self.flush_interval = (flush_interval_ms or settings.graph_write_behind_flush_ms) / 1000.0
+        self.max_pending = max_pending or settings.graph_write_behind_max_pending
+        self.logger = logger
+        self.stats = {"flushes": 0, "records_written": 0, "records_failed": 0}
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_pending)
+        self._signal = asyncio.Event()
+        self._flush_now = False
+        self._closed = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start the background flusher"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            self.logger.info(
+                "Write-behind buffer started",
+                batch_size=self.batch_size,
+                flush_interval=self.flush_interval,
+                max_pending=self.max_pending
+            )
+
+    async def put(self, record: Dict[str, Any], linger: bool = True) -> "asyncio.Future[Any]":
+        """
+        Queue a record for writing, waiting while the buffer is full.
+
+        Args:
+            record: The record to write.
+            linger: If False, flush pending records without waiting for more.
+
+        Returns:
+            Future resolved with the record's flush result once it is written.
+
+        Raises:
+            GraphDatabaseError: If the buffer has been closed.
+        """
+        if self._closed:
+            raise GraphDatabaseError("Write-behind buffer is closed")
+        ack = asyncio.get_running_loop().create_future()
+        await self._queue.put((record, ack))
+        pending = self._queue.qsize()
+        if not linger:
+            self._flush_now = True
+        if pending == 1 or pending >= self.batch_size or not linger:
+            self._signal.set()
+        return ack
+
+    def pending(self) -> int:
+        """Number of records waiting to be written"""
+        return self._queue.qsize()
+
+    async def close(self):
+        """Stop accepting records and flush everything still queued"""
+        self._closed = True
+        self._signal.set()
+        if self._task:
+            await self._task
+            self._task = None
+        self.logger.info("Write-behind buffer closed", **self.stats)
+
+    async def _run(self):
+        """Flusher loop: wait for records, linger for a full batch, then write"""
+        while True:
+            if self._queue.empty():
+                if self._closed:
+                    return
+                self._signal.clear()
+                await self._signal.wait()
+                continue
+
+            if self._queue.qsize() < self.batch_size and not self._closed and not self._flush_now:
+                self._signal.clear()
+                try:
+                    await asyncio.wait_for(self._signal.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+            self._flush_now = False
+            batch = [self._queue.get_nowait() for _ in range(min(self.batch_size, self._queue.qsize()))]
+            await self._write(batch)
+
+    async def _write(self, batch: List[Tuple[Dict[str, Any], "asyncio.Future[Any]"]]):
+        """
+        Write a batch, retrying with exponential backoff, then acknowledge each record.
+
+        If every attempt fails, the records' futures fail with the error so their
+        producers can redeliver or dead-letter them.
+        """
+        records = [record for record, _ in batch]
+        for attempt in range(settings.max_retries + 1):
+            try:
+                results = await self.flush(records)
+                self.stats["flushes"] += 1
+                self.stats["records_written"] += len(batch)
+                for (_, ack), result in zip(batch, results):
+                    if not ack.done():
+                        ack.set_result(result)
+                return
+            except Exception as e:
+                if attempt == settings.max_retries:
+                    self.stats["records_failed"] += len(batch)
+                    self.logger.critical("Write-behind flush failed, failing batch", error=str(e), records=len(batch))
+                    error = e if isinstance(e, GraphDatabaseError) else GraphDatabaseError(f"Write-behind flush failed: {e}")
+                    for _, ack in batch:
+                        if not ack.done():
+                            ack.set_exception(error)
+                    return
+                delay = settings.retry_backoff_factor ** attempt
+                self.logger.warning("Write-behind flush failed, retrying", error=str(e), attempt=attempt + 1, delay=delay)
+                await asyncio.sleep(delay)
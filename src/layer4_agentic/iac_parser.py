@@ -2,18 +2,34 @@
 
 import re
 import os
-import shutil
-import tempfile
+import time
+import hashlib
 import subprocess
-from typing import List, Dict, Any
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 import structlog
 import yaml
 import json
 from pathlib import Path
 
 import hcl2
+from ..common.config import settings
+from .iac_rules import RuleRegistry, TERRAFORM, CLOUDFORMATION
+from .repo_cache import RepoMirrorCache
 logger = structlog.get_logger(__name__)
 
+IAC_EXTENSIONS = ('.tf', '.yaml', '.yml', '.json')
+
+# Markers of a CloudFormation template: the format version, or a top-level
+# `Resources:` (YAML) / `"Resources":` (JSON) key
+CFN_MARKER = re.compile(rb'AWSTemplateFormatVersion|^Resources\s*:|"Resources"\s*:', re.MULTILINE)
+SNIFF_CHUNK_BYTES = 64 * 1024
+
+# Files modified this close to when they were recorded may change again without a
+# visible mtime/size change, so they are re-hashed on the next scan (as git does)
+RACY_WINDOW_NS = 2_000_000_000
+
 class IaCParser:
     """
     Scanner for detecting security risks in Infrastructure as Code (IaC) files.
@@ -22,11 +38,31 @@ class IaCParser:
     - Terraform (.tf): Detected via regex patterns (fallback mode).
     - CloudFormation (.yaml/.json): Parsed as objects with rule-based checks.
     
-    Can scan local directories or clone remote Git repositories.
+    Can scan local directories or remote Git repositories (kept as persistent
+    shallow clones, see `RepoMirrorCache`).
+    
+    Per-file results are cached in a manifest keyed by path and validated by
+    (mtime, size), falling back to a content hash when those changed. A steady-state
+    rescan costs one stat() per file; only new or modified files are parsed.
+    
+    With `workers > 1`, batches of at least `iac_parallel_min_files` files are parsed
+    in a process pool (HCL parsing is CPU-bound pure Python). Results are merged in
+    file order, so output does not depend on the worker count.
     """
     
-    def __init__(self):
+    def __init__(self, cache_enabled: Optional[bool] = None, workers: Optional[int] = None):
         self.logger = logger
+        self.cache_enabled = settings.iac_cache_enabled if cache_enabled is None else cache_enabled
+        self.workers = settings.iac_scan_workers if workers is None else workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # path -> {"mtime_ns", "size", "sha256", "racy", "risks"}
+        self._manifest: Dict[str, Dict[str, Any]] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.last_scan: Dict[str, int] = {}
+        # Directories whose every IaC file is in the manifest
+        self._scanned_roots: set = set()
+        self.repo_cache = RepoMirrorCache()
         # Simple regex-based rules for demonstration
         # In a real system, this would use a proper HCL parser (like python-hcl2)
         # AST-based rules for HCL parsing
@@ -84,10 +120,21 @@ class IaCParser:
                 "description": "S3 bucket encryption not enabled"
              }
         ]
+        
+        # Index rules by resource type; extra rule modules can be dropped into iac_rules_dir
+        self.rules = RuleRegistry()
+        self.rules.register_many(TERRAFORM, self.tf_rules)
+        self.rules.register_many(CLOUDFORMATION, self.cfn_rules)
+        if settings.iac_rules_dir:
+            self.rules.load_directory(settings.iac_rules_dir)
 
     def scan_repository(self, repo_url: str, branch: str = "main") -> List[Dict[str, Any]]:
         """
-        Clone a remote Git repository to a temporary directory and scan it.
+        Scan a remote Git repository through a persistent shallow clone.
+        
+        The clone is kept in `iac_repo_cache_dir` and fetched incrementally. When
+        the previous scan of this repository is still in the manifest, only files
+        changed since the last scanned commit (`git diff --name-only`) are parsed.
         
         Args:
             repo_url: HTTPS URL of the git repository.
@@ -96,23 +143,66 @@ class IaCParser:
         Returns:
             List of detected risks found in the repo.
         """
-        temp_dir = tempfile.mkdtemp()
         try:
-            self.logger.info("Cloning repository", repo=repo_url, branch=branch)
-            subprocess.check_call(
-                ["git", "clone", "--depth", "1", "--branch", branch, repo_url, temp_dir],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL
-            )
-            return self.parse_directory(temp_dir)
+            repo_path, head, changed = self.repo_cache.sync(repo_url, branch)
         except subprocess.CalledProcessError as e:
             self.logger.error("Failed to clone repository", repo=repo_url, error=str(e))
             return []
         except Exception as e:
             self.logger.error("Scan error", error=str(e))
             return []
-        finally:
-            shutil.rmtree(temp_dir, ignore_errors=True)
+        
+        try:
+            if changed is not None and self.cache_enabled and repo_path in self._scanned_roots:
+                risks = self._rescan_changed(repo_path, changed)
+            else:
+                risks = self.parse_directory(repo_path)
+            self.repo_cache.mark_scanned(repo_url, branch, head)
+            return risks
+        except Exception as e:
+            self.logger.error("Scan error", error=str(e))
+            return []
+
+    def _rescan_changed(self, directory_path: str, changed: List[str]) -> List[Dict[str, Any]]:
+        """
+        Re-parse only `changed` (paths relative to `directory_path`) and rebuild the
+        directory's results from the manifest.
+        """
+        skip_dirs = set(settings.iac_skip_dirs)
+        pending = []
+        for rel_path in changed:
+            file_path = os.path.join(directory_path, *rel_path.split("/"))
+            self._manifest.pop(file_path, None)
+            parts = rel_path.split("/")
+            if not rel_path.endswith(IAC_EXTENSIONS) or skip_dirs.intersection(parts[:-1]):
+                continue
+            _, entry = self._lookup(file_path)
+            if entry is not None:
+                pending.append((file_path, entry))
+        
+        parsed = self._parse_files([file_path for file_path, _ in pending])
+        for (file_path, entry), file_risks in zip(pending, parsed):
+            entry["risks"] = file_risks
+            self._manifest[file_path] = entry
+        
+        # Same order as a full walk: a directory's files before its subdirectories
+        def walk_order(file_path: str):
+            parts = os.path.relpath(file_path, directory_path).split(os.sep)
+            return tuple((1, part) for part in parts[:-1]) + ((0, parts[-1]),)
+        
+        prefix = os.path.join(directory_path, "")
+        files = sorted((p for p in self._manifest if p.startswith(prefix)), key=walk_order)
+        risks = []
+        for file_path in files:
+            risks.extend(self._manifest[file_path]["risks"])
+        
+        self.last_scan = {
+            "files": len(files),
+            "parsed": len(pending),
+            "cached": len(files) - len(pending),
+        }
+        self.logger.info("IaC incremental scan completed", risks_found=len(risks), changed=len(changed), **self.last_scan)
+        return risks
 
     def parse_directory(self, directory_path: str) -> List[Dict[str, Any]]:
         """
@@ -128,22 +218,156 @@ class IaCParser:
         if not os.path.exists(directory_path):
             self.logger.error("Directory not found", path=directory_path)
             return risks
-            
-        for root, _, files in os.walk(directory_path):
-            for file in files:
-                file_path = os.path.join(root, file)
-                if file.endswith('.tf'):
-                     risks.extend(self.parse_terraform_file(file_path))
-                elif file.endswith(('.yaml', '.yml', '.json')) and "cloudformation" in file.lower():
-                     # Simple heuristic: treat yaml/json as CFN if name implies or we could just try
-                     risks.extend(self.parse_cloudformation_file(file_path))
-                elif file.endswith(('.yaml', '.yml', '.json')):
-                     # Try CFN parsing anyway
-                     risks.extend(self.parse_cloudformation_file(file_path))
-                    
-        self.logger.info("IaC scan completed", files_scanned=len(files), risks_found=len(risks))
+        
+        hits = self.cache_hits
+        files = list(self._iter_iac_files(directory_path))
+        results: List[Optional[List[Dict[str, Any]]]] = []
+        pending = []
+        for idx, file_path in enumerate(files):
+            cached, entry = self._lookup(file_path)
+            results.append(cached)
+            if cached is None:
+                pending.append((idx, file_path, entry))
+        
+        parsed = self._parse_files([file_path for _, file_path, _ in pending])
+        for (idx, file_path, entry), file_risks in zip(pending, parsed):
+            results[idx] = file_risks
+            if entry is not None:
+                entry["risks"] = file_risks
+                self._manifest[file_path] = entry
+        
+        for file_risks in results:
+            risks.extend(file_risks)
+        self._prune_manifest(directory_path, set(files))
+        if self.cache_enabled:
+            self._scanned_roots.add(directory_path)
+        
+        self.last_scan = {
+            "files": len(files),
+            "parsed": len(pending),
+            "cached": self.cache_hits - hits,
+        }
+        self.logger.info("IaC scan completed", risks_found=len(risks), workers=self.workers, **self.last_scan)
         return risks
-
+    
+    def _iter_iac_files(self, directory_path: str) -> Iterator[str]:
+        """Yield candidate IaC files in a stable (sorted) order, skipping `iac_skip_dirs`"""
+        skip_dirs = set(settings.iac_skip_dirs)
+        for root, dirs, files in os.walk(directory_path):
+            dirs[:] = sorted(d for d in dirs if d not in skip_dirs)
+            for file in sorted(files):
+                if file.endswith(IAC_EXTENSIONS):
+                    yield os.path.join(root, file)
+    
+    def _parse_file(self, file_path: str) -> List[Dict[str, Any]]:
+        """Parse one IaC file according to its extension"""
+        if file_path.endswith('.tf'):
+            return self.parse_terraform_file(file_path)
+        # Only fully parse YAML/JSON files that look like CloudFormation templates
+        if not self._sniff_cloudformation(file_path):
+            return []
+        return self.parse_cloudformation_file(file_path)
+    
+    @staticmethod
+    def _sniff_cloudformation(file_path: str) -> bool:
+        """
+        Cheaply check for CloudFormation markers without parsing the file.
+        
+        The file is streamed in fixed-size chunks (overlapping so a marker split
+        across a boundary is still found), stopping at the first match.
+        """
+        overlap = 64
+        tail = b""
+        try:
+            with open(file_path, 'rb') as f:
+                while True:
+                    chunk = f.read(SNIFF_CHUNK_BYTES)
+                    if not chunk:
+                        return False
+                    if CFN_MARKER.search(tail + chunk):
+                        return True
+                    tail = chunk[-overlap:]
+        except OSError:
+            return False
+    
+    def _parse_files(self, file_paths: List[str]) -> List[List[Dict[str, Any]]]:
+        """Parse files in order, fanning out to the process pool for large batches"""
+        if self.workers > 1 and len(file_paths) >= settings.iac_parallel_min_files:
+            chunksize = max(1, len(file_paths) // (self.workers * 4))
+            return list(self._get_pool().map(_parse_in_worker, file_paths, chunksize=chunksize))
+        return [self._parse_file(file_path) for file_path in file_paths]
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+    
+    def close(self):
+        """Shut down the scan process pool, if one was started"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+    
+    def _lookup(self, file_path: str) -> Tuple[Optional[List[Dict[str, Any]]], Optional[Dict[str, Any]]]:
+        """
+        Check a file against the manifest.
+        
+        Returns:
+            `(risks, None)` if the file is unchanged, otherwise `(None, entry)` where
+            `entry` is the manifest entry to store once the file is parsed (None when
+            caching is disabled).
+        """
+        if not self.cache_enabled:
+            return None, None
+        
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return [], None
+        
+        racy = stat.st_mtime_ns >= time.time_ns() - RACY_WINDOW_NS
+        entry = self._manifest.get(file_path)
+        if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size and not entry["racy"]:
+            self.cache_hits += 1
+            return entry["risks"], None
+        
+        digest = self._file_digest(file_path)
+        if entry and digest is not None and entry["sha256"] == digest:
+            # Touched but not modified
+            self.cache_hits += 1
+            entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size, racy=racy)
+            return entry["risks"], None
+        
+        self.cache_misses += 1
+        return None, {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "racy": racy, "sha256": digest}
+    
+    @staticmethod
+    def _file_digest(file_path: str) -> Optional[str]:
+        try:
+            with open(file_path, 'rb') as f:
+                return hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return None
+    
+    def _prune_manifest(self, directory_path: str, seen: set):
+        """Forget files under `directory_path` that no longer exist"""
+        prefix = os.path.join(directory_path, "")
+        for path in [p for p in self._manifest if p.startswith(prefix) and p not in seen]:
+            del self._manifest[path]
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return manifest size, hit/miss counters and the last scan's breakdown"""
+        total = self.cache_hits + self.cache_misses
+        return {
+            "files": len(self._manifest),
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "hit_ratio": self.cache_hits / total if total else 0.0,
+            "last_scan": self.last_scan,
+        }
+    
     def parse_terraform_file(self, file_path: str) -> List[Dict[str, Any]]:
         """Parse Terraform file using python-hcl2 (AST)"""
         risks = []
@@ -167,21 +391,20 @@ class IaCParser:
 
     def _check_hcl_resource(self, r_type: str, r_name: str, r_config: Dict, file_path: str, risks: List):
         """Check a single HCL resource against rules"""
-        for rule in self.tf_rules:
-            if rule["resource_type"] == r_type:
-                try:
-                    if rule["check"](r_config):
-                         risks.append({
-                             "rule_id": rule["id"],
-                             "name": rule["name"],
-                             "file": os.path.basename(file_path),
-                             "path": file_path,
-                             "risk_score": rule["risk_score"],
-                             "description": f"{rule['description']} (Resource: {r_name})",
-                             "source": "iac_scanner_tf_ast"
-                         })
-                except Exception as check_err:
-                     self.logger.debug("Rule check failed", rule=rule["id"], error=str(check_err))
+        for rule in self.rules.rules_for(TERRAFORM, r_type):
+            try:
+                if rule["check"](r_config):
+                     risks.append({
+                         "rule_id": rule["id"],
+                         "name": rule["name"],
+                         "file": os.path.basename(file_path),
+                         "path": file_path,
+                         "risk_score": rule["risk_score"],
+                         "description": f"{rule['description']} (Resource: {r_name})",
+                         "source": "iac_scanner_tf_ast"
+                     })
+            except Exception as check_err:
+                 self.logger.debug("Rule check failed", rule=rule["id"], error=str(check_err))
 
     def _check_sg_ingress(self, resource_config: Dict) -> bool:
         """Helper to check Security Group ingress"""
@@ -215,22 +438,32 @@ class IaCParser:
                 
             for r_name, r_def in resources.items():
                 r_type = r_def.get("Type")
-                for rule in self.cfn_rules:
-                    if rule["resource_type"] == r_type:
-                        try:
-                            if rule["check"](r_def):
-                                risks.append({
-                                     "rule_id": rule["id"],
-                                     "name": rule["name"],
-                                     "file": os.path.basename(file_path),
-                                     "path": file_path,
-                                     "risk_score": rule["risk_score"],
-                                     "description": f"{rule['description']} (Resource: {r_name})",
-                                     "source": "iac_scanner_cfn"
-                                 })
-                        except Exception:
-                            continue
+                for rule in self.rules.rules_for(CLOUDFORMATION, r_type):
+                    try:
+                        if rule["check"](r_def):
+                            risks.append({
+                                 "rule_id": rule["id"],
+                                 "name": rule["name"],
+                                 "file": os.path.basename(file_path),
+                                 "path": file_path,
+                                 "risk_score": rule["risk_score"],
+                                 "description": f"{rule['description']} (Resource: {r_name})",
+                                 "source": "iac_scanner_cfn"
+                             })
+                    except Exception:
+                        continue
         except Exception as e:
             self.logger.debug("Failed to parse CloudFormation file", file=file_path, error=str(e))
             
         return risks
+
+
+_worker_parser: Optional[IaCParser] = None
+
+
+def _parse_in_worker(file_path: str) -> List[Dict[str, Any]]:
+    """Process pool entry point: parse one file with a per-process parser"""
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = IaCParser(cache_enabled=False, workers=0)
+    return _worker_parser._parse_file(file_path)
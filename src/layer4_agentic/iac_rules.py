@@ -0,0 +1,85 @@
+"""Registry of IaC security rules indexed by resource type"""
+
+import importlib.util
+import os
+from collections import defaultdict
+from typing import Any, Dict, List, Sequence, Tuple
+import structlog
+from ..common.exceptions import ConfigurationError
+
+logger = structlog.get_logger(__name__)
+
+TERRAFORM = "terraform"
+CLOUDFORMATION = "cloudformation"
+
+REQUIRED_RULE_KEYS = ("id", "name", "resource_type", "check", "risk_score", "description")
+
+
+class RuleRegistry:
+    """
+    IaC rules indexed by (format, resource type).
+
+    Each resource evaluates only the rules registered for its type, so scanning cost
+    grows with the number of applicable checks rather than the size of the rule set.
+
+    Rules are dicts with `id`, `name`, `resource_type`, `check` (a callable taking the
+    resource config), `risk_score` and `description`. Rule modules are plain Python
+    files defining `TERRAFORM_RULES` and/or `CLOUDFORMATION_RULES` lists; see
+    `load_directory`.
+    """
+
+    def __init__(self):
+        self._index: Dict[Tuple[str, str], List[Dict[str, Any]]] = defaultdict(list)
+        self._ids = set()
+        self.logger = logger
+
+    def register(self, iac_format: str, rule: Dict[str, Any]):
+        """Add a rule for `iac_format` (`terraform` or `cloudformation`)"""
+        missing = [key for key in REQUIRED_RULE_KEYS if key not in rule]
+        if missing:
+            raise ConfigurationError(f"IaC rule {rule.get('id', '?')} is missing {missing}")
+        if not callable(rule["check"]):
+            raise ConfigurationError(f"IaC rule {rule['id']}: check must be callable")
+        if (iac_format, rule["id"]) in self._ids:
+            raise ConfigurationError(f"Duplicate IaC rule id {rule['id']}")
+        self._ids.add((iac_format, rule["id"]))
+        self._index[(iac_format, rule["resource_type"])].append(rule)
+
+    def register_many(self, iac_format: str, rules: Sequence[Dict[str, Any]]):
+        for rule in rules:
+            self.register(iac_format, rule)
+
+    def rules_for(self, iac_format: str, resource_type: str) -> Sequence[Dict[str, Any]]:
+        """Rules applicable to one resource type (empty if none)"""
+        return self._index.get((iac_format, resource_type), ())
+
+    def load_directory(self, rules_dir: str) -> int:
+        """
+        Load every `*.py` rule module in `rules_dir` (sorted by file name).
+
+        Returns:
+            Number of rules registered
+        """
+        if not os.path.isdir(rules_dir):
+            raise ConfigurationError(f"IaC rules directory not found: {rules_dir}")
+
+        before = len(self)
+        for file_name in sorted(os.listdir(rules_dir)):
+            if not file_name.endswith(".py") or file_name.startswith("_"):
+                continue
+            path = os.path.join(rules_dir, file_name)
+            spec = importlib.util.spec_from_file_location(f"iac_rules_{file_name[:-3]}", path)
+            module = importlib.util.module_from_spec(spec)
+            try:
+                spec.loader.exec_module(module)
+            except Exception as e:
+                raise ConfigurationError(f"Failed to load IaC rule module {path}: {e}")
+            self.register_many(TERRAFORM, getattr(module, "TERRAFORM_RULES", []))
+            self.register_many(CLOUDFORMATION, getattr(module, "CLOUDFORMATION_RULES", []))
+
+        loaded = len(self) - before
+        self.logger.info("IaC rule modules loaded", path=rules_dir, rules=loaded)
+        return loaded
+
+    def __len__(self) -> int:
+        return len(self._ids)
@@ -0,0 +1,199 @@
+"""Pooled Open Policy Agent client with batching and a decision cache"""
+
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import httpx
+import structlog
+from ..common.config import settings
+
+logger = structlog.get_logger(__name__)
+
+PolicyRequest = Dict[str, Any]
+
+
+class OPAClient:
+    """
+    Client for OPA policy decisions, shared across agentic cycles.
+
+    - One `httpx.AsyncClient` keeps a bounded pool of keep-alive connections.
+    - `evaluate_many` runs at most `opa_concurrency` queries at once.
+    - With `opa_batch_enabled`, one query to `opa_batch_url` carries up to `opa_batch_size`
+      resources as `input.resources`. The policy answers with a list of decisions in
+      the same order, either as `result` or as `result.decisions`.
+    - Decisions are cached for `opa_cache_ttl_seconds`. The cache key is
+      (source, risk score bucket, labels, policy bundle revision). The revision comes from OPA's
+      `provenance`, so cached decisions stop matching once a new bundle is active.
+
+    A failed query returns None for each affected request; callers apply their own
+    fallback policy.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        batch_url: Optional[str] = None,
+        batch_enabled: Optional[bool] = None,
+    ):
+        self.url = url or settings.opa_url
+        self.batch_url = batch_url or settings.opa_batch_url
+        self.batch_enabled = settings.opa_batch_enabled if batch_enabled is None else batch_enabled
+        self.batch_size = max(1, settings.opa_batch_size)
+        self.cache_ttl = settings.opa_cache_ttl_seconds
+        self.cache_max_size = settings.opa_cache_max_size
+        self.bucket_size = settings.opa_risk_bucket_size
+        self.revision = ""
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._cache: Dict[Tuple[str, int, Tuple[str, ...], str], Tuple[Dict[str, Any], float]] = {}
+        self.logger = logger
+        self.stats = {"queries": 0, "cache_hits": 0, "failures": 0}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=settings.opa_timeout,
+                limits=httpx.Limits(
+                    max_connections=settings.opa_max_connections,
+                    max_keepalive_connections=settings.opa_max_connections,
+                ),
+            )
+        return self._client
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Created on first use so it binds to the running loop (Python 3.9)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(max(1, settings.opa_concurrency))
+        return self._semaphore
+
+    async def close(self):
+        """Close pooled connections"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @staticmethod
+    def build_input(
+        resource_id: str, source: str, risk_score: int, labels: Optional[List[str]] = None
+    ) -> PolicyRequest:
+        """Build the policy input document for one resource"""
+        return {
+            "risk_score": risk_score,
+            "source": source,
+            "labels": labels or [],
+            "resource_id": resource_id,
+            "timestamp": datetime.now().timestamp(),
+        }
+
+    async def evaluate(self, request: PolicyRequest) -> Optional[Dict[str, Any]]:
+        """Evaluate a single policy input"""
+        return (await self.evaluate_many([request]))[0]
+
+    async def evaluate_many(self, requests: List[PolicyRequest]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Evaluate many policy inputs concurrently.
+
+        Returns:
+            Decisions aligned with `requests`; None where OPA could not be queried.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(requests)
+        misses = []
+        for idx, request in enumerate(requests):
+            cached = self._cache_get(request)
+            if cached is not None:
+                results[idx] = cached
+            else:
+                misses.append(idx)
+
+        if self.batch_enabled:
+            chunks = [misses[i:i + self.batch_size] for i in range(0, len(misses), self.batch_size)]
+            answers = await asyncio.gather(*(
+                self._query_batch([requests[idx] for idx in chunk]) for chunk in chunks
+            ))
+            for chunk, decisions in zip(chunks, answers):
+                for idx, decision in zip(chunk, decisions):
+                    results[idx] = decision
+        else:
+            answers = await asyncio.gather(*(self._query_one(requests[idx]) for idx in misses))
+            for idx, decision in zip(misses, answers):
+                results[idx] = decision
+
+        for idx in misses:
+            if results[idx] is not None:
+                self._cache_put(requests[idx], results[idx])
+        return results
+
+    async def _query_one(self, request: PolicyRequest) -> Optional[Dict[str, Any]]:
+        body = await self._post(self.url, {"input": request})
+        if body is None:
+            return None
+        return body.get("result", {})
+
+    async def _query_batch(self, requests: List[PolicyRequest]) -> List[Optional[Dict[str, Any]]]:
+        body = await self._post(self.batch_url, {"input": {"resources": requests}})
+        result = body.get("result") if body else None
+        if isinstance(result, dict):
+            result = result.get("decisions")
+        if not isinstance(result, list) or len(result) != len(requests):
+            if body is not None:
+                self.logger.warning("OPA batch result malformed", expected=len(requests))
+                self.stats["failures"] += 1
+            return [None] * len(requests)
+        return result
+
+    async def _post(self, url: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """POST a query with provenance and track the active bundle revision"""
+        async with self.semaphore:
+            self.stats["queries"] += 1
+            try:
+                response = await self.client.post(url, params={"provenance": "true"}, json=payload)
+                if response.status_code != 200:
+                    self.logger.warning("OPA query failed", status=response.status_code)
+                    self.stats["failures"] += 1
+                    return None
+                body = response.json()
+                self._track_revision(body.get("provenance") or {})
+            except Exception as e:
+                self.logger.error("OPA connection failed", error=str(e))
+                self.stats["failures"] += 1
+                return None
+        return body
+
+    def _track_revision(self, provenance: Dict[str, Any]):
+        bundles = provenance.get("bundles") or {}
+        revision = ",".join(
+            f"{name}@{info.get('revision', '')}" for name, info in sorted(bundles.items())
+        ) or provenance.get("revision", "")
+        if revision != self.revision:
+            self.logger.info("OPA policy revision changed", old=self.revision, new=revision)
+            self.revision = revision
+
+    def _cache_key(self, request: PolicyRequest) -> Tuple[str, int, Tuple[str, ...], str]:
+        bucket = int(request.get("risk_score", 0) // self.bucket_size) if self.bucket_size else 0
+        labels = tuple(sorted(request.get("labels") or []))
+        return (request.get("source", "unknown"), bucket, labels, self.revision)
+
+    def _cache_get(self, request: PolicyRequest) -> Optional[Dict[str, Any]]:
+        if not self.cache_ttl:
+            return None
+        entry = self._cache.get(self._cache_key(request))
+        if entry is None:
+            return None
+        decision, expires_at = entry
+        if time.monotonic() >= expires_at:
+            return None
+        self.stats["cache_hits"] += 1
+        return decision
+
+    def _cache_put(self, request: PolicyRequest, decision: Dict[str, Any]):
+        if not self.cache_ttl:
+            return
+        now = time.monotonic()
+        if len(self._cache) >= self.cache_max_size:
+            self._cache = {k: v for k, v in self._cache.items() if v[1] > now}
+            if len(self._cache) >= self.cache_max_size:
+                self._cache.clear()
+        self._cache[self._cache_key(request)] = (decision, now + self.cache_ttl)
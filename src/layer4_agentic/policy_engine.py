@@ -0,0 +1,156 @@
+"""In-process policy evaluation over a compiled decision table"""
+
+import fnmatch
+import json
+import os
+import re
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import httpx
+import structlog
+import yaml
+from ..common.config import settings
+from ..common.exceptions import ConfigurationError
+
+logger = structlog.get_logger(__name__)
+
+_BOUNDS = {"gte": (0, True), "gt": (0, False), "lte": (1, True), "lt": (1, False)}
+
+
+class CompiledRule:
+    """A decision table rule reduced to plain comparisons"""
+
+    __slots__ = ("name", "low", "low_inclusive", "high", "high_inclusive", "source", "labels", "decision")
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.name = spec.get("name", "unnamed")
+        when = spec.get("when") or {}
+        unknown = set(when) - {"risk_score", "source", "labels"}
+        if unknown:
+            raise ConfigurationError(f"Policy rule {self.name}: unknown conditions {sorted(unknown)}")
+
+        self.low, self.low_inclusive = None, True
+        self.high, self.high_inclusive = None, True
+        for op, bound in (when.get("risk_score") or {}).items():
+            if op not in _BOUNDS:
+                raise ConfigurationError(f"Policy rule {self.name}: unknown risk_score operator {op}")
+            side, inclusive = _BOUNDS[op]
+            if side == 0:
+                self.low, self.low_inclusive = float(bound), inclusive
+            else:
+                self.high, self.high_inclusive = float(bound), inclusive
+
+        sources = when.get("source")
+        if sources is None:
+            self.source = None
+        else:
+            if isinstance(sources, str):
+                sources = [sources]
+            self.source = re.compile("|".join(fnmatch.translate(s) for s in sources))
+
+        labels = when.get("labels")
+        self.labels = frozenset([labels] if isinstance(labels, str) else labels) if labels else None
+
+        if "decision" not in spec:
+            raise ConfigurationError(f"Policy rule {self.name}: missing decision")
+        self.decision = {**spec["decision"], "rule": self.name}
+
+    def matches(self, risk_score: float, source: str, labels: Tuple[str, ...]) -> bool:
+        if self.low is not None and (risk_score < self.low if self.low_inclusive else risk_score <= self.low):
+            return False
+        if self.high is not None and (risk_score > self.high if self.high_inclusive else risk_score >= self.high):
+            return False
+        if self.source is not None and not self.source.match(source):
+            return False
+        if self.labels is not None and self.labels.isdisjoint(labels):
+            return False
+        return True
+
+
+class LocalPolicyEngine:
+    """
+    Evaluates risk decisions in-process from a YAML/JSON decision table.
+
+    Decisions are pure functions of (risk_score, source, labels), so results are
+    memoized per distinct input; a table swap clears the memo. If
+    `policy_sync_url` is set, the table is periodically re-fetched from OPA's data
+    API (e.g. a document shipped in the OPA bundle), so OPA only distributes policy
+    and is never on the per-decision path.
+    """
+
+    MEMO_MAX_SIZE = 100000
+
+    def __init__(self, table_path: Optional[str] = None, sync_url: Optional[str] = None):
+        self.table_path = table_path or settings.policy_table_path or os.path.join(
+            os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "config", "policies", "decision_table.yaml"
+        )
+        self.sync_url = sync_url if sync_url is not None else settings.policy_sync_url
+        self.sync_interval = settings.policy_sync_interval_seconds
+        self.revision = ""
+        self.rules: List[CompiledRule] = []
+        self.default: Dict[str, Any] = {}
+        self._memo: Dict[Tuple[float, str, Tuple[str, ...]], Dict[str, Any]] = {}
+        self._last_sync: Optional[float] = None
+        self.logger = logger
+        self.load_table(self._read_table())
+
+    def _read_table(self) -> Dict[str, Any]:
+        """Read the decision table file (`.json` or YAML)"""
+        if not os.path.exists(self.table_path):
+            raise ConfigurationError(f"Policy decision table not found: {self.table_path}")
+        with open(self.table_path, "r") as f:
+            if self.table_path.endswith(".json"):
+                return json.load(f)
+            return yaml.safe_load(f)
+
+    def load_table(self, table: Dict[str, Any]):
+        """Compile a decision table and swap it in"""
+        if not isinstance(table, dict):
+            raise ConfigurationError("Policy decision table must be a mapping")
+        rules = [CompiledRule(spec) for spec in table.get("rules") or []]
+        default = {**(table.get("default") or {"action": "investigate", "require_approval": False}), "rule": "default"}
+
+        self.rules = rules
+        self.default = default
+        self.revision = str(table.get("revision", ""))
+        self._memo = {}
+        self.logger.info("Policy decision table loaded", rules=len(rules), revision=self.revision)
+
+    def evaluate(self, risk_score: float, source: str, labels: Iterable[str] = ()) -> Dict[str, Any]:
+        """Return the decision of the first matching rule, or the default"""
+        labels = tuple(labels)
+        key = (risk_score, source, labels)
+        decision = self._memo.get(key)
+        if decision is not None:
+            return decision
+
+        decision = self.default
+        for rule in self.rules:
+            if rule.matches(risk_score, source, labels):
+                decision = rule.decision
+                break
+
+        if len(self._memo) >= self.MEMO_MAX_SIZE:
+            self._memo = {}
+        self._memo[key] = decision
+        return decision
+
+    async def maybe_sync(self):
+        """Re-fetch the table from `sync_url` if the sync interval has elapsed"""
+        if not self.sync_url:
+            return
+        if self._last_sync is not None and time.monotonic() - self._last_sync < self.sync_interval:
+            return
+        self._last_sync = time.monotonic()
+        try:
+            async with httpx.AsyncClient(timeout=settings.opa_timeout) as client:
+                response = await client.get(self.sync_url)
+            if response.status_code != 200:
+                self.logger.warning("Policy sync failed", status=response.status_code)
+                return
+            table = response.json().get("result")
+            if table and str(table.get("revision", "")) != self.revision:
+                self.load_table(table)
+        except Exception as e:
+            # Keep evaluating with the current table
+            self.logger.error("Policy sync failed", error=str(e))
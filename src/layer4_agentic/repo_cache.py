@@ -0,0 +1,141 @@
+"""Persistent shallow git mirrors for repeated repository scans"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import structlog
+from ..common.config import settings
+
+logger = structlog.get_logger(__name__)
+
+
+class RepoMirrorCache:
+    """
+    Local cache of shallow clones, one per (repo URL, branch).
+
+    The first `sync` clones with `--depth 1`; later syncs `fetch --depth 1` and reset to
+    the fetched commit, so only new objects are downloaded. The commit last scanned
+    is recorded per mirror, and `git diff --name-only` against it tells callers which
+    files changed. When the total size exceeds `max_bytes`, least recently used
+    mirrors are evicted.
+
+    State lives in `<cache_dir>/index.json`.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.cache_dir = cache_dir or settings.iac_repo_cache_dir
+        self.max_bytes = settings.iac_repo_cache_max_bytes if max_bytes is None else max_bytes
+        self.index_path = os.path.join(self.cache_dir, "index.json")
+        self.logger = logger
+
+    @staticmethod
+    def key(repo_url: str, branch: str) -> str:
+        return hashlib.sha256(f"{repo_url}#{branch}".encode()).hexdigest()[:16]
+
+    def sync(self, repo_url: str, branch: str = "main") -> Tuple[str, str, Optional[List[str]]]:
+        """
+        Bring the mirror for `repo_url`/`branch` up to date.
+
+        Returns:
+            `(path, head, changed)`: the working tree path, its HEAD commit, and the
+            files changed since the last scanned commit (relative paths), or None if
+            there is no usable previous scan.
+
+        Raises:
+            subprocess.CalledProcessError: if git fails.
+        """
+        key = self.key(repo_url, branch)
+        path = os.path.join(self.cache_dir, key)
+        index = self._read_index()
+        entry = index.get(key, {})
+
+        if os.path.isdir(os.path.join(path, ".git")):
+            try:
+                self._git(path, "fetch", "--depth", "1", "origin", branch)
+                self._git(path, "reset", "--hard", "FETCH_HEAD")
+            except subprocess.CalledProcessError as e:
+                self.logger.warning("Mirror fetch failed, recloning", repo=repo_url, error=str(e))
+                shutil.rmtree(path, ignore_errors=True)
+                entry = {}
+        if not os.path.isdir(os.path.join(path, ".git")):
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self.logger.info("Cloning repository", repo=repo_url, branch=branch)
+            self._git(None, "clone", "--depth", "1", "--branch", branch, "--single-branch", repo_url, path)
+            entry = {}
+
+        head = self._git(path, "rev-parse", "HEAD").strip()
+        changed = self._changed_files(path, entry.get("scanned_commit"), head)
+
+        entry.update(url=repo_url, branch=branch, head=head, last_used=time.time(), size=self._dir_size(path))
+        index[key] = entry
+        self._evict(index, keep=key)
+        self._write_index(index)
+        return path, head, changed
+
+    def mark_scanned(self, repo_url: str, branch: str, commit: str):
+        """Record that `commit` was fully scanned"""
+        index = self._read_index()
+        entry = index.get(self.key(repo_url, branch))
+        if entry is not None:
+            entry["scanned_commit"] = commit
+            self._write_index(index)
+
+    def _changed_files(self, path: str, base: Optional[str], head: str) -> Optional[List[str]]:
+        if not base:
+            return None
+        if base == head:
+            return []
+        try:
+            output = self._git(path, "diff", "--name-only", "--no-renames", base, head)
+        except subprocess.CalledProcessError:
+            # Base commit no longer available locally
+            return None
+        return [line for line in output.splitlines() if line]
+
+    def _evict(self, index: Dict[str, Dict[str, Any]], keep: str):
+        """Drop least recently used mirrors until the cache fits in `max_bytes`"""
+        total = sum(entry.get("size", 0) for entry in index.values())
+        for key in sorted(index, key=lambda k: index[k].get("last_used", 0)):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= index[key].get("size", 0)
+            shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+            self.logger.info("Evicted repository mirror", repo=index[key].get("url"))
+            del index[key]
+
+    @staticmethod
+    def _dir_size(path: str) -> int:
+        size = 0
+        for root, _, files in os.walk(path):
+            for file in files:
+                try:
+                    size += os.lstat(os.path.join(root, file)).st_size
+                except OSError:
+                    pass
+        return size
+
+    @staticmethod
+    def _git(cwd: Optional[str], *args: str) -> str:
+        return subprocess.run(
+            ["git", *args], cwd=cwd, check=True, capture_output=True, text=True
+        ).stdout
+
+    def _read_index(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_index(self, index: Dict[str, Dict[str, Any]]):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(index, f)
+        os.replace(tmp_path, self.index_path)
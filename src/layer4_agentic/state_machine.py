@@ -6,33 +6,40 @@ import structlog
 import asyncio
 from langgraph.graph import StateGraph, END
 from ..layer3_moat.graph_client import get_graph_client
-from ..common.exceptions import GraphDatabaseError
+from ..common.exceptions import GraphDatabaseError, ConfigurationError
 from ..common.config import settings
 from .iac_parser import IaCParser
-import httpx
+from .watermark import WatermarkStore
+from .opa_client import OPAClient
+from .policy_engine import LocalPolicyEngine
+from ..common.risk_scoring import risk_scoring_engine
 
 logger = structlog.get_logger(__name__)
 
+POLICY_ENGINES = ("opa", "local")
+
 
 class AgentState(TypedDict):
     """
     Typed dictionary representing the shared state in the LangGraph workflow.
     
     Attributes:
-        high_risk_nodes: List of graph nodes identified as high risk.
+        high_risk_count: Number of graph nodes identified as high risk.
         iac_risks: List of risks detected in Infrastructure as Code files.
         risk_scores: Map of object IDs to their calculated risk scores.
         decisions: List of final decisions/actions taken for each object.
         reasoning_log: Human-readable log of the agent's thought process.
         source_attribution: Map tracking where each risk originated (e.g., 'tenable', 'iac').
+        node_labels: Map of graph node IDs to their labels, used by policy rules.
         threshold: The risk score threshold triggering automated action.
     """
-    high_risk_nodes: List[Dict[str, Any]]
+    high_risk_count: int
     iac_risks: List[Dict[str, Any]]
     risk_scores: Dict[str, int]
     decisions: List[Dict[str, Any]]
     reasoning_log: List[str]
     source_attribution: Dict[str, str]
+    node_labels: Dict[str, List[str]]
     threshold: int
 
 
@@ -49,13 +56,22 @@ class RiskDetectionStateMachine:
     """
     
     def __init__(self, threshold: int = 7, iac_path: str = "./terraform"):
+        if settings.policy_engine not in POLICY_ENGINES:
+            raise ConfigurationError(
+                f"Unknown policy_engine {settings.policy_engine!r}; expected one of {POLICY_ENGINES}"
+            )
+        if settings.policy_engine == "local":
+            logger.warning("OPA disabled: policy decisions come from the local decision table only")
         self.graph_client = get_graph_client()
         self.iac_parser = IaCParser()
         self.iac_path = iac_path
         self.threshold = threshold
         self.logger = logger
         self.workflow = self._build_workflow()
-        self.last_cycle_time = None
+        self.watermark = WatermarkStore("risk_detection")
+        self.opa_client = OPAClient()
+        self.policy_engine = LocalPolicyEngine()
+        self.last_cycle_time = self.watermark.load()
     
     def _build_workflow(self) -> StateGraph:
         """Build the LangGraph workflow"""
@@ -82,35 +98,48 @@ class RiskDetectionStateMachine:
         """
         Step 1: Query the graph database for existing high-risk nodes.
         
-        Uses the `last_cycle_time` to fetch only net-new or updated nodes since the last run.
-        Populates `state["high_risk_nodes"]`.
+        Uses the `last_cycle_time` watermark to fetch only net-new or updated nodes since the
+        last run. The watermark survives restarts via `WatermarkStore`, and is looked back by
+        `watermark_overlap_seconds` so writes stamped just before the previous cycle started
+        but committed after it are not missed.
+        Nodes are streamed page by page and scored as they arrive, so only their composite
+        scores, source attribution and labels are kept in `state`, never the nodes themselves.
         """
         current_time = datetime.now().timestamp()
         self.logger.info("Querying graph for high-risk nodes", threshold=self.threshold, last_cycle_time=self.last_cycle_time)
         
+        risk_scores: Dict[str, int] = {}
+        source_attribution: Dict[str, str] = {}
+        node_labels: Dict[str, List[str]] = {}
+        time_window = None
+        if self.last_cycle_time is not None:
+            time_window = self.last_cycle_time - settings.watermark_overlap_seconds
+        
         try:
-            high_risk_nodes = await self.graph_client.find_high_risk_nodes(
-                self.threshold, 
-                time_window=self.last_cycle_time
-            )
+            async for page in self.graph_client.iter_high_risk_nodes(
+                self.threshold,
+                time_window=time_window
+            ):
+                scores = risk_scoring_engine.calculate_composite_risks([node["data"] for node in page])
+                for node, score in zip(page, scores.tolist()):
+                    node_id = node["node_id"]
+                    risk_scores[node_id] = score
+                    source_attribution[node_id] = node["data"].get("source", "unknown")
+                    node_labels[node_id] = node.get("labels", [])
             
-            # Update last cycle time on success
+            # Advance the watermark only on success
             self.last_cycle_time = current_time
+            self.watermark.save(current_time)
             
-            state["high_risk_nodes"] = [
-                {
-                    "node_id": str(node["node_id"]),
-                    "data": dict(node["n"]),
-                    "labels": node.get("labels", [])
-                }
-                for node in high_risk_nodes
-            ]
-            
-            self.logger.info("Found high-risk nodes", count=len(state["high_risk_nodes"]))
+            self.logger.info("Found high-risk nodes", count=len(risk_scores))
         except Exception as e:
             self.logger.error("Failed to query graph", error=str(e))
-            state["high_risk_nodes"] = []
+            risk_scores, source_attribution, node_labels = {}, {}, {}
         
+        state["high_risk_count"] = len(risk_scores)
+        state["risk_scores"] = risk_scores
+        state["source_attribution"] = source_attribution
+        state["node_labels"] = node_labels
         return state
     
     async def _scan_iac_node(self, state: AgentState) -> AgentState:
@@ -127,31 +156,18 @@ class RiskDetectionStateMachine:
         return state
     
     async def _analyze_risks_node(self, state: AgentState) -> AgentState:
-        """Analyze risks and calculate composite scores"""
-        self.logger.info("Analyzing risks", node_count=len(state["high_risk_nodes"]))
+        """Merge IaC risks into the composite scores computed while streaming graph nodes"""
+        self.logger.info("Analyzing risks", node_count=state["high_risk_count"])
         
-        risk_scores = {}
-        source_attribution = {}
+        risk_scores = state["risk_scores"]
+        source_attribution = state["source_attribution"]
         
-        # Process Graph Nodes
-        for node in state["high_risk_nodes"]:
-            node_id = node["node_id"]
-            node_data = node["data"]
-            
-            composite_score = self._calculate_composite_risk(node_data, node)
-            risk_scores[node_id] = composite_score
-            
-            source = node_data.get("source", "unknown")
-            source_attribution[node_id] = source
-            
         # Process IaC Risks
         for idx, risk in enumerate(state.get("iac_risks", [])):
             risk_id = f"iac_{idx}_{risk['rule_id']}"
             risk_scores[risk_id] = risk["risk_score"]
             source_attribution[risk_id] = f"iac_scanner:{risk['file']}"
         
-        state["risk_scores"] = risk_scores
-        state["source_attribution"] = source_attribution
         state["threshold"] = self.threshold
         
         return state
@@ -164,91 +180,93 @@ class RiskDetectionStateMachine:
         from .approvals import approval_manager
         
         decisions = []
+        node_labels = state.get("node_labels", {})
+        candidates = [
+            (node_id, risk_score, state["source_attribution"].get(node_id, "unknown"), node_labels.get(node_id, []))
+            for node_id, risk_score in state["risk_scores"].items()
+            if risk_score >= self.threshold
+        ]
+        
+        # Evaluate all policies before acting on any of them
+        policy_results = await self._evaluate_policies(candidates)
         
-        for node_id, risk_score in state["risk_scores"].items():
-            if risk_score >= self.threshold:
-                source = state["source_attribution"].get(node_id, "unknown")
-                
-                # Call OPA for policy decision
-                policy_result = await self._check_opa_policy(node_id, source, risk_score)
-                action = policy_result.get("action", "investigate")
-                
-                # Enforce approval if OPA requires it
-                if action == "PENDING_APPROVAL" or policy_result.get("require_approval", False):
-                     action = "PENDING_APPROVAL"
-                     description = f"High risk detected (Score: {risk_score}). Source: {source}. Policy: {policy_result.get('reason', 'Policy required approval')}"
-                     op_id = approval_manager.request_approval(
-                        risk_score=risk_score,
-                        description=description,
-                        action_type="remediate",
-                        target=node_id,
-                        metadata={"source": source, "policy_result": policy_result}
-                     )
-                     self.logger.warning("Safety Guardrail Triggered (OPA)", node_id=node_id, op_id=op_id)
-                elif action == "deny":
-                    # If policy strictly denies, we might just log or set to manual investigation
-                    action = "investigate"
-                    self.logger.info("Policy denied automated action", node_id=node_id)
-                
-                decision = {
-                    "node_id": node_id,
-                    "risk_score": risk_score,
-                    "action": action,
-                    "source": source,
-                    "timestamp": datetime.now().isoformat(),
-                    "policy": policy_result
-                }
-                decisions.append(decision)
-                
-                self.logger.warning(
-                    "Decision made",
-                    node_id=node_id,
+        for (node_id, risk_score, source, _), policy_result in zip(candidates, policy_results):
+            action = policy_result.get("action", "investigate")
+            
+            # Enforce approval if OPA requires it
+            if action == "PENDING_APPROVAL" or policy_result.get("require_approval", False):
+                 action = "PENDING_APPROVAL"
+                 description = f"High risk detected (Score: {risk_score}). Source: {source}. Policy: {policy_result.get('reason', 'Policy required approval')}"
+                 op_id = approval_manager.request_approval(
                     risk_score=risk_score,
-                    action=decision["action"],
-                    source=source
-                )
+                    description=description,
+                    action_type="remediate",
+                    target=node_id,
+                    metadata={"source": source, "policy_result": policy_result}
+                 )
+                 self.logger.warning("Safety Guardrail Triggered (OPA)", node_id=node_id, op_id=op_id)
+            elif action == "deny":
+                # If policy strictly denies, we might just log or set to manual investigation
+                action = "investigate"
+                self.logger.info("Policy denied automated action", node_id=node_id)
+            
+            decision = {
+                "node_id": node_id,
+                "risk_score": risk_score,
+                "action": action,
+                "source": source,
+                "timestamp": datetime.now().isoformat(),
+                "policy": policy_result
+            }
+            decisions.append(decision)
+            
+            self.logger.warning(
+                "Decision made",
+                node_id=node_id,
+                risk_score=risk_score,
+                action=decision["action"],
+                source=source
+            )
         
         state["decisions"] = decisions
         return state
 
+    async def _evaluate_policies(self, candidates: List[tuple]) -> List[Dict[str, Any]]:
+        """
+        Decide on each (node_id, risk_score, source, labels) candidate.
+        
+        With `policy_engine=local` decisions come from the in-process decision table.
+        With `policy_engine=opa` they are queried from OPA, and the decision table
+        answers for any resource OPA could not decide.
+        """
+        await self.policy_engine.maybe_sync()
+        
+        remote: List[Optional[Dict[str, Any]]] = [None] * len(candidates)
+        if settings.policy_engine == "opa":
+            remote = await self.opa_client.evaluate_many([
+                OPAClient.build_input(node_id, source, risk_score, labels)
+                for node_id, risk_score, source, labels in candidates
+            ])
+        
+        return [
+            result if result is not None else self.policy_engine.evaluate(risk_score, source, labels)
+            for (_, risk_score, source, labels), result in zip(candidates, remote)
+        ]
+
     async def _check_opa_policy(self, node_id: str, source: str, risk_score: int) -> Dict[str, Any]:
-        """Query OPA for decision"""
-        try:
-            input_data = {
-                "input": {
-                    "risk_score": risk_score,
-                    "source": source,
-                    "resource_id": node_id,
-                    "timestamp": datetime.now().timestamp()
-                }
-            }
-            
-            async with httpx.AsyncClient(timeout=2.0) as client:
-                response = await client.post(settings.opa_url, json=input_data)
-                if response.status_code == 200:
-                    result = response.json().get("result", {})
-                    # Default policy structure assumption: { "allow": bool, "action": str, "require_approval": bool }
-                    return result
-                else:
-                    self.logger.warning("OPA query failed", status=response.status_code)
-                    # Fallback to safe default
-        except Exception as e:
-            self.logger.error("OPA connection failed, using fallback", error=str(e))
-            
-        # Fallback Logic (Replica of original hardcoded logic)
-        if risk_score >= 9:
-             return {"action": "PENDING_APPROVAL", "require_approval": True, "reason": "Fallback: High Risk"}
-        elif risk_score >= 8:
-             return {"action": "remediate", "require_approval": False}
-        else:
-             return {"action": "investigate", "require_approval": False}
+        """Query OPA for a single decision"""
+        result = await self.opa_client.evaluate(OPAClient.build_input(node_id, source, risk_score))
+        if result is None:
+            self.logger.error("OPA unavailable, using local decision table", node_id=node_id)
+            return self.policy_engine.evaluate(risk_score, source)
+        return result
     
     async def _log_reasoning_node(self, state: AgentState) -> AgentState:
         """Generate reasoning log with source attribution"""
         reasoning_log = []
         
         reasoning_log.append(f"Analysis completed at {datetime.now().isoformat()}")
-        reasoning_log.append(f"Found {len(state['high_risk_nodes'])} high-risk nodes")
+        reasoning_log.append(f"Found {state['high_risk_count']} high-risk nodes")
         reasoning_log.append(f"Found {len(state.get('iac_risks', []))} IaC risks")
         reasoning_log.append(f"Risk threshold: {self.threshold}")
         
@@ -279,20 +297,7 @@ class RiskDetectionStateMachine:
         Returns:
             Composite risk score (0-10)
         """
-        base_score = node_data.get("risk_score", 0)
-        
-        # Factor in severity
-        severity_id = node_data.get("severity_id", 0)
-        severity_factor = severity_id / 5.0  # Normalize to 0-1
-        
-        # Factor in asset criticality if available
-        criticality_map = {"critical": 1.2, "high": 1.1, "medium": 1.0, "low": 0.9}
-        criticality = node_data.get("criticality", "medium")
-        criticality_factor = criticality_map.get(criticality, 1.0)
-        
-        # Calculate composite
-        composite = int(base_score * (1 + severity_factor * 0.2) * criticality_factor)
-        return min(10, max(0, composite))
+        return risk_scoring_engine.calculate_composite_risk(node_data)
     
     async def run(self) -> AgentState:
         """
@@ -302,12 +307,13 @@ class RiskDetectionStateMachine:
             Final state with decisions and reasoning
         """
         initial_state: AgentState = {
-            "high_risk_nodes": [],
+            "high_risk_count": 0,
             "iac_risks": [],
             "risk_scores": {},
             "decisions": [],
             "reasoning_log": [],
             "source_attribution": {},
+            "node_labels": {},
             "threshold": self.threshold,
         }
         
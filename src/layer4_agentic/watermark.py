@@ -0,0 +1,79 @@
+"""Persistent watermarks for incremental graph scans"""
+
+import json
+import os
+from typing import Optional
+import redis
+import structlog
+from ..common.config import settings
+
+logger = structlog.get_logger(__name__)
+
+
+class WatermarkStore:
+    """
+    Stores the timestamp up to which a periodic scan has processed graph changes.
+
+    Backends (`watermark_backend`):
+    - `memory`: lost on restart; the first cycle after a restart is a full scan.
+    - `file`: a JSON document of `{name: timestamp}` at `watermark_file_path`,
+      replaced atomically on every save.
+    - `redis`: one key per watermark under `watermark_redis_key_prefix`.
+
+    Load/save failures are logged and never raised, so a broken backend degrades to
+    a full scan rather than stopping the agent.
+    """
+
+    def __init__(self, name: str, backend: Optional[str] = None):
+        self.name = name
+        self.backend = backend or settings.watermark_backend
+        self.file_path = settings.watermark_file_path
+        self.redis_client = None
+        self._value: Optional[float] = None
+
+        if self.backend == "redis":
+            try:
+                self.redis_client = redis.from_url(settings.redis_url, decode_responses=True)
+            except Exception as e:
+                logger.error("Failed to connect to Redis", error=str(e))
+
+    @property
+    def _redis_key(self) -> str:
+        return f"{settings.watermark_redis_key_prefix}{self.name}"
+
+    def load(self) -> Optional[float]:
+        """Return the persisted watermark, or None if there is none yet"""
+        try:
+            if self.backend == "file":
+                self._value = self._read_file().get(self.name)
+            elif self.redis_client:
+                value = self.redis_client.get(self._redis_key)
+                self._value = float(value) if value is not None else None
+        except Exception as e:
+            logger.error("Failed to load watermark", name=self.name, backend=self.backend, error=str(e))
+        return self._value
+
+    def save(self, value: float):
+        """Persist a new watermark"""
+        self._value = value
+        try:
+            if self.backend == "file":
+                watermarks = self._read_file()
+                watermarks[self.name] = value
+                directory = os.path.dirname(self.file_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                tmp_path = f"{self.file_path}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(watermarks, f)
+                os.replace(tmp_path, self.file_path)
+            elif self.redis_client:
+                self.redis_client.set(self._redis_key, value)
+        except Exception as e:
+            logger.error("Failed to save watermark", name=self.name, backend=self.backend, error=str(e))
+
+    def _read_file(self) -> dict:
+        if not os.path.exists(self.file_path):
+            return {}
+        with open(self.file_path) as f:
+            return json.load(f)
@@ -1,7 +1,8 @@
 """Main orchestration service for the Universal Agentic Fabric"""
 
 import asyncio
-from typing import Dict, Any
+from typing import Dict, Any, List
+from datetime import datetime
 import structlog
 import json
 from aiohttp import web
@@ -12,8 +13,10 @@ from .layer1_integration.connector_registry import registry
 from .layer1_integration.scheduler import scheduler
 from .layer1_integration.circuit_breaker import ConnectorCircuitBreaker, RuleBasedFallback
 from .layer2_normalization.transformer import transformer
+from .layer2_normalization.worker_pool import NormalizationPool
 from .layer3_moat.contextualizer import contextualizer
 from .layer4_agentic.state_machine import RiskDetectionStateMachine
+from .message_queue.consumer import BatchConsumer
 from .adapters.slack_adapter import SlackAdapter
 from .adapters.teams_adapter import TeamsAdapter
 
@@ -38,6 +41,7 @@ class UniversalAgenticFabric:
         self.fallback = RuleBasedFallback()
         self.output_adapters: Dict[str, Any] = {}
         self.state_machine = RiskDetectionStateMachine(threshold=7)
+        self.normalization_pool = NormalizationPool()
         self.consumer = None
         self.consumer_running = False
     
@@ -61,6 +65,17 @@ class UniversalAgenticFabric:
         # Start scheduler
         scheduler.start()
         
+        if settings.graph_ensure_schema:
+            try:
+                await contextualizer.graph.ensure_schema()
+            except Exception as e:
+                self.logger.warning("Failed to ensure graph schema", error=str(e))
+        
+        if settings.graph_write_behind_enabled:
+            await contextualizer.start_write_behind()
+        
+        await transformer.start_watching()
+        
         self.logger.info("Fabric initialized", connectors=len(registry.list_connectors()))
 
         # Initialize Kafka Consumer if configured
@@ -99,10 +114,7 @@ class UniversalAgenticFabric:
         """
         try:
             # Step 1: Get connector to identify source
-            connector = registry.get_instance(connector_id)
-            source = connector.connector_name if connector else "unknown"
-            alert_data["source"] = source
-            alert_data["connector_id"] = connector_id
+            source = self._identify_source(connector_id, alert_data)
             
             # Step 2: Normalize to OCSF
             self.logger.info("Normalizing alert", source=source, alert_id=alert_data.get("id"))
@@ -119,6 +131,14 @@ class UniversalAgenticFabric:
             self.logger.error("Failed to process alert", error=str(e), connector_id=connector_id)
             raise
     
+    def _identify_source(self, connector_id: str, alert_data: Dict[str, Any]) -> str:
+        """Tag an alert with its connector and source name, returning the source"""
+        connector = registry.get_instance(connector_id)
+        source = connector.connector_name if connector else "unknown"
+        alert_data["source"] = source
+        alert_data["connector_id"] = connector_id
+        return source
+    
     async def run_agentic_cycle(self):
         """Run the agentic state machine to detect and respond to high-risk objects"""
         self.logger.info("Starting agentic cycle")
@@ -165,66 +185,31 @@ class UniversalAgenticFabric:
         - Routing to `process_alert`.
         - Error handling and forwarding to Dead Letter Queue (DLQ).
         - Manual offset committing to ensure at-least-once processing.
+        
+        When `kafka_batch_enabled` is set, messages are fetched with `getmany()` and
+        committed once per batch (see `BatchConsumer`); otherwise each message is
+        processed and committed individually.
         """
         if not self.consumer:
             self.logger.warning("Consumer not initialized, skipping consumption loop")
             return
 
         self.consumer_running = True
-        self.logger.info("Starting message consumption loop")
+        self.logger.info("Starting message consumption loop", batched=settings.kafka_batch_enabled)
         
         try:
             await self.consumer.start()
-            async for msg in self.consumer:
-                if not self.consumer_running:
-                    break
-                
-                try:
-                    payload = json.loads(msg.value.decode('utf-8'))
-                    self.logger.info("Received message", partition=msg.partition, offset=msg.offset)
-                    
-                    # Extract connector_id and data from payload
-                    # Expected format: {"connector_id": "...", "data": {...}}
-                    connector_id = payload.get("connector_id", "unknown")
-                    data = payload.get("data", payload)
-                    
-                    await self.process_alert(connector_id, data)
-                    
-                    # Manual commit after successful processing
-                    await self.consumer.commit()
+            if settings.kafka_batch_enabled:
+                batch_consumer = BatchConsumer(self.consumer, self._handle_message, batch_handler=self._handle_batch)
+                await batch_consumer.run(lambda: self.consumer_running)
+            else:
+                async for msg in self.consumer:
+                    if not self.consumer_running:
+                        break
                     
-                except json.JSONDecodeError:
-                    self.logger.error("Failed to decode message", offset=msg.offset)
-                    # Commit offset for malformed messages to avoid getting stuck
+                    await self._handle_message(msg)
+                    # Manual commit after the message was processed, skipped or dead-lettered
                     await self.consumer.commit()
-                except Exception as e:
-                    self.logger.error("Error processing message", error=str(e), offset=msg.offset)
-                    # Send to DLQ
-                    if self.producer and settings.kafka_dlq_topic:
-                        try:
-                            dlq_payload = {
-                                "original_message": msg.value.decode('utf-8', errors='ignore'),
-                                "error": str(e),
-                                "timestamp": datetime.now().isoformat(),
-                                "topic": msg.topic,
-                                "partition": msg.partition,
-                                "offset": msg.offset
-                            }
-                            await self.producer.send_and_wait(
-                                settings.kafka_dlq_topic, 
-                                json.dumps(dlq_payload).encode('utf-8')
-                            )
-                            self.logger.info("Message sent to DLQ", dlq_topic=settings.kafka_dlq_topic, offset=msg.offset)
-                            # Commit offset so we don't get stuck on this message forever
-                            await self.consumer.commit()
-                        except Exception as dlq_error:
-                            self.logger.critical("Failed to send to DLQ", error=str(dlq_error), original_offset=msg.offset)
-                            # If DLQ fails, we still commit the original message to avoid reprocessing indefinitely
-                            await self.consumer.commit()
-                    else:
-                        # If no DLQ, logic depends on policy. Here we log and commit to avoid block loop.
-                        self.logger.warning("DLQ not configured or producer not available, committing offset for failed message to avoid reprocessing.", offset=msg.offset)
-                        await self.consumer.commit()
                     
         except Exception as e:
             self.logger.error("Consumer loop failed", error=str(e))
@@ -233,6 +218,123 @@ class UniversalAgenticFabric:
                 await self.consumer.stop()
             self.logger.info("Consumer stopped")
 
+    async def _handle_message(self, msg) -> bool:
+        """
+        Decode and process a single Kafka message.
+        
+        Malformed messages are skipped and failed messages are forwarded to the DLQ.
+        
+        Returns:
+            bool: True once the message's offset may be committed.
+        """
+        try:
+            payload = json.loads(msg.value.decode('utf-8'))
+            self.logger.info("Received message", partition=msg.partition, offset=msg.offset)
+            
+            # Extract connector_id and data from payload
+            # Expected format: {"connector_id": "...", "data": {...}}
+            connector_id = payload.get("connector_id", "unknown")
+            data = payload.get("data", payload)
+            
+            await self.process_alert(connector_id, data)
+            
+        except json.JSONDecodeError:
+            self.logger.error("Failed to decode message", offset=msg.offset)
+            # Commit offset for malformed messages to avoid getting stuck
+        except Exception as e:
+            self.logger.error("Error processing message", error=str(e), offset=msg.offset)
+            await self._send_to_dlq(msg, e)
+        return True
+
+    async def _handle_batch(self, msgs: List[Any]) -> int:
+        """
+        Decode, normalize and ingest one partition's messages.
+        
+        All decodable messages are normalized in one `NormalizationPool` call and
+        then ingested in offset order. As in `_handle_message`, malformed messages are
+        skipped and failed ones are forwarded to the DLQ. Returns only after every
+        record has been written to the graph or dead-lettered, so committed offsets
+        never cover records still sitting in the write-behind buffer.
+        
+        Returns:
+            int: Number of messages whose offsets may be committed (all of them).
+        """
+        alerts = []
+        for msg in msgs:
+            try:
+                payload = json.loads(msg.value.decode('utf-8'))
+                connector_id = payload.get("connector_id", "unknown")
+                data = payload.get("data", payload)
+                alerts.append((msg, self._identify_source(connector_id, data), data))
+            except json.JSONDecodeError:
+                self.logger.error("Failed to decode message", offset=msg.offset)
+            except Exception as e:
+                self.logger.error("Error processing message", error=str(e), offset=msg.offset)
+                await self._send_to_dlq(msg, e)
+        
+        results, errors, mapping_version = await self.normalization_pool.transform_many(
+            [(source, data) for _, source, data in alerts]
+        )
+        
+        # Queue in offset order, then wait until every record is written (or failed)
+        # before reporting the batch as committable, even in write-behind mode
+        last = max((idx for idx in range(len(alerts)) if idx not in errors), default=-1)
+        acks = []
+        for idx, (msg, source, _) in enumerate(alerts):
+            if idx in errors:
+                acks.append(self._failed_ack(errors[idx]))
+                continue
+            try:
+                # The last record releases the linger so the batch tail is flushed now
+                acks.append(await contextualizer.queue_ocsf_data(results[idx], linger=idx != last))
+            except Exception as e:
+                acks.append(self._failed_ack(e))
+        
+        for ack, (msg, source, _) in zip(acks, alerts):
+            try:
+                await ack
+            except Exception as e:
+                self.logger.error("Error processing message", error=str(e), offset=msg.offset, source=source)
+                await self._send_to_dlq(msg, e)
+        
+        self.logger.info(
+            "Message batch processed",
+            messages=len(msgs),
+            normalized=len(alerts) - len(errors),
+            mapping_version=mapping_version
+        )
+        return len(msgs)
+
+    @staticmethod
+    def _failed_ack(error: Exception) -> "asyncio.Future[Any]":
+        ack = asyncio.get_running_loop().create_future()
+        ack.set_exception(error)
+        return ack
+
+    async def _send_to_dlq(self, msg, error: Exception):
+        """Forward a failed message to the Dead Letter Queue, if configured"""
+        if self.producer and settings.kafka_dlq_topic:
+            try:
+                dlq_payload = {
+                    "original_message": msg.value.decode('utf-8', errors='ignore'),
+                    "error": str(error),
+                    "timestamp": datetime.now().isoformat(),
+                    "topic": msg.topic,
+                    "partition": msg.partition,
+                    "offset": msg.offset
+                }
+                await self.producer.send_and_wait(
+                    settings.kafka_dlq_topic, 
+                    json.dumps(dlq_payload).encode('utf-8')
+                )
+                self.logger.info("Message sent to DLQ", dlq_topic=settings.kafka_dlq_topic, offset=msg.offset)
+            except Exception as dlq_error:
+                # If DLQ fails, we still commit the original message to avoid reprocessing indefinitely
+                self.logger.critical("Failed to send to DLQ", error=str(dlq_error), original_offset=msg.offset)
+        else:
+            # If no DLQ, logic depends on policy. Here we log and commit to avoid block loop.
+            self.logger.warning("DLQ not configured or producer not available, committing offset for failed message to avoid reprocessing.", offset=msg.offset)
+
     async def shutdown(self):
         """Shutdown the fabric"""
         self.logger.info("Shutting down Universal Agentic Fabric")
@@ -240,6 +342,12 @@ class UniversalAgenticFabric:
         scheduler.stop()
         if self.consumer:
             await self.consumer.stop()
+        # Flush buffered graph writes before tearing down the remaining clients
+        await contextualizer.stop_write_behind()
+        await transformer.stop_watching()
+        await self.state_machine.opa_client.close()
+        self.state_machine.iac_parser.close()
+        self.normalization_pool.close()
         if self.producer:
             await self.producer.stop()
         await asyncio.sleep(1)  # Allow pending operations to complete
@@ -0,0 +1,125 @@
+"""Batched Kafka consumption with per-partition ordering"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+import structlog
+from ..common.config import settings
+
+logger = structlog.get_logger(__name__)
+
+# Handler contract: returns True once the record may be committed, False to stop
+# the partition at this record so it is redelivered on the next poll.
+MessageHandler = Callable[[Any], Awaitable[bool]]
+
+# Batch handler contract: receives one partition's records in offset order and returns
+# how many of them, from the start, may be committed.
+BatchHandler = Callable[[List[Any]], Awaitable[int]]
+
+
+class BatchConsumer:
+    """
+    Drives an `AIOKafkaConsumer` in batches using `getmany()`.
+
+    Each batch is split by partition. Partitions are processed concurrently (bounded by
+    `concurrency`) while the records of a single partition are handled strictly in offset
+    order. Offsets are committed once per batch, at the highest contiguous offset that was
+    handled successfully for each partition.
+    """
+
+    def __init__(
+        self,
+        consumer: Any,
+        handler: MessageHandler,
+        max_records: Optional[int] = None,
+        concurrency: Optional[int] = None,
+        linger_ms: Optional[int] = None,
+        batch_handler: Optional[BatchHandler] = None
+    ):
+        """
+        Initialize the batch consumer.
+
+        Args:
+            consumer: A started (or about to be started) `AIOKafkaConsumer`.
+            handler: Coroutine called once per record (see `MessageHandler`).
+            max_records: Maximum records fetched per `getmany()` call.
+            concurrency: Maximum number of partitions processed at the same time.
+            linger_ms: Maximum time `getmany()` waits for a batch to fill.
+            batch_handler: If set, called once per partition batch instead of
+                calling `handler` per record (see `BatchHandler`).
+        """
+        self.consumer = consumer
+        self.handler = handler
+        self.batch_handler = batch_handler
+        self.max_records = max_records or settings.kafka_batch_max_records
+        self.concurrency = concurrency or settings.kafka_batch_concurrency
+        self.linger_ms = linger_ms if linger_ms is not None else settings.kafka_batch_linger_ms
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self.logger = logger
+
+    async def poll_once(self) -> int:
+        """
+        Fetch, process and commit a single batch.
+
+        Returns:
+            int: Number of records fetched in this batch.
+        """
+        batches = await self.consumer.getmany(timeout_ms=self.linger_ms, max_records=self.max_records)
+        if not batches:
+            return 0
+
+        results = await asyncio.gather(
+            *(self._process_partition(tp, records) for tp, records in batches.items())
+        )
+
+        offsets = {tp: offset for tp, offset in results if offset is not None}
+        if offsets:
+            await self.consumer.commit(offsets)
+
+        fetched = sum(len(records) for records in batches.values())
+        self.logger.info("Batch processed", records=fetched, partitions=len(batches), committed=len(offsets))
+        return fetched
+
+    async def run(self, is_running: Callable[[], bool]) -> None:
+        """Poll batches until `is_running()` returns False."""
+        while is_running():
+            await self.poll_once()
+
+    async def _process_partition(self, tp: Any, records: List[Any]) -> Tuple[Any, Optional[int]]:
+        """
+        Handle the records of one partition in order.
+
+        Stops at the first record the handler could not complete and rewinds the
+        partition to it, so that record and everything after it are fetched again.
+
+        Returns:
+            Tuple of the partition and the offset to commit (None if nothing completed).
+        """
+        async with self._semaphore:
+            if self.batch_handler is not None:
+                return tp, await self._process_partition_batch(tp, records)
+
+            next_offset = None
+            for record in records:
+                try:
+                    handled = await self.handler(record)
+                except Exception as e:
+                    self.logger.error("Batch handler failed", error=str(e), partition=record.partition, offset=record.offset)
+                    handled = False
+
+                if not handled:
+                    self.consumer.seek(tp, record.offset)
+                    break
+                next_offset = record.offset + 1
+            return tp, next_offset
+
+    async def _process_partition_batch(self, tp: Any, records: List[Any]) -> Optional[int]:
+        """Hand a partition's records to `batch_handler` and rewind to the first record it did not complete."""
+        try:
+            handled = await self.batch_handler(records)
+        except Exception as e:
+            self.logger.error("Batch handler failed", error=str(e), partition=records[0].partition, offset=records[0].offset)
+            handled = 0
+
+        if handled < len(records):
+            self.consumer.seek(tp, records[handled].offset)
+        return records[handled - 1].offset + 1 if handled else None
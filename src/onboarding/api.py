@@ -9,7 +9,7 @@ from ..layer1_integration.connector_registry import registry
 from ..layer1_integration.secrets_manager import get_secrets_manager
 from ..layer1_integration.scheduler import scheduler
 from ..common.logging import configure_logging, get_logger
-from ..layer1_integration.webhooks import router as webhook_router
+from ..layer1_integration.webhooks import router as webhook_router, start_ingestion, stop_ingestion
 from ..layer4_agentic.approval_api import router as approval_router
 
 configure_logging()
@@ -42,6 +42,15 @@ async def startup_event():
         logger.info(f"Loaded connectors: {registry.list_connectors()}")
     except Exception as e:
         logger.error(f"Failed to load connectors: {e}")
+    
+    # Webhook events are normalized and written to the graph from this process
+    await start_ingestion()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush buffered webhook writes before exiting"""
+    await stop_ingestion()
 
 app.add_middleware(
     CORSMiddleware,
@@ -0,0 +1,80 @@
+"""
+Micro-benchmark: linear rule scan vs resource-type indexed dispatch.
+
+Run with `python tests/bench_iac_rules.py [rule_count] [resource_count]`.
+"""
+
+import os
+import random
+import sys
+import time
+
+# Adjust path to import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.layer4_agentic.iac_parser import IaCParser
+from src.layer4_agentic.iac_rules import RuleRegistry, TERRAFORM
+
+
+def make_rules(count, type_count):
+    return [
+        {
+            "id": f"BENCH-{i:04d}",
+            "name": f"Bench rule {i}",
+            "resource_type": f"aws_type_{i % type_count}",
+            "check": lambda r, i=i: r.get("flag") == i % 7,
+            "risk_score": 5,
+            "description": "benchmark rule",
+        }
+        for i in range(count)
+    ]
+
+
+def linear_check(rules, r_type, r_config, risks):
+    """The pre-registry dispatch: compare every rule's resource_type"""
+    for rule in rules:
+        if rule["resource_type"] == r_type:
+            if rule["check"](r_config):
+                risks.append(rule["id"])
+
+
+def indexed_check(registry, r_type, r_config, risks):
+    for rule in registry.rules_for(TERRAFORM, r_type):
+        if rule["check"](r_config):
+            risks.append(rule["id"])
+
+
+def main():
+    rule_count = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    resource_count = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+    type_count = 100
+    rng = random.Random(3)
+    rules = make_rules(rule_count, type_count)
+    registry = RuleRegistry()
+    registry.register_many(TERRAFORM, rules)
+    resources = [(f"aws_type_{rng.randrange(type_count * 2)}", {"flag": rng.randrange(7)}) for _ in range(resource_count)]
+
+    print(f"{rule_count} rules over {type_count} resource types, {resource_count:,} resources\n")
+    results = {}
+    for label, fn, rule_source in (("linear scan", linear_check, rules), ("indexed dispatch", indexed_check, registry)):
+        risks = []
+        started = time.perf_counter()
+        for r_type, r_config in resources:
+            fn(rule_source, r_type, r_config, risks)
+        elapsed = time.perf_counter() - started
+        results[label] = risks
+        print(f"{label:<18} {elapsed * 1000:8.1f} ms  {elapsed / resource_count * 1e6:6.2f} us/resource  risks={len(risks)}")
+    assert results["linear scan"] == results["indexed dispatch"], "dispatch results differ"
+
+    parser = IaCParser(cache_enabled=False)
+    parser.rules.register_many(TERRAFORM, rules)
+    risks = []
+    started = time.perf_counter()
+    for idx, (r_type, r_config) in enumerate(resources):
+        parser._check_hcl_resource(r_type, f"r{idx}", r_config, "bench.tf", risks)
+    elapsed = time.perf_counter() - started
+    print(f"{'IaCParser':<18} {elapsed * 1000:8.1f} ms  {elapsed / resource_count * 1e6:6.2f} us/resource  risks={len(risks)}")
+
+
+if __name__ == "__main__":
+    main()
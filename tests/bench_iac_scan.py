@@ -0,0 +1,93 @@
+"""
+Benchmark: serial vs process-pool IaC scanning on a generated Terraform corpus.
+
+Run with `python tests/bench_iac_scan.py [file_count] [max_workers]`.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Adjust path to import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.layer4_agentic.iac_parser import IaCParser
+
+MODULE_TEMPLATE = """
+resource "aws_security_group" "sg_{i}" {{
+  name = "sg-{i}"
+  ingress {{
+    from_port   = 22
+    to_port     = 22
+    protocol    = "tcp"
+    cidr_blocks = ["{cidr}"]
+  }}
+}}
+
+resource "aws_ebs_volume" "data_{i}" {{
+  availability_zone = "us-west-2a"
+  size              = {size}
+  encrypted         = {encrypted}
+}}
+
+resource "aws_s3_bucket" "logs_{i}" {{
+  bucket = "logs-{i}"
+  tags = {{
+    Team = "platform"
+    Env  = "prod"
+  }}
+}}
+
+variable "region_{i}" {{
+  default = "us-west-2"
+}}
+"""
+
+
+def generate_corpus(root, count):
+    for i in range(count):
+        module_dir = os.path.join(root, f"modules/m{i // 50:03d}")
+        os.makedirs(module_dir, exist_ok=True)
+        with open(os.path.join(module_dir, f"main_{i}.tf"), "w") as f:
+            f.write(MODULE_TEMPLATE.format(
+                i=i,
+                cidr="0.0.0.0/0" if i % 3 == 0 else "10.0.0.0/8",
+                size=10 + i % 90,
+                encrypted="false" if i % 2 else "true",
+            ))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    root = tempfile.mkdtemp(prefix="iac_bench_")
+    try:
+        generate_corpus(root, count)
+        print(f"Scanning {count:,} .tf files ({os.cpu_count()} CPUs)\n")
+
+        baseline = None
+        serial_time = None
+        workers = 1
+        while workers <= max_workers:
+            parser = IaCParser(cache_enabled=False, workers=workers)
+            started = time.perf_counter()
+            risks = parser.parse_directory(root)
+            elapsed = time.perf_counter() - started
+            parser.close()
+
+            if baseline is None:
+                baseline, serial_time = risks, elapsed
+            assert risks == baseline, f"results differ with {workers} workers"
+            print(f"workers={workers:<3} {elapsed:8.2f} s  {count / elapsed:8.0f} files/s  "
+                  f"speedup x{serial_time / elapsed:.2f}  risks={len(risks)}")
+            workers *= 2
+
+        print("\nResults identical across worker counts")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: interpreted vs compiled YAML mapping (config/mappings/tenable.yaml).
+
+Run with `python tests/bench_mapping_compile.py [alert_count]`.
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+# Adjust path to import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.layer2_normalization.ocsf_schema import map_severity_to_ocsf
+from src.layer2_normalization.strategies import ConfigurableStrategy
+
+TENABLE_MAPPING = os.path.join(os.path.dirname(__file__), "..", "config", "mappings", "tenable.yaml")
+
+
+def interpret(config, data):
+    """The per-record rule interpreter ConfigurableStrategy used before compilation"""
+    rules = config.get("rules", [])
+    defaults = config.get("defaults", {})
+    result = {
+        "class_uid": defaults.get("class_uid", 2002),
+        "class_name": defaults.get("class_name", "Vulnerability Finding"),
+        "metadata": {
+            "source": defaults.get("source", "unknown"),
+            "product": {"name": defaults.get("source", "unknown")},
+            "version": "1.1.0",
+            "profiles": ["security_control"]
+        }
+    }
+    result["time"] = int(datetime.now().timestamp())
+    for rule in rules:
+        value = data.get(rule.get("input"))
+        if value is None:
+            continue
+        func_name = rule.get("transform")
+        if func_name == "map_severity":
+            value = map_severity_to_ocsf(str(value))
+        elif func_name == "lowercase_string":
+            value = str(value).lower()
+        elif func_name == "to_timestamp":
+            if isinstance(value, (int, float)):
+                value = int(value)
+            else:
+                try:
+                    value = int(datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp())
+                except ValueError:
+                    value = int(datetime.now().timestamp())
+        d = result
+        parts = rule.get("output").split('.')
+        for part in parts[:-1]:
+            d = d.setdefault(part, {})
+        d[parts[-1]] = value
+    if "severity_id" not in result:
+        result["severity_id"] = 0
+        result["severity"] = "unknown"
+    if "connector_id" in data and not any(r["output"] == "metadata.connector_id" for r in rules):
+        result["metadata"]["connector_id"] = data["connector_id"]
+    return result
+
+
+def make_alerts(count):
+    rng = random.Random(42)
+    severities = ["Critical", "High", "Medium", "Low", "Info"]
+    return [
+        {
+            "severity": rng.choice(severities),
+            "cve": f"CVE-2024-{i}",
+            "name": "OpenSSL vulnerability",
+            "plugin_name": "openssl_rce",
+            "description": "Remote code execution",
+            "plugin_id": 100000 + i,
+            "timestamp": f"2024-01-{rng.randint(1, 28):02d}T12:00:00Z",
+            "connector_id": "tenable-prod",
+            "raw_data": {"plugin_id": 100000 + i},
+        }
+        for i in range(count)
+    ]
+
+
+def timed(label, fn, count):
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<24} {elapsed * 1000:9.1f} ms  {count / elapsed:>12,.0f} alerts/s")
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    strategy = ConfigurableStrategy(TENABLE_MAPPING)
+    alerts = make_alerts(count)
+
+    print(f"Mapping {count:,} Tenable alerts with {os.path.basename(TENABLE_MAPPING)}\n")
+    interpreted = timed("interpreted rules", lambda: [interpret(strategy.config, a) for a in alerts], count)
+    compiled = timed("compiled transform", lambda: [strategy._compiled(a) for a in alerts], count)
+
+    assert interpreted == compiled, "interpreted and compiled outputs differ"
+    print("\nResults identical across both paths")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark: alerts normalized per second with pydantic models vs slot-based records.
+
+Run with `python tests/bench_normalization.py [alert_count]`.
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+from unittest.mock import patch
+
+# Adjust path to import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.layer2_normalization import strategies
+from src.layer2_normalization.ocsf_schema import OCSFVulnerabilityFinding, OCSFFinding
+
+
+def make_alerts(count):
+    """Synthetic (source, payload) pairs, half Tenable and half Splunk"""
+    rng = random.Random(42)
+    severities = ["critical", "high", "medium", "low", "info"]
+    alerts = []
+    for i in range(count):
+        if i % 2 == 0:
+            alerts.append(("tenable", {
+                "id": f"t-{i}",
+                "cve": f"CVE-2024-{i}",
+                "severity": rng.choice(severities),
+                "name": "OpenSSL vulnerability",
+                "description": "Remote code execution",
+                "vuln_id": str(100000 + i),
+                "timestamp": f"2024-01-{rng.randint(1, 28):02d}T12:00:00Z",
+                "connector_id": "tenable-prod",
+                "raw_data": {"plugin_id": 100000 + i},
+            }))
+        else:
+            alerts.append(("splunk", {
+                "id": f"s-{i}",
+                "title": "Failed login burst",
+                "severity": rng.choice(severities),
+                "description": "Multiple failed logins",
+                "timestamp": f"2024-01-{rng.randint(1, 28):02d}T12:{rng.randint(0, 59):02d}:00Z",
+                "connector_id": "splunk-prod",
+                "raw_data": {"_time": "2024-01-01T12:00:00Z"},
+            }))
+    return alerts
+
+
+class _PydanticRecord:
+    """Builds the pydantic model the strategies used before slot-based records"""
+
+    def __init__(self, model):
+        self.model = model
+
+    def __call__(self, **data):
+        return _Dumper(self.model(**data))
+
+
+class _Dumper:
+    __slots__ = ("model",)
+
+    def __init__(self, model):
+        self.model = model
+
+    def to_dict(self):
+        return self.model.model_dump()
+
+
+def run(alerts):
+    handlers = {"tenable": strategies.TenableStrategy(), "splunk": strategies.SplunkStrategy()}
+
+    async def normalize():
+        return [await handlers[source].transform(data) for source, data in alerts]
+
+    return asyncio.run(normalize())
+
+
+def timed(label, fn, count):
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<34} {elapsed * 1000:9.1f} ms  {count / elapsed:>12,.0f} alerts/s")
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    alerts = make_alerts(count)
+
+    print(f"Normalizing {count:,} Tenable/Splunk alerts\n")
+    with patch.object(strategies, "VulnerabilityFindingRecord", _PydanticRecord(OCSFVulnerabilityFinding)), \
+            patch.object(strategies, "FindingRecord", _PydanticRecord(OCSFFinding)):
+        before = timed("pydantic models", lambda: run(alerts), count)
+    after = timed("slot-based records", lambda: run(alerts), count)
+
+    assert before == after, "pydantic and slot-based outputs differ"
+    print("\nResults identical across both paths")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark: normalization throughput of the process pool by worker count.
+
+Run with `python tests/bench_normalization_pool.py [alert_count] [max_workers]`.
+Scaling is bounded by the number of available cores.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+# Adjust path to import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.layer2_normalization.transformer import transformer
+from src.layer2_normalization.worker_pool import NormalizationPool
+from tests.bench_normalization import make_alerts
+
+
+async def run_pool(workers, alerts):
+    pool = NormalizationPool(workers=workers, chunk_size=1000)
+    try:
+        # Start the workers (and load their strategies) outside the timed run
+        await pool.transform_many(alerts[:pool.chunk_size * workers + 1])
+        started = time.perf_counter()
+        results, errors, _ = await pool.transform_many(alerts)
+        return time.perf_counter() - started, results, errors
+    finally:
+        pool.close()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    alerts = make_alerts(count)
+
+    print(f"Normalizing {count:,} Tenable/Splunk alerts ({os.cpu_count()} CPUs)\n")
+    started = time.perf_counter()
+    expected, _ = transformer.transform_many(alerts)
+    baseline = time.perf_counter() - started
+    print(f"{'in-process':<14} {baseline * 1000:9.1f} ms  {count / baseline:>12,.0f} alerts/s   1.00x")
+
+    workers = 2
+    while workers <= max(max_workers, 2):
+        elapsed, results, errors = asyncio.run(run_pool(workers, alerts))
+        assert results == expected and not errors, "pooled output differs from in-process output"
+        print(f"{f'{workers} workers':<14} {elapsed * 1000:9.1f} ms  {count / elapsed:>12,.0f} alerts/s"
+              f"   {baseline / elapsed:.2f}x")
+        workers *= 2
+
+    print("\nResults identical across all worker counts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: per-record vs vectorized risk scoring over 100k records.
+
+Run with `python tests/bench_risk_scoring.py [record_count]`.
+"""
+
+import os
+import random
+import sys
+import time
+
+# Adjust path to import src
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.common.risk_scoring import RiskScoringEngine
+
+
+def make_records(count):
+    rng = random.Random(42)
+    now = int(time.time())
+    titles = ["Ransomware beacon", "Failed login", "Unauthorized access", "Port scan"]
+    records = []
+    for i in range(count):
+        record = {
+            "class_uid": rng.choice([2001, 2002]),
+            "severity_id": rng.randint(0, 5),
+            "time": now - rng.randint(0, 14 * 24 * 3600),
+        }
+        if record["class_uid"] == 2002:
+            record["vulnerability"] = {"cve": f"CVE-2024-{i}" if rng.random() < 0.7 else None,
+                                       "exploit_available": rng.random() < 0.2}
+        else:
+            record["finding"] = {"title": rng.choice(titles)}
+        records.append(record)
+    return records
+
+
+def make_nodes(count):
+    rng = random.Random(7)
+    return [
+        {"risk_score": rng.randint(0, 10), "severity_id": rng.randint(0, 5),
+         "criticality": rng.choice(["low", "medium", "high", "critical"])}
+        for _ in range(count)
+    ]
+
+
+def timed(label, fn, count):
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<42} {elapsed * 1000:9.1f} ms  {count / elapsed:>12,.0f} rec/s")
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    engine = RiskScoringEngine()
+    records = make_records(count)
+    nodes = make_nodes(count)
+    now = time.time()
+
+    print(f"Scoring {count:,} records\n")
+    per_record = timed("risk score, per record", lambda: [engine.calculate_risk_score(r, now) for r in records], count)
+    batch = timed("risk score, batch (incl. column extraction)", lambda: engine.calculate_risk_scores(records, now), count)
+    columns = engine.columns(records)
+    timed("risk score, batch (columns prebuilt)", lambda: engine.score_batch(**columns, now=now), count)
+    assert per_record == batch.tolist(), "per-record and batch risk scores differ"
+
+    print()
+    per_node = timed("composite, per node", lambda: [engine.calculate_composite_risk(n) for n in nodes], count)
+    composite = timed("composite, batch (incl. column extraction)", lambda: engine.calculate_composite_risks(nodes), count)
+    node_columns = engine.node_columns(nodes)
+    timed("composite, batch (columns prebuilt)", lambda: engine.composite_batch(**node_columns), count)
+    assert per_node == composite.tolist(), "per-node and batch composite scores differ"
+
+    print("\nResults identical across both paths")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Local stand-in for an OPA server, used by policy tests"""
+
+from aiohttp import web
+
+
+class OPAStubServer:
+    """
+    Minimal OPA data API on an ephemeral localhost port.
+
+    `POST /v1/data/fabric/policy` evaluates `input`, and `POST /v1/data/fabric/policy/batch`
+    evaluates every entry of `input.resources`. Both use the fallback thresholds
+    (>=9 approval, >=8 remediate, else investigate) and report `revision` through
+    `provenance`, like a real OPA with `?provenance=true`. `GET /v1/data/fabric/decision_table`
+    serves `decision_table` for policy sync. Requests and distinct client connections
+    are counted so tests can assert on batching and pooling.
+    """
+
+    def __init__(self, revision: str = "r1"):
+        self.revision = revision
+        self.decision_table = None
+        self.requests = 0
+        self.resources = 0
+        self._connections = set()
+        self._runner = None
+        self.url = None
+
+    @property
+    def connections(self) -> int:
+        return len(self._connections)
+
+    @staticmethod
+    def decide(resource):
+        risk_score = resource["risk_score"]
+        if risk_score >= 9:
+            return {"action": "PENDING_APPROVAL", "require_approval": True, "reason": "stub"}
+        if risk_score >= 8:
+            return {"action": "remediate", "require_approval": False}
+        return {"action": "investigate", "require_approval": False}
+
+    def _provenance(self):
+        return {"bundles": {"fabric": {"revision": self.revision}}}
+
+    async def _single(self, request):
+        self._track(request)
+        body = await request.json()
+        self.resources += 1
+        return web.json_response({"result": self.decide(body["input"]), "provenance": self._provenance()})
+
+    async def _batch(self, request):
+        self._track(request)
+        resources = (await request.json())["input"]["resources"]
+        self.resources += len(resources)
+        return web.json_response({
+            "result": {"decisions": [self.decide(r) for r in resources]},
+            "provenance": self._provenance(),
+        })
+
+    async def _decision_table(self, request):
+        self._track(request)
+        return web.json_response({"result": self.decision_table} if self.decision_table else {})
+
+    def _track(self, request):
+        self.requests += 1
+        self._connections.add(request.transport.get_extra_info("peername"))
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_post("/v1/data/fabric/policy", self._single)
+        app.router.add_post("/v1/data/fabric/policy/batch", self._batch)
+        app.router.add_get("/v1/data/fabric/decision_table", self._decision_table)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.url = f"http://127.0.0.1:{port}/v1/data/fabric/policy"
+        return self.url
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
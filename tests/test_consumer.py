@@ -0,0 +1,91 @@
+"""Tests for batched Kafka consumption"""
+
+import asyncio
+from collections import namedtuple
+import pytest
+from src.message_queue.consumer import BatchConsumer
+
+
+Record = namedtuple("Record", ["partition", "offset", "value"])
+
+
+class FakeConsumer:
+    """Minimal stand-in for AIOKafkaConsumer's batch API"""
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.commits = []
+        self.seeks = []
+
+    async def getmany(self, timeout_ms=0, max_records=None):
+        return self.batches.pop(0) if self.batches else {}
+
+    async def commit(self, offsets=None):
+        self.commits.append(offsets)
+
+    def seek(self, tp, offset):
+        self.seeks.append((tp, offset))
+
+
+@pytest.mark.asyncio
+async def test_batch_commits_highest_contiguous_offset():
+    """Test one commit per batch, stopping each partition at its first failure"""
+    batch = {
+        "p0": [Record(0, o, b"{}") for o in range(10, 13)],
+        "p1": [Record(1, o, b"{}") for o in range(5, 9)],
+    }
+    consumer = FakeConsumer([batch])
+    seen = []
+
+    async def handler(record):
+        seen.append((record.partition, record.offset))
+        await asyncio.sleep(0)
+        return not (record.partition == 1 and record.offset == 7)
+
+    fetched = await BatchConsumer(consumer, handler, max_records=100, concurrency=2, linger_ms=0).poll_once()
+
+    assert fetched == 7
+    assert consumer.commits == [{"p0": 13, "p1": 7}]
+    assert consumer.seeks == [("p1", 7)]
+    # Per-partition order is preserved and nothing after the failure is handled
+    assert [o for p, o in seen if p == 0] == [10, 11, 12]
+    assert [o for p, o in seen if p == 1] == [5, 6, 7]
+
+
+@pytest.mark.asyncio
+async def test_empty_batch_does_not_commit():
+    """Test that an empty poll is a no-op"""
+    consumer = FakeConsumer([])
+
+    async def handler(record):
+        return True
+
+    assert await BatchConsumer(consumer, handler, max_records=10, concurrency=1, linger_ms=0).poll_once() == 0
+    assert consumer.commits == []
+
+
+@pytest.mark.asyncio
+async def test_batch_handler_commits_completed_prefix():
+    """Test that a batch handler receives whole partitions and partial completion rewinds"""
+    batch = {
+        "p0": [Record(0, o, b"{}") for o in range(10, 13)],
+        "p1": [Record(1, o, b"{}") for o in range(5, 9)],
+    }
+    consumer = FakeConsumer([batch])
+    calls = []
+
+    async def handler(record):
+        raise AssertionError("per-record handler must not be used")
+
+    async def batch_handler(records):
+        calls.append([r.offset for r in records])
+        return len(records) if records[0].partition == 0 else 2
+
+    fetched = await BatchConsumer(
+        consumer, handler, max_records=100, concurrency=2, linger_ms=0, batch_handler=batch_handler
+    ).poll_once()
+
+    assert fetched == 7
+    assert sorted(calls) == [[5, 6, 7, 8], [10, 11, 12]]
+    assert consumer.commits == [{"p0": 13, "p1": 7}]
+    assert consumer.seeks == [("p1", 7)]
@@ -0,0 +1,291 @@
+"""Tests for graph contextualization"""
+
+import asyncio
+import itertools
+from unittest.mock import patch
+import pytest
+from src.common.exceptions import GraphDatabaseError
+from src.layer3_moat.graph_client import GraphClient
+from src.layer3_moat.contextualizer import Contextualizer
+
+
+class InMemoryGraphClient(GraphClient):
+    """Dictionary-backed GraphClient that counts round-trips"""
+
+    def __init__(self):
+        self.nodes = {}
+        self.relationships = {}
+        self.calls = []
+        self._ids = itertools.count(1)
+
+    async def create_node(self, label, properties):
+        self.calls.append("create_node")
+        node_id = str(next(self._ids))
+        self.nodes[node_id] = {"label": label, **properties}
+        return node_id
+
+    async def create_relationship(self, from_id, to_id, rel_type, properties=None):
+        self.calls.append("create_relationship")
+        rel_id = str(next(self._ids))
+        self.relationships[rel_id] = (from_id, to_id, rel_type, properties or {})
+        return rel_id
+
+    async def create_nodes_batch(self, label, properties_list):
+        self.calls.append("create_nodes_batch")
+        ids = []
+        for properties in properties_list:
+            node_id = str(next(self._ids))
+            self.nodes[node_id] = {"label": label, **properties}
+            ids.append(node_id)
+        return ids
+
+    async def create_relationships_batch(self, rel_type, relationships):
+        self.calls.append("create_relationships_batch")
+        ids = []
+        for rel in relationships:
+            rel_id = str(next(self._ids))
+            self.relationships[rel_id] = (rel["from_id"], rel["to_id"], rel_type, rel.get("properties") or {})
+            ids.append(rel_id)
+        return ids
+
+    async def upsert_node(self, label, key, properties):
+        self.calls.append("upsert_node")
+        return self._upsert(label, key, properties)
+
+    async def upsert_nodes_batch(self, label, rows):
+        self.calls.append("upsert_nodes_batch")
+        return [self._upsert(label, row["key"], row["properties"]) for row in rows]
+
+    async def upsert_relationship(self, from_id, to_id, rel_type, properties=None):
+        self.calls.append("upsert_relationship")
+        return self._merge_relationship(from_id, to_id, rel_type, properties)
+
+    async def upsert_relationships_batch(self, rel_type, relationships):
+        self.calls.append("upsert_relationships_batch")
+        return [
+            self._merge_relationship(rel["from_id"], rel["to_id"], rel_type, rel.get("properties"))
+            for rel in relationships
+        ]
+
+    def _upsert(self, label, key, properties):
+        for node_id, node in self.nodes.items():
+            if node["label"] == label and node.get("natural_key") == key:
+                node.update(properties)
+                return node_id
+        node_id = str(next(self._ids))
+        self.nodes[node_id] = {"label": label, "natural_key": key, **properties}
+        return node_id
+
+    def _merge_relationship(self, from_id, to_id, rel_type, properties):
+        for rel_id, rel in self.relationships.items():
+            if rel[:3] == (from_id, to_id, rel_type):
+                return rel_id
+        rel_id = str(next(self._ids))
+        self.relationships[rel_id] = (from_id, to_id, rel_type, properties or {})
+        return rel_id
+
+    async def query(self, query, parameters=None):
+        self.calls.append("query")
+        if "MATCH (a:Asset" in query:
+            for node_id, node in self.nodes.items():
+                if (node["label"] == "Asset" and node.get("name") == parameters["name"]
+                        and node.get("hostname") == parameters["hostname"]):
+                    return [{"node_id": int(node_id)}]
+        return []
+
+    async def find_high_risk_nodes(self, threshold=7, time_window=None):
+        return []
+
+    async def iter_high_risk_nodes(self, threshold=7, time_window=None, page_size=None):
+        page_size = page_size or 2
+        risky = [
+            {"node_id": node_id, "data": dict(node), "labels": [node["label"]]}
+            for node_id, node in self.nodes.items()
+            if node.get("risk_score", 0) >= threshold
+            and (time_window is None or node.get("updated_at", 0) >= time_window)
+        ]
+        for start in range(0, len(risky), page_size):
+            yield risky[start:start + page_size]
+
+    async def find_shortest_path(self, start_node_id, end_node_id, max_depth=5):
+        return []
+
+    async def health_check(self):
+        return True
+
+
+def _vulnerability(cve, host):
+    return {
+        "class_uid": 2002,
+        "severity_id": 4,
+        "severity": "high",
+        "time": 1700000000,
+        "metadata": {"source": "tenable"},
+        "vulnerability": {"cve": cve, "name": cve},
+        "asset": {"name": host, "hostname": host},
+    }
+
+
+@pytest.mark.asyncio
+async def test_ingest_batch_uses_bulk_writes():
+    """Test that a batch flush issues one bulk write per label and relationship type"""
+    graph = InMemoryGraphClient()
+    contextualizer = Contextualizer(graph_client=graph)
+    records = [_vulnerability(f"CVE-2024-{i}", "web01") for i in range(5)]
+
+    node_ids = await contextualizer.ingest_ocsf_batch(records)
+
+    assert len(node_ids) == 5
+    assert graph.calls.count("upsert_nodes_batch") == 1
+    assert graph.calls.count("upsert_relationships_batch") == 1
+    assert "create_node" in graph.calls  # the shared Asset node
+    assert len(graph.relationships) == 5
+    assert all(rel[2] == "HAS_VULNERABILITY" for rel in graph.relationships.values())
+
+
+@pytest.mark.asyncio
+async def test_write_behind_flushes_in_batches_and_on_shutdown():
+    """Test that buffered records are batched and fully flushed on stop"""
+    graph = InMemoryGraphClient()
+    contextualizer = Contextualizer(graph_client=graph)
+    await contextualizer.start_write_behind()
+    contextualizer._write_behind.batch_size = 4
+    contextualizer._write_behind.flush_interval = 60
+
+    acks = [await contextualizer.queue_ocsf_data(_vulnerability(f"CVE-2024-{i}", "web01")) for i in range(10)]
+    await asyncio.sleep(0)
+    assert not acks[-1].done()  # last partial batch is still buffered
+
+    await contextualizer.stop_write_behind()
+
+    vulns = [node_id for node_id, n in graph.nodes.items() if n["label"] == "Vulnerability"]
+    assert len(vulns) == 10
+    assert graph.calls.count("upsert_nodes_batch") == 3  # 4 + 4 + 2 on shutdown
+    assert sorted([await ack for ack in acks]) == sorted(vulns)
+
+
+@pytest.mark.asyncio
+async def test_write_behind_failed_flush_fails_acks_instead_of_dropping():
+    """Test that records of a batch that cannot be written surface the error to their producers"""
+    graph = InMemoryGraphClient()
+    contextualizer = Contextualizer(graph_client=graph)
+    await contextualizer.start_write_behind()
+    contextualizer._write_behind.flush_interval = 0.01
+
+    async def failing_flush(records):
+        raise RuntimeError("graph unavailable")
+
+    contextualizer._write_behind.flush = failing_flush
+    with patch("src.layer3_moat.write_behind.settings.max_retries", 0):
+        with pytest.raises(GraphDatabaseError):
+            await contextualizer.ingest_ocsf_data(_vulnerability("CVE-2024-1", "web01"))
+
+    assert contextualizer._write_behind.stats["records_failed"] == 1
+    await contextualizer.stop_write_behind()
+
+
+@pytest.mark.asyncio
+async def test_sequential_single_ingests_do_not_wait_for_the_flush_interval():
+    """Test that a caller awaiting one record gets it flushed without lingering"""
+    graph = InMemoryGraphClient()
+    contextualizer = Contextualizer(graph_client=graph)
+    await contextualizer.start_write_behind()
+    contextualizer._write_behind.flush_interval = 60
+
+    # Each ingest would block for a minute if the flusher lingered on a lone record
+    for i in range(8):
+        await asyncio.wait_for(contextualizer.ingest_ocsf_data(_vulnerability(f"CVE-2024-{i}", "web01")), timeout=5)
+
+    assert contextualizer._write_behind.stats["records_written"] == 8
+    await contextualizer.stop_write_behind()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_ingests_share_asset_lookup():
+    """Test that a new asset seen concurrently is created once and then served from cache"""
+    graph = InMemoryGraphClient()
+    contextualizer = Contextualizer(graph_client=graph)
+
+    await asyncio.gather(*(
+        contextualizer.ingest_ocsf_data(_vulnerability(f"CVE-2024-{i}", "db01")) for i in range(5)
+    ))
+    await contextualizer.ingest_ocsf_data(_vulnerability("CVE-2024-99", "db01"))
+
+    assets = [n for n in graph.nodes.values() if n["label"] == "Asset"]
+    assert len(assets) == 1
+    assert graph.calls.count("query") == 1
+    assert contextualizer.asset_lookups_shared == 4
+    assert contextualizer.asset_cache.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_asset_created_by_another_consumer_is_reread_not_dead_lettered():
+    """Test that losing the asset_identity race reuses the winner's Asset node"""
+    graph = InMemoryGraphClient()
+    contextualizer = Contextualizer(graph_client=graph)
+    create_node = graph.create_node
+
+    async def racing_create_node(label, properties):
+        # Another consumer commits the same asset between our MATCH and CREATE
+        await create_node(label, properties)
+        raise RuntimeError("ConstraintValidationFailed: asset_identity")
+
+    with patch.object(graph, "create_node", racing_create_node):
+        node_id = await contextualizer.ingest_ocsf_data(_vulnerability("CVE-2024-1", "db01"))
+
+    assets = [node_id for node_id, n in graph.nodes.items() if n["label"] == "Asset"]
+    assert len(assets) == 1
+    assert graph.calls.count("query") == 2
+    assert graph.relationships[next(iter(graph.relationships))][:2] == (assets[0], node_id)
+
+    failing = Contextualizer(graph_client=InMemoryGraphClient())
+    with patch.object(failing.graph, "create_node", side_effect=RuntimeError("graph down")):
+        with pytest.raises(GraphDatabaseError):
+            await failing.ingest_ocsf_data(_vulnerability("CVE-2024-2", "db02"))
+
+
+def test_asset_cache_evicts_least_recently_used():
+    """Test LRU eviction order"""
+    from src.layer3_moat.asset_cache import AssetCache
+
+    cache = AssetCache(max_size=2, ttl_seconds=0)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"
+    cache.put("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.stats()["misses"] == 1
+
+
+@pytest.mark.asyncio
+async def test_repolled_finding_is_updated_in_place():
+    """Test that re-ingesting the same finding does not duplicate nodes or edges"""
+    graph = InMemoryGraphClient()
+    contextualizer = Contextualizer(graph_client=graph)
+    record = _vulnerability("CVE-2024-1", "web01")
+
+    first = await contextualizer.ingest_ocsf_data(record)
+    record["severity_id"] = 5
+    second = await contextualizer.ingest_ocsf_data(record)
+    await contextualizer.ingest_ocsf_batch([record])
+
+    assert first == second
+    assert len([n for n in graph.nodes.values() if n["label"] == "Vulnerability"]) == 1
+    assert graph.nodes[first]["severity_id"] == 5
+    assert len(graph.relationships) == 1
+
+
+def test_global_contextualizer_is_built_on_first_use():
+    """Test that the module-level contextualizer opens its graph client lazily, once"""
+    from src.layer3_moat import contextualizer as module
+
+    graph = InMemoryGraphClient()
+    with patch.object(module, "_contextualizer", None), \
+            patch.object(module, "get_graph_client", return_value=graph) as factory:
+        assert factory.call_count == 0
+        first = module.get_contextualizer()
+        assert module.contextualizer is first
+        assert first.graph is graph
+        assert factory.call_count == 1
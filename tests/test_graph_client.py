@@ -0,0 +1,265 @@
+"""Tests for graph database clients"""
+
+import asyncio
+import itertools
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+import pytest
+from neo4j.exceptions import TransientError
+from src.layer3_moat.graph_client import Neo4jClient, NeptuneClient
+
+
+class FakeResult:
+    def __init__(self, records):
+        self._records = list(records)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._records:
+            raise StopAsyncIteration
+        return self._records.pop(0)
+
+
+class FakeTransaction:
+    def __init__(self, driver):
+        self.driver = driver
+
+    async def run(self, query, parameters=None):
+        self.driver.statements.append(query)
+        if self.driver.transient_failures:
+            self.driver.transient_failures -= 1
+            raise TransientError("deadlock detected")
+        return FakeResult(self.driver.records)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.driver.outcomes.append("rollback" if exc_type else "commit")
+
+
+class FakeSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    async def begin_transaction(self):
+        return FakeTransaction(self.driver)
+
+    async def execute_write(self, work, *args):
+        # Like the driver: rerun the transaction function on transient errors
+        for attempt in range(3):
+            try:
+                return await work(FakeTransaction(self.driver), *args)
+            except TransientError:
+                if attempt == 2:
+                    raise
+
+    async def __aenter__(self):
+        self.driver.sessions += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        pass
+
+
+class FakeDriver:
+    def __init__(self):
+        self.sessions = 0
+        self.statements = []
+        self.outcomes = []
+        self.records = [{"node_id": 1, "i": 0, "rel_id": 2}]
+        self.transient_failures = 0
+
+    def session(self):
+        return FakeSession(self)
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_shares_one_session_and_transaction():
+    """Test that calls inside a unit of work run on a single transaction"""
+    client = Neo4jClient()
+    client.driver = FakeDriver()
+
+    async with client.unit_of_work() as uow:
+        node_id = await uow.upsert_node("Finding", "splunk:1@", {"risk_score": 8})
+        await uow.upsert_relationship("5", node_id, "AFFECTED_BY", {})
+
+    assert client.driver.sessions == 1
+    assert len(client.driver.statements) == 2
+    assert client.driver.outcomes == ["commit"]
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_rolls_back_on_error():
+    """Test that an error inside a unit of work does not commit"""
+    client = Neo4jClient()
+    client.driver = FakeDriver()
+
+    with pytest.raises(RuntimeError):
+        async with client.unit_of_work() as uow:
+            await uow.create_node("Asset", {"name": "web01"})
+            raise RuntimeError("boom")
+
+    assert client.driver.outcomes == ["rollback"]
+
+
+@pytest.mark.asyncio
+async def test_run_in_unit_of_work_replays_the_whole_unit_on_transient_errors():
+    """Test that a deadlock mid-unit reruns every call of the unit on a managed transaction"""
+    client = Neo4jClient()
+    client.driver = FakeDriver()
+    client.driver.transient_failures = 1
+
+    async def write(uow):
+        node_id = await uow.upsert_node("Finding", "splunk:1@", {"risk_score": 8})
+        await uow.upsert_relationship("5", node_id, "AFFECTED_BY", {})
+        return node_id
+
+    assert await client.run_in_unit_of_work(write) == "1"
+    assert client.driver.sessions == 1
+    # The failed first statement, then both statements of the replayed unit
+    assert len(client.driver.statements) == 3
+
+
+@pytest.mark.asyncio
+async def test_batch_relationship_ids_stay_aligned_when_endpoints_are_missing():
+    """Test that rows whose MATCH finds no endpoints come back as None in their own slot"""
+    client = Neo4jClient()
+    client.driver = FakeDriver()
+    # Row 1 matched nothing, so the statement only returns rows 0 and 2
+    client.driver.records = [{"i": 0, "rel_id": 10}, {"i": 2, "rel_id": 12}]
+    rels = [{"from_id": "1", "to_id": str(to_id)} for to_id in (2, 404, 3)]
+
+    assert await client.create_relationships_batch("AFFECTED_BY", rels) == ["10", None, "12"]
+    assert await client.upsert_relationships_batch("AFFECTED_BY", rels) == ["10", None, "12"]
+    assert all("RETURN i, id(r)" in query for query in client.driver.statements)
+
+
+class PagedNodeSession:
+    """Session answering keyset-paged risk queries from an in-memory node table"""
+
+    def __init__(self, driver):
+        self.driver = driver
+
+    async def run(self, query, parameters):
+        self.driver.statements.append(parameters)
+        label = query.split("MATCH (n:")[1].split(")")[0]
+        rows = [
+            {"n": props, "labels": [label], "node_id": node_id}
+            for node_id, props in sorted(self.driver.nodes.get(label, {}).items())
+            if node_id > parameters["after"] and props["risk_score"] >= parameters["threshold"]
+        ]
+        return FakeResult(rows[:parameters["limit"]])
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_iter_high_risk_nodes_pages_by_node_id():
+    """Test that the risk scan walks each label in bounded keyset pages"""
+    client = Neo4jClient()
+    client.driver = SimpleNamespace(
+        statements=[],
+        nodes={
+            "Asset": {i: {"risk_score": 9} for i in range(1, 6)},
+            "Finding": {10: {"risk_score": 3}, 11: {"risk_score": 8}},
+        },
+    )
+    client.driver.session = lambda: PagedNodeSession(client.driver)
+
+    pages = [page async for page in client.iter_high_risk_nodes(threshold=7, page_size=2)]
+
+    assert [len(page) for page in pages] == [2, 2, 1, 1]
+    assert [node["node_id"] for page in pages for node in page] == ["1", "2", "3", "4", "5", "11"]
+    assert [params["after"] for params in client.driver.statements] == [-1, 2, 4, -1, -1]
+
+
+class BlockingGremlinServer:
+    """
+    Stand-in for a remote Gremlin Server traversal source.
+    
+    Building traversals is local and chainable; terminal steps block the calling
+    thread until `release` is set, as gremlinpython's driver does on a round-trip.
+    """
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.release.set()
+        self.threads = []
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def next(self):
+        with self._lock:
+            self.threads.append(threading.current_thread())
+        self.release.wait(timeout=5)
+        return SimpleNamespace(id=next(self._ids))
+
+
+def _neptune_client(workers):
+    gremlin_modules = {
+        "gremlin_python": MagicMock(),
+        "gremlin_python.driver.driver_remote_connection": MagicMock(),
+        "gremlin_python.structure.graph": MagicMock(),
+    }
+    with patch.dict("sys.modules", gremlin_modules), \
+            patch("src.layer3_moat.graph_client.settings.neptune_max_workers", workers):
+        client = NeptuneClient()
+    client.g = BlockingGremlinServer()
+    return client
+
+
+@pytest.mark.asyncio
+async def test_neptune_round_trips_do_not_block_event_loop():
+    """Test that blocking Neptune calls run on the worker pool while the event loop keeps running"""
+    client = _neptune_client(workers=4)
+    client.g.release.clear()
+    writes = asyncio.gather(*(client.create_node("Finding", {"uid": i}) for i in range(16)))
+
+    # The loop keeps ticking while every worker is blocked in a round-trip
+    ticks = 0
+    while len(client.g.threads) < 4 and ticks < 1000:
+        await asyncio.sleep(0.001)
+        ticks += 1
+    blocked = list(client.g.threads)
+    client.g.release.set()
+    node_ids = await writes
+    await client.close()
+
+    assert len(blocked) == 4 and ticks > 0
+    assert len(set(node_ids)) == 16
+    assert threading.main_thread() not in client.g.threads
+    assert {thread.name.split("_")[0] for thread in client.g.threads} == {"neptune"}
+    assert len(set(client.g.threads)) == 4
+
+
+@pytest.mark.asyncio
+async def test_neptune_batch_upserts_send_one_traversal_per_chunk():
+    """Test that Neptune batch upserts chain rows into one traversal per `neptune_batch_size` chunk"""
+    client = _neptune_client(workers=2)
+    submitted = []
+
+    def select_ids(traversal, keys):
+        submitted.append(keys)
+        return [f"{key}-{len(submitted)}" for key in keys]
+
+    client._select_ids = select_ids
+    rows = [{"key": f"asset-{i}", "properties": {"risk": i}} for i in range(5)]
+    relationships = [{"from_id": f"f{i}", "to_id": f"t{i}"} for i in range(5)]
+    with patch("src.layer3_moat.graph_client.settings.neptune_batch_size", 2):
+        node_ids = await client.upsert_nodes_batch("Asset", rows)
+        rel_ids = await client.upsert_relationships_batch("AFFECTS", relationships)
+    await client.close()
+
+    assert len(node_ids) == 5 and len(rel_ids) == 5
+    assert [len(keys) for keys in submitted] == [2, 2, 1, 2, 2, 1]
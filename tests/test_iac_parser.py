@@ -0,0 +1,179 @@
+"""Tests for the IaC parser"""
+
+import os
+import shutil
+import subprocess
+from unittest.mock import patch
+from src.layer4_agentic.iac_parser import IaCParser
+from src.layer4_agentic.repo_cache import RepoMirrorCache
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def _tree(tmp_path):
+    shutil.copy(os.path.join(FIXTURES, "sample_cfn.yaml"), tmp_path / "cfn.yaml")
+    shutil.copy(os.path.join(FIXTURES, "sample_iac.tf"), tmp_path / "main.tf")
+    (tmp_path / "modules").mkdir()
+    shutil.copy(os.path.join(FIXTURES, "sample_cfn.yaml"), tmp_path / "modules" / "nested.yml")
+    return tmp_path
+
+
+def _git(cwd, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd, check=True, capture_output=True
+    )
+
+
+def _remote(tmp_path, name="origin"):
+    """Create a bare repository with one commit of the sample tree; returns (url, work dir)"""
+    bare, work = tmp_path / f"{name}.git", tmp_path / f"{name}-work"
+    _git(tmp_path, "init", "--bare", "-b", "main", str(bare))
+    work.mkdir()
+    _tree(work)
+    _git(work, "init", "-b", "main")
+    _git(work, "add", ".")
+    _git(work, "commit", "-m", "initial")
+    _git(work, "push", str(bare), "main")
+    return f"file://{bare}", work
+
+
+def test_unchanged_files_are_served_from_manifest(tmp_path):
+    """Test that a rescan of an unchanged tree parses nothing"""
+    root = _tree(tmp_path)
+    parser = IaCParser(cache_enabled=True)
+
+    first = parser.parse_directory(str(root))
+    with patch.object(parser, "_parse_file", wraps=parser._parse_file) as parse:
+        second = parser.parse_directory(str(root))
+
+    assert parse.call_count == 0
+    assert second == first
+    assert parser.last_scan == {"files": 3, "parsed": 0, "cached": 3}
+    assert parser.cache_stats()["misses"] == 3
+
+
+def test_only_modified_and_new_files_are_reparsed(tmp_path):
+    """Test that edits, touches, additions and deletions are tracked per file"""
+    root = _tree(tmp_path)
+    parser = IaCParser(cache_enabled=True)
+    parser.parse_directory(str(root))
+
+    (root / "cfn.yaml").write_text("Resources: {}\n")
+    os.utime(root / "main.tf")  # touched, content unchanged
+    shutil.copy(os.path.join(FIXTURES, "sample_cfn.yaml"), root / "new.json.yaml")
+    os.remove(root / "modules" / "nested.yml")
+
+    with patch.object(parser, "_parse_file", wraps=parser._parse_file) as parse:
+        risks = parser.parse_directory(str(root))
+
+    assert sorted(os.path.basename(c.args[0]) for c in parse.call_args_list) == ["cfn.yaml", "new.json.yaml"]
+    assert parser.last_scan == {"files": 3, "parsed": 2, "cached": 1}
+    assert {r["file"] for r in risks} <= {"new.json.yaml", "main.tf"}
+    assert parser.cache_stats()["files"] == 3
+
+
+def test_process_pool_scan_matches_serial_order(tmp_path):
+    """Test that a pooled scan returns the same risks in the same order as a serial one"""
+    root = _tree(tmp_path)
+    for i in range(6):
+        shutil.copy(os.path.join(FIXTURES, "sample_cfn.yaml"), root / "modules" / f"stack{i}.yaml")
+
+    serial = IaCParser(cache_enabled=False, workers=0).parse_directory(str(root))
+    pooled_parser = IaCParser(cache_enabled=False, workers=2)
+    with patch("src.layer4_agentic.iac_parser.settings.iac_parallel_min_files", 1):
+        pooled = pooled_parser.parse_directory(str(root))
+    pooled_parser.close()
+
+    assert pooled == serial
+    assert len([r for r in pooled if r["source"] == "iac_scanner_cfn"]) == 8
+
+
+def test_rule_modules_are_loaded_and_dispatched_by_type(tmp_path):
+    """Test that plugin rules load from a directory and only run for their resource type"""
+    rules_dir = tmp_path / "rules"
+    rules_dir.mkdir()
+    (rules_dir / "rds.py").write_text(
+        "CLOUDFORMATION_RULES = [{\n"
+        "    'id': 'CUSTOM-RDS-001', 'name': 'Public RDS', 'resource_type': 'AWS::RDS::DBInstance',\n"
+        "    'check': lambda r: r.get('Properties', {}).get('PubliclyAccessible') is True,\n"
+        "    'risk_score': 8, 'description': 'RDS instance is publicly accessible',\n"
+        "}]\n"
+    )
+    template = tmp_path / "stack.yaml"
+    template.write_text(
+        "Resources:\n"
+        "  Db:\n"
+        "    Type: AWS::RDS::DBInstance\n"
+        "    Properties: {PubliclyAccessible: true}\n"
+    )
+
+    with patch("src.layer4_agentic.iac_parser.settings.iac_rules_dir", str(rules_dir)):
+        parser = IaCParser(cache_enabled=False)
+
+    assert [r["rule_id"] for r in parser.parse_cloudformation_file(str(template))] == ["CUSTOM-RDS-001"]
+    assert [r["id"] for r in parser.rules.rules_for("cloudformation", "AWS::EC2::SecurityGroup")] == ["IAC-CFN-001"]
+    assert parser.rules.rules_for("terraform", "aws_iam_role") == ()
+
+
+def test_non_cloudformation_files_and_vendor_dirs_are_not_parsed(tmp_path):
+    """Test that only sniffed CloudFormation templates reach the YAML/JSON parser"""
+    root = _tree(tmp_path)
+    (root / "values.yaml").write_text("replicaCount: 2\nresources:\n  limits: {cpu: 1}\n")
+    (root / "package-lock.json").write_text('{"name": "app", "packages": {"": {"version": "1.0.0"}}}')
+    (root / "template.json").write_text('{"Parameters": {}, "Resources": {"B": {"Type": "AWS::S3::Bucket"}}}')
+    for vendored in ("node_modules/pkg", ".git/hooks", "vendor"):
+        (root / vendored).mkdir(parents=True)
+        shutil.copy(os.path.join(FIXTURES, "sample_cfn.yaml"), root / vendored / "stack.yaml")
+
+    parser = IaCParser(cache_enabled=False)
+    with patch.object(parser, "parse_cloudformation_file", wraps=parser.parse_cloudformation_file) as parse:
+        risks = parser.parse_directory(str(root))
+
+    parsed = sorted(os.path.relpath(c.args[0], root) for c in parse.call_args_list)
+    assert parsed == ["cfn.yaml", os.path.join("modules", "nested.yml"), "template.json"]
+    assert {"IAC-CFN-002"} <= {r["rule_id"] for r in risks}
+    assert parser.last_scan["files"] == 6
+
+
+def test_repository_rescans_only_files_changed_since_last_commit(tmp_path):
+    """Test that repeat scans reuse the mirror and parse only the git diff"""
+    url, work = _remote(tmp_path)
+    parser = IaCParser(cache_enabled=True)
+    parser.repo_cache = RepoMirrorCache(str(tmp_path / "mirrors"))
+
+    first = parser.scan_repository(url)
+    assert parser.last_scan["parsed"] == 3
+
+    with patch.object(parser, "_parse_file", wraps=parser._parse_file) as parse:
+        assert parser.scan_repository(url) == first
+    assert parse.call_count == 0
+
+    shutil.copy(os.path.join(FIXTURES, "sample_cfn.yaml"), work / "modules" / "added.yaml")
+    os.remove(work / "cfn.yaml")
+    _git(work, "add", "-A")
+    _git(work, "commit", "-m", "change")
+    _git(work, "push", str(tmp_path / "origin.git"), "main")
+
+    with patch.object(parser, "_parse_file", wraps=parser._parse_file) as parse:
+        risks = parser.scan_repository(url)
+
+    assert [os.path.basename(c.args[0]) for c in parse.call_args_list] == ["added.yaml"]
+    repo_path = os.path.join(parser.repo_cache.cache_dir, RepoMirrorCache.key(url, "main"))
+    assert risks == IaCParser(cache_enabled=False).parse_directory(repo_path)
+    assert parser.last_scan == {"files": 3, "parsed": 1, "cached": 2}
+
+
+def test_least_recently_used_mirror_is_evicted(tmp_path):
+    """Test that mirrors beyond the size budget are removed oldest first"""
+    cache = RepoMirrorCache(str(tmp_path / "mirrors"), max_bytes=1)
+    first_url, _ = _remote(tmp_path, "first")
+    second_url, _ = _remote(tmp_path, "second")
+
+    first_path, _, _ = cache.sync(first_url)
+    second_path, _, changed = cache.sync(second_url)
+
+    assert changed is None
+    assert not os.path.exists(first_path)
+    assert os.path.isdir(second_path)
+    assert list(cache._read_index()) == [RepoMirrorCache.key(second_url, "main")]
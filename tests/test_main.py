@@ -0,0 +1,87 @@
+"""Tests for the fabric's Kafka message handling"""
+
+import asyncio
+import json
+import pickle
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, patch
+import pytest
+import src.main as fabric_main
+from src.common.exceptions import GraphDatabaseError
+from src.layer2_normalization.transformer import transformer
+from src.layer2_normalization.worker_pool import _init_worker
+
+Message = namedtuple("Message", ["value", "offset", "partition", "topic"])
+
+
+def _messages(count):
+    return [
+        Message(
+            json.dumps({"connector_id": "c1", "data": {"severity": "high", "title": f"alert {i}"}}).encode(),
+            i, 0, "alerts"
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_handle_batch_waits_for_write_behind_flush_and_dead_letters_failures():
+    """Test that a batch is only reported committable once every record is written or dead-lettered"""
+    fabric = fabric_main.UniversalAgenticFabric()
+    loop = asyncio.get_running_loop()
+    acks = [loop.create_future() for _ in range(3)]
+    queue = AsyncMock(side_effect=acks)
+
+    with patch.object(fabric, "_identify_source", return_value="splunk"), \
+            patch.object(fabric_main.contextualizer, "queue_ocsf_data", queue), \
+            patch.object(fabric, "_send_to_dlq", AsyncMock()) as dlq:
+        handled = asyncio.create_task(fabric._handle_batch(_messages(3)))
+        await asyncio.sleep(0.05)
+        assert queue.await_count == 3
+        # Only the last record releases the write-behind linger
+        assert [call.kwargs["linger"] for call in queue.await_args_list] == [True, True, False]
+        assert not handled.done()  # offsets must not be committed before the flush
+
+        acks[0].set_result("n0")
+        acks[1].set_exception(GraphDatabaseError("flush failed"))
+        acks[2].set_result("n2")
+        assert await handled == 3
+
+    assert [call.args[0].offset for call in dlq.await_args_list] == [1]
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """Stands in for the normalization process pool, recording each chunk it runs"""
+
+    def __init__(self):
+        snapshot = transformer.registry.snapshot
+        super().__init__(max_workers=2, initializer=_init_worker, initargs=(snapshot.version, pickle.dumps(snapshot)))
+        self.chunks = []
+
+    def submit(self, fn, *args, **kwargs):
+        self.chunks.append(len(args[0]))
+        return super().submit(fn, *args, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_handle_batch_normalizes_on_the_worker_pool():
+    """Test that a Kafka-sized batch reaches the workers when normalization_workers > 1"""
+    with patch("src.layer2_normalization.worker_pool.settings.normalization_workers", 2):
+        fabric = fabric_main.UniversalAgenticFabric()
+    executor = CountingExecutor()
+    loop = asyncio.get_running_loop()
+
+    def written(ocsf, linger=True):
+        ack = loop.create_future()
+        ack.set_result(ocsf["finding"]["title"])
+        return ack
+
+    with patch.object(fabric, "_identify_source", return_value="splunk"), \
+            patch.object(fabric.normalization_pool, "_get_pool", return_value=executor), \
+            patch.object(fabric_main.contextualizer, "queue_ocsf_data", AsyncMock(side_effect=written)) as queue:
+        assert await fabric._handle_batch(_messages(5)) == 5
+    executor.shutdown()
+
+    assert executor.chunks == [3, 2]
+    assert [call.args[0]["finding"]["title"] for call in queue.await_args_list] == [f"alert {i}" for i in range(5)]
@@ -1,8 +1,16 @@
 """Tests for normalization engine"""
 
+import asyncio
+from unittest.mock import patch
 import pytest
-from src.layer2_normalization.transformer import transformer
-from src.layer2_normalization.ocsf_schema import map_severity_to_ocsf, OCSFSeverityID
+from src.layer2_normalization.transformer import transformer, TransformationEngine
+from src.layer2_normalization.ocsf_schema import (
+    map_severity_to_ocsf, OCSFSeverityID, VulnerabilityFindingRecord, FindingRecord
+)
+from src.layer2_normalization.strategies import ConfigurableStrategy, TransformationStrategy
+from src.layer2_normalization.mapping_registry import MappingSnapshot
+from src.layer2_normalization.worker_pool import NormalizationPool
+from src.common.exceptions import NormalizationError, OCSFValidationError
 
 
 def test_severity_mapping():
@@ -34,3 +42,203 @@ async def test_tenable_transformation():
     assert "vulnerability" in ocsf_data
     assert ocsf_data["vulnerability"]["cve"] == "CVE-2024-123"
 
+
+
+def test_slot_records_match_pydantic_models():
+    """Test that hot-path records serialize exactly like the pydantic models"""
+    vuln = VulnerabilityFindingRecord(
+        severity_id=4, severity="high", time=1704067200,
+        vulnerability={"cve": "CVE-2024-123"}, metadata={"source": "tenable"}
+    )
+    finding = FindingRecord(severity_id=2, severity="low", time=1704067200, finding={"title": "x"})
+
+    for record in (vuln, finding):
+        assert record.to_dict() == record.to_model().model_dump()
+        assert list(record.to_dict()) == list(record.to_model().model_dump())
+    assert type(vuln.to_dict()["class_uid"]) is int
+
+    with pytest.raises(OCSFValidationError):
+        FindingRecord(severity_id=9, severity="?", time=0, finding={})
+
+
+@pytest.mark.asyncio
+async def test_compiled_mapping_rules(tmp_path):
+    """Test that compiled YAML rules set nested paths, bind transforms and copy connector_id"""
+    mapping = tmp_path / "acme.yaml"
+    mapping.write_text(
+        "rules:\n"
+        "  - {input: sev, output: severity_id, transform: map_severity}\n"
+        "  - {input: host, output: asset.network.hostname, transform: lowercase_string}\n"
+        "  - {input: seen, output: time, transform: to_timestamp}\n"
+        "  - {input: tag, output: metadata.tag, transform: not_a_transform}\n"
+        "defaults: {class_uid: 2001, class_name: Finding, source: acme}\n"
+    )
+    strategy = ConfigurableStrategy(str(mapping))
+
+    result = await strategy.transform(
+        {"sev": "High", "host": "WEB-1", "seen": "2024-01-01T00:00:00Z", "tag": "X", "connector_id": "c1"}
+    )
+
+    assert result["severity_id"] == OCSFSeverityID.HIGH.value
+    assert result["asset"] == {"network": {"hostname": "web-1"}}
+    assert result["time"] == 1704067200
+    assert result["metadata"]["tag"] == "X"
+    assert result["metadata"]["connector_id"] == "c1"
+    assert (await strategy.transform({}))["severity"] == "unknown"
+
+
+def test_transform_many_groups_sources_and_isolates_errors():
+    """Test that mixed batches keep input order and report failures per record"""
+    records = [
+        ("tenable", {"severity": "high", "cve": "CVE-2024-1", "timestamp": "2024-01-01T00:00:00Z"}),
+        ("Splunk", {"severity": "low", "title": "Failed login", "timestamp": "2024-01-01T00:00:00Z"}),
+        ("splunk", {"severity": None}),
+        ("nope", {}),
+        ("splunk", {"severity": "critical", "title": "Ransomware", "timestamp": "2024-01-01T00:00:00Z"}),
+    ]
+
+    results, errors = transformer.transform_many(records)
+
+    assert [r and r["class_uid"] for r in results] == [2002, 2001, None, None, 2001]
+    assert results[4]["finding"]["title"] == "Ransomware"
+    assert sorted(errors) == [2, 3]
+    assert all(isinstance(e, NormalizationError) for e in errors.values())
+
+
+def test_strategies_implementing_only_async_transform_still_work():
+    """Test that pre-existing strategies overriding only `transform` run on the batch path"""
+    class LegacyStrategy(TransformationStrategy):
+        async def transform(self, data):
+            return {"class_uid": 2001, "finding": {"title": data["title"]}}
+
+    class AwaitingStrategy(TransformationStrategy):
+        async def transform(self, data):
+            await asyncio.sleep(0)
+            return {}
+
+    engine = TransformationEngine()
+    snapshot = MappingSnapshot(1, {"legacy": LegacyStrategy(), "awaiting": AwaitingStrategy()})
+
+    results, errors = engine.transform_batch("legacy", [{"title": "a"}, {}], snapshot)
+    assert results[0] == {"class_uid": 2001, "finding": {"title": "a"}} and list(errors) == [1]
+    assert asyncio.run(LegacyStrategy().transform({"title": "b"}))["finding"]["title"] == "b"
+    assert list(engine.transform_batch("awaiting", [{}], snapshot)[1]) == [0]
+    with pytest.raises(TypeError):
+        type("EmptyStrategy", (TransformationStrategy,), {})
+
+
+async def test_worker_pool_matches_in_process_normalization():
+    """Test that chunked multi-process normalization returns in-process results in order"""
+    records = [
+        (source, {"severity": severity, "title": f"alert {i}", "cve": f"CVE-2024-{i}",
+                  "timestamp": "2024-01-01T00:00:00Z"})
+        for i, (source, severity) in enumerate(
+            [("tenable", "high"), ("splunk", "low"), ("splunk", None), ("nope", "low"), ("splunk", "critical")]
+        )
+    ]
+
+    pool = NormalizationPool(workers=2, chunk_size=2)
+    try:
+        results, errors, mapping_version = await pool.transform_many(records)
+    finally:
+        pool.close()
+
+    expected, expected_errors = transformer.transform_many(records)
+    assert results == expected
+    assert {idx: str(e) for idx, e in errors.items()} == {idx: str(e) for idx, e in expected_errors.items()}
+    assert sorted(errors) == [2, 3]
+    assert mapping_version == transformer.registry.version
+
+
+async def test_worker_chunks_use_the_parents_mapping_snapshot(tmp_path):
+    """Test that every chunk of a batch runs the mapping version the parent picked"""
+    mapping = tmp_path / "splunk.yaml"
+    mapping.write_text("rules:\n  - {input: title, output: finding.title}\ndefaults: {class_uid: 2001, source: v1}\n")
+    engine = TransformationEngine(mapping_dir=str(tmp_path))
+    records = [("splunk", {"title": f"alert {i}"}) for i in range(4)]
+
+    pool = NormalizationPool(workers=2, chunk_size=1)
+    try:
+        with patch("src.layer2_normalization.worker_pool.transformer", engine):
+            # Workers load config/mappings themselves; the parent's tmp mapping must win
+            first = await pool.transform_many(records)
+            mapping.write_text("rules:\n  - {input: title, output: finding.name}\ndefaults: {class_uid: 2001, source: v2}\n")
+            engine.registry.reload()
+            second = await pool.transform_many(records)
+    finally:
+        pool.close()
+
+    assert first[2] == 1 and {r["metadata"]["source"] for r in first[0]} == {"v1"}
+    assert second[2] == 2 and {r["metadata"]["source"] for r in second[0]} == {"v2"}
+    assert [r["finding"]["name"] for r in second[0]] == [f"alert {i}" for i in range(4)]
+
+
+async def test_workers_compile_each_mapping_version_once_not_per_chunk(tmp_path):
+    """Test that workers reuse their compiled snapshot across chunks until the version changes"""
+    from concurrent.futures import ThreadPoolExecutor
+    from src.layer2_normalization import worker_pool
+
+    mapping = tmp_path / "splunk.yaml"
+    mapping.write_text("rules:\n  - {input: title, output: finding.title}\ndefaults: {class_uid: 2001, source: v1}\n")
+    engine = TransformationEngine(mapping_dir=str(tmp_path))
+    records = [("splunk", {"title": f"alert {i}"}) for i in range(8)]
+
+    def in_process_pool(max_workers, mp_context, initializer, initargs):
+        # Threads share one worker cache, which makes compile counts deterministic
+        return ThreadPoolExecutor(max_workers=1, initializer=initializer, initargs=initargs)
+
+    pool = NormalizationPool(workers=2, chunk_size=1)
+    try:
+        with patch.object(worker_pool, "transformer", engine), \
+                patch.object(worker_pool, "ProcessPoolExecutor", in_process_pool), \
+                patch.dict(worker_pool._snapshots, clear=True), \
+                patch.object(ConfigurableStrategy, "_compile", autospec=True,
+                             side_effect=ConfigurableStrategy._compile) as compile_:
+            await pool.transform_many(records)
+            await pool.transform_many(records)
+            assert compile_.call_count == 1
+
+            mapping.write_text("rules:\n  - {input: title, output: finding.name}\ndefaults: {class_uid: 2001, source: v2}\n")
+            engine.registry.reload()
+            compile_.reset_mock()
+            results, _, version = await pool.transform_many(records)
+            assert compile_.call_count == 1  # each v2 chunk reaches the worker, which loads v2 once
+    finally:
+        pool.close()
+
+    assert version == 2 and {r["metadata"]["source"] for r in results} == {"v2"}
+
+
+async def test_mapping_registry_reloads_and_keeps_old_snapshot_for_in_flight_batches(tmp_path):
+    """Test that mapping edits are swapped in atomically, versioned, and survive bad YAML"""
+    mapping = tmp_path / "splunk.yaml"
+    mapping.write_text("rules:\n  - {input: title, output: finding.title}\ndefaults: {class_uid: 2001, source: v1}\n")
+    engine = TransformationEngine(mapping_dir=str(tmp_path))
+    engine.registry.poll_interval = 0.01
+    in_flight = engine.registry.snapshot
+    assert in_flight.version == 1
+
+    mapping.write_text("rules:\n  - {input: title, output: finding.name}\ndefaults: {class_uid: 2001, source: v2}\n")
+    await engine.start_watching()
+    try:
+        for _ in range(100):
+            if engine.registry.version == 2:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await engine.stop_watching()
+
+    old, _ = engine.transform_batch("splunk", [{"title": "t"}], in_flight)
+    new, _ = engine.transform_batch("splunk", [{"title": "t"}])
+    assert (old[0]["metadata"]["source"], old[0]["finding"]) == ("v1", {"title": "t"})
+    assert (new[0]["metadata"]["source"], new[0]["finding"]) == ("v2", {"name": "t"})
+
+    current = engine.transformers["splunk"]
+    mapping.write_text("rules: [{input: title}]\n")  # no output: fails to compile
+    assert engine.registry.reload() and engine.registry.version == 3
+    assert engine.transformers["splunk"] is current
+
+    mapping.unlink()
+    assert engine.registry.reload()
+    assert type(engine.transformers["splunk"]).__name__ == "SplunkStrategy"
+    assert not engine.registry.reload()
@@ -0,0 +1,104 @@
+"""Tests for the pooled OPA client"""
+
+import asyncio
+import pytest
+from src.layer4_agentic.opa_client import OPAClient
+from tests.opa_stub import OPAStubServer
+
+
+@pytest.fixture
+async def opa_server():
+    server = OPAStubServer()
+    await server.start()
+    yield server
+    await server.stop()
+
+
+def _requests(count):
+    return [OPAClient.build_input(f"node{i}", f"source{i % 4}", 7 + i % 4) for i in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_reuse_pooled_connections(opa_server):
+    """Test that many evaluations share a bounded set of keep-alive connections"""
+    client = OPAClient(url=opa_server.url, batch_enabled=False)
+    client.cache_ttl = 0
+
+    decisions = await client.evaluate_many(_requests(200))
+    await client.close()
+
+    assert opa_server.requests == 200
+    assert opa_server.connections <= 16
+    assert decisions[2] == {"action": "PENDING_APPROVAL", "require_approval": True, "reason": "stub"}
+    assert client.revision == "fabric@r1"
+
+
+@pytest.mark.asyncio
+async def test_batch_mode_carries_many_resources_per_query(opa_server):
+    """Test that batch mode sends chunks of resources and keeps decisions in order"""
+    client = OPAClient(url=opa_server.url, batch_url=f"{opa_server.url}/batch", batch_enabled=True)
+    client.batch_size = 50
+    client.cache_ttl = 0
+
+    decisions = await client.evaluate_many(_requests(120))
+    await client.close()
+
+    assert opa_server.requests == 3
+    assert opa_server.resources == 120
+    assert [d["action"] for d in decisions[:4]] == ["investigate", "remediate", "PENDING_APPROVAL", "PENDING_APPROVAL"]
+
+
+@pytest.mark.asyncio
+async def test_decisions_are_cached_per_bucket_and_revision(opa_server):
+    """Test that cached decisions are reused until the bundle revision changes"""
+    client = OPAClient(url=opa_server.url, batch_enabled=False)
+
+    await client.evaluate(OPAClient.build_input("a", "tenable", 9))
+    await client.evaluate_many([OPAClient.build_input(n, "tenable", 9) for n in "bcd"])
+    assert opa_server.requests == 1
+    assert client.stats["cache_hits"] == 3
+
+    opa_server.revision = "r2"
+    await client.evaluate(OPAClient.build_input("e", "splunk", 9))
+    await client.evaluate(OPAClient.build_input("f", "tenable", 9))
+    await client.close()
+
+    assert client.revision == "fabric@r2"
+    assert opa_server.requests == 3
+
+
+@pytest.mark.asyncio
+async def test_unreachable_opa_returns_none():
+    """Test that connection failures surface as missing decisions"""
+    client = OPAClient(url="http://127.0.0.1:9/v1/data/fabric/policy", batch_enabled=False)
+
+    assert await client.evaluate(OPAClient.build_input("a", "tenable", 9)) is None
+    await client.close()
+
+
+def test_client_built_outside_event_loop_creates_semaphore_on_first_use():
+    """Test that no loop-bound primitives are created until the client is used in a loop"""
+    client = OPAClient(url="http://127.0.0.1:9/v1/data/fabric/policy", batch_enabled=False)
+    assert client._semaphore is None
+
+    async def evaluate():
+        decision = await client.evaluate(OPAClient.build_input("a", "tenable", 9))
+        await client.close()
+        return decision
+
+    assert asyncio.run(evaluate()) is None
+    assert client._semaphore is not None
+
+
+@pytest.mark.asyncio
+async def test_decisions_are_not_shared_across_label_sets(opa_server):
+    """Test that nodes with different labels miss each other's cached decisions"""
+    client = OPAClient(url=opa_server.url, batch_enabled=False)
+
+    await client.evaluate(OPAClient.build_input("a", "tenable", 9, ["Vulnerability"]))
+    await client.evaluate(OPAClient.build_input("b", "tenable", 9, ["Asset"]))
+    await client.evaluate(OPAClient.build_input("c", "tenable", 9, ["Vulnerability"]))
+    await client.close()
+
+    assert opa_server.requests == 2
+    assert client.stats["cache_hits"] == 1
@@ -0,0 +1,64 @@
+"""Tests for the in-process policy engine"""
+
+import json
+import pytest
+from src.common.exceptions import ConfigurationError
+from src.layer4_agentic.policy_engine import LocalPolicyEngine
+from tests.opa_stub import OPAStubServer
+
+
+def _engine(tmp_path, table, sync_url=""):
+    path = tmp_path / "table.json"
+    path.write_text(json.dumps(table))
+    return LocalPolicyEngine(table_path=str(path), sync_url=sync_url)
+
+
+def test_default_table_matches_previous_fallback_thresholds():
+    """Test that the shipped decision table reproduces the old hardcoded fallback"""
+    engine = LocalPolicyEngine(sync_url="")
+
+    assert engine.evaluate(9, "tenable")["require_approval"] is True
+    assert engine.evaluate(10, "tenable")["action"] == "PENDING_APPROVAL"
+    assert engine.evaluate(8, "tenable")["action"] == "remediate"
+    assert engine.evaluate(7, "tenable")["action"] == "investigate"
+
+
+def test_rules_match_on_source_glob_and_labels(tmp_path):
+    """Test first-match evaluation over source patterns, labels and score bounds"""
+    engine = _engine(tmp_path, {
+        "rules": [
+            {"name": "iac", "when": {"source": "iac_scanner:*"}, "decision": {"action": "investigate"}},
+            {"name": "assets", "when": {"labels": ["Asset"], "risk_score": {"gt": 7, "lt": 10}},
+             "decision": {"action": "isolate"}},
+        ],
+        "default": {"action": "remediate"},
+    })
+
+    assert engine.evaluate(10, "iac_scanner:main.tf")["rule"] == "iac"
+    assert engine.evaluate(8, "crowdstrike", ["Asset"])["action"] == "isolate"
+    assert engine.evaluate(10, "crowdstrike", ["Asset"])["rule"] == "default"
+    assert engine.evaluate(8, "crowdstrike", ["Finding"])["action"] == "remediate"
+
+
+def test_invalid_rule_is_rejected(tmp_path):
+    """Test that malformed tables fail at load time rather than during a cycle"""
+    with pytest.raises(ConfigurationError):
+        _engine(tmp_path, {"rules": [{"name": "bad", "when": {"severity": 4}, "decision": {}}]})
+
+
+@pytest.mark.asyncio
+async def test_table_is_synced_from_opa(tmp_path):
+    """Test that a new table revision served by OPA replaces the local one"""
+    server = OPAStubServer()
+    url = await server.start()
+    server.decision_table = {"revision": "2", "rules": [], "default": {"action": "page_oncall"}}
+    engine = _engine(tmp_path, {"revision": "1", "rules": []}, sync_url=url.replace("policy", "decision_table"))
+
+    assert engine.evaluate(9, "tenable")["action"] == "investigate"
+    await engine.maybe_sync()
+    await engine.maybe_sync()  # within the sync interval: no request
+    await server.stop()
+
+    assert engine.revision == "2"
+    assert engine.evaluate(9, "tenable")["action"] == "page_oncall"
+    assert server.requests == 1
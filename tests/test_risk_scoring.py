@@ -0,0 +1,91 @@
+"""Tests for risk scoring"""
+
+import asyncio
+import time
+import yaml
+from src.common.risk_scoring import DEFAULT_CONFIG_PATH, RiskScoringEngine
+
+
+def test_batch_scores_match_per_record_scores():
+    """Test that vectorized scoring agrees with the single-record path"""
+    engine = RiskScoringEngine()
+    now = time.time()
+    records = [
+        {"class_uid": 2002, "severity_id": 4, "time": int(now), "vulnerability": {"cve": "CVE-1", "exploit_available": True}},
+        {"class_uid": 2002, "severity_id": 3, "time": int(now) - 72 * 3600, "vulnerability": {"cve": "CVE-2"}},
+        {"class_uid": 2001, "severity_id": 3, "time": int(now), "finding": {"title": "Ransomware detected"}},
+        {"class_uid": 2001, "severity_id": 2, "time": "not a time", "finding": {"title": "Login"}},
+        {"class_uid": 2001, "severity_id": 99},
+    ]
+
+    batch = engine.calculate_risk_scores(records).tolist()
+
+    assert batch == [engine.calculate_risk_score(r) for r in records]
+    assert batch == [7, 2, 4, 2, 10]
+
+
+def test_composite_batch_applies_severity_and_criticality():
+    """Test composite scoring of graph nodes"""
+    engine = RiskScoringEngine()
+    nodes = [
+        {"risk_score": 8, "severity_id": 5, "criticality": "critical"},
+        {"risk_score": 8, "severity_id": 5},
+        {"risk_score": 7, "severity_id": 0, "criticality": "low"},
+        {"risk_score": 7, "criticality": "unknown"},
+    ]
+
+    assert engine.calculate_composite_risks(nodes).tolist() == [10, 9, 6, 7]
+    assert [engine.calculate_composite_risk(n) for n in nodes] == [10, 9, 6, 7]
+
+
+def test_ingest_and_cycle_share_one_scorer_and_decay_on_read():
+    """Test that ingest stores the undecayed score and the agentic cycle decays it by node age"""
+    from src.common.risk_scoring import risk_scoring_engine
+    from src.layer3_moat.contextualizer import Contextualizer
+
+    now = time.time()
+    ocsf = {
+        "class_uid": 2001,
+        "severity_id": 4,
+        "time": int(now) - 72 * 3600,
+        "finding": {"title": "Possible RANSOMWARE staging"},
+        "metadata": {"source": "critical-edr"},
+    }
+
+    stored = Contextualizer(graph_client=object())._calculate_risk_score(ocsf)
+    node = {"risk_score": stored, "severity_id": 4, "timestamp": ocsf["time"]}
+
+    assert stored == risk_scoring_engine.calculate_risk_score(ocsf, now=ocsf["time"]) == 6
+    assert risk_scoring_engine.calculate_risk_score(ocsf, now=now) == 4
+    assert risk_scoring_engine.calculate_composite_risk({**node, "timestamp": int(now)}) == 6
+    assert risk_scoring_engine.calculate_composite_risk(node) == 4
+
+
+def test_fallback_scores_on_the_old_severity_scale():
+    """Test that a critical alert alone reaches the decision threshold on the fallback path"""
+    from src.layer1_integration.circuit_breaker import RuleBasedFallback
+
+    now = time.time()
+    fallback = RuleBasedFallback()
+    scores = {
+        severity: asyncio.run(fallback.process_alert({"severity": severity, "timestamp": int(now)}))["risk_score"]
+        for severity in ("Critical", "High", "Medium", "Low", "bogus")
+    }
+
+    assert scores["Critical"] >= 7
+    assert scores == {"Critical": 10, "High": 7, "Medium": 4, "Low": 1, "bogus": 1}
+    ransomware = {"severity": "High", "timestamp": int(now), "title": "RANSOMWARE", "source": "critical-edr"}
+    assert asyncio.run(fallback.process_alert(ransomware))["risk_score"] == 9
+
+
+def test_weights_and_keywords_come_from_config(tmp_path):
+    """Test that a custom configuration changes scoring without code changes"""
+    config = yaml.safe_load(open(DEFAULT_CONFIG_PATH))
+    config["finding"] = {"keyword_bonus": 3, "keywords": ["cryptominer"]}
+    path = tmp_path / "scoring.yaml"
+    path.write_text(yaml.safe_dump(config))
+    engine = RiskScoringEngine(config_path=str(path))
+
+    finding = {"class_uid": 2001, "severity_id": 2, "finding": {"title": "CryptoMiner found"}}
+    assert engine.calculate_risk_score(finding) == 5
+    assert engine.calculate_risk_score({**finding, "finding": {"title": "ransomware"}}) == 2
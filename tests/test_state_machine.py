@@ -0,0 +1,59 @@
+"""Tests for the risk detection state machine"""
+
+import time
+from unittest.mock import patch
+import pytest
+from src.common.exceptions import ConfigurationError
+from src.layer4_agentic.state_machine import RiskDetectionStateMachine
+from tests.test_contextualizer import InMemoryGraphClient
+
+
+@pytest.mark.asyncio
+async def test_query_graph_scores_streamed_nodes():
+    """Test that graph nodes are scored page by page without keeping them in state"""
+    graph = InMemoryGraphClient()
+    for i in range(5):
+        await graph.create_node("Finding", {"risk_score": 8, "severity_id": 5, "source": "splunk", "uid": i})
+    await graph.create_node("Finding", {"risk_score": 2, "source": "splunk"})
+
+    with patch("src.layer4_agentic.state_machine.get_graph_client", return_value=graph):
+        machine = RiskDetectionStateMachine(threshold=7)
+
+    state = await machine._query_graph_node({"risk_scores": {}, "source_attribution": {}})
+
+    assert state["high_risk_count"] == 5
+    assert set(state["risk_scores"].values()) == {9}
+    assert set(state["source_attribution"].values()) == {"splunk"}
+    assert "high_risk_nodes" not in state
+    assert machine.last_cycle_time is not None
+
+
+@pytest.mark.asyncio
+async def test_watermark_survives_restart(tmp_path):
+    """Test that a restarted state machine resumes from the persisted watermark"""
+    graph = InMemoryGraphClient()
+    await graph.create_node("Finding", {"risk_score": 8, "source": "splunk", "updated_at": 100.0})
+
+    with patch("src.layer4_agentic.state_machine.get_graph_client", return_value=graph), \
+            patch("src.layer4_agentic.watermark.settings.watermark_backend", "file"), \
+            patch("src.layer4_agentic.watermark.settings.watermark_file_path", str(tmp_path / "wm.json")):
+        first = RiskDetectionStateMachine(threshold=7)
+        state = await first._query_graph_node({"risk_scores": {}, "source_attribution": {}})
+        assert state["high_risk_count"] == 1
+
+        restarted = RiskDetectionStateMachine(threshold=7)
+        assert restarted.last_cycle_time == first.last_cycle_time
+
+        await graph.create_node("Finding", {"risk_score": 9, "source": "tenable", "updated_at": time.time()})
+        state = await restarted._query_graph_node({"risk_scores": {}, "source_attribution": {}})
+
+    assert state["high_risk_count"] == 1
+    assert list(state["source_attribution"].values()) == ["tenable"]
+
+
+def test_unknown_policy_engine_fails_at_startup():
+    """Test that a misspelled policy_engine is rejected instead of silently skipping OPA"""
+    with patch("src.layer4_agentic.state_machine.get_graph_client", return_value=InMemoryGraphClient()), \
+            patch("src.layer4_agentic.state_machine.settings.policy_engine", "OPA "):
+        with pytest.raises(ConfigurationError):
+            RiskDetectionStateMachine(threshold=7)
@@ -0,0 +1,45 @@
+"""Tests for shared timestamp parsing"""
+
+import time
+from datetime import datetime
+from unittest.mock import patch
+from src.common import timestamps
+from src.common.timestamps import batch_clock, current_time, parse_timestamp, to_epoch_seconds
+
+
+def test_parse_timestamp_shapes():
+    """Test epoch numbers, epoch strings, ISO strings and unparseable values"""
+    assert parse_timestamp(1704067200) == 1704067200.0
+    assert parse_timestamp(1704067200.5) == 1704067200.5
+    assert parse_timestamp("1704067200.250") == 1704067200.25
+    assert parse_timestamp("2024-01-01T00:00:00Z") == 1704067200.0
+    assert parse_timestamp("2024-01-01T02:00:00+02:00") == 1704067200.0
+    assert parse_timestamp(0) == 0.0
+    assert parse_timestamp("123456789") == 123456789.0
+    # Short digit runs are ISO basic dates (parsed from Python 3.11), never 1970 epochs
+    assert parse_timestamp("20240101") in (None, datetime(2024, 1, 1).timestamp())
+    for value in (None, "", True, "yesterday", "12.3.4"):
+        assert parse_timestamp(value) is None
+
+
+def test_repeated_strings_are_memoized_and_bounded():
+    """Test that the memo serves repeats and is cleared when full"""
+    timestamps._memo.clear()
+    with patch.object(timestamps, "_parse_string", wraps=timestamps._parse_string) as parse:
+        for _ in range(3):
+            parse_timestamp("2024-01-01T00:00:00Z")
+        assert parse.call_count == 1
+
+    with patch.object(timestamps, "TIMESTAMP_MEMO_MAX_SIZE", 2):
+        for i in range(5):
+            parse_timestamp(str(1700000000 + i))
+        assert len(timestamps._memo) <= 2
+
+
+def test_batch_clock_freezes_now_for_missing_timestamps():
+    """Test that records without a timestamp share one now inside a batch"""
+    with batch_clock() as now:
+        time.sleep(0.01)
+        assert current_time() == now
+        assert to_epoch_seconds(None) == int(now)
+    assert current_time() > now